@@ -0,0 +1,60 @@
+# engine
+# Headless matrix engine shared by the 2x2 and 3x3 calculators (no PyQt).
+from .core import (
+    SingularMatrixError,
+    as_matrix,
+    split_operands,
+    add,
+    subtract,
+    multiply,
+    determinant,
+    minors,
+    cofactors,
+    adjugate,
+    inverse,
+    solve,
+    rank,
+)
+from .lu import (
+    LUFactorization,
+    FactorizationCache,
+    factorization_cache,
+    factorize,
+)
+from .matmul import (
+    naive_matmul,
+    blocked_matmul,
+    strassen_matmul,
+    matmul,
+    tune_crossover,
+)
+from .parallel import parallel_matmul, shutdown_pool
+from .sparse import (
+    SPARSE_THRESHOLD,
+    CSRMatrix,
+    fill_ratio,
+    choose_format,
+    sparse_add,
+    sparse_subtract,
+    sparse_multiply,
+)
+from .outofcore import outofcore_matmul, tile_size_for_budget
+from .progress import (
+    Cancelled,
+    CancelToken,
+    checkpoint,
+    current_token,
+    use_token,
+)
+from .batch import (
+    as_stack,
+    batch_determinant,
+    batch_adjugate,
+    batch_inverse,
+)
+from .exact import (
+    parse_exact,
+    as_exact_matrix,
+    exact_determinant,
+    exact_inverse,
+)
@@ -0,0 +1,88 @@
+# batch.py
+# Vectorised determinant / adjugate / inverse for stacks of small matrices.
+# Grading thousands of 2x2 or 3x3 answers is one NumPy call here instead of
+# a Python loop over the per-window code.
+import numpy as np
+
+
+def as_stack(values, n=None):
+    """Turn input into an (N, n, n) float array
+
+    Accepts a stack of matrices (shape (N, n, n)) or, with ``n`` given,
+    rows of flat row-major values (shape (N, n*n)). 2-D input is never
+    guessed: four flat 2x2 answers and one 4x4 matrix have the same shape.
+    A single matrix is a stack of one, ``a[np.newaxis]``.
+    """
+    arr = np.asarray(values, dtype=float)
+    if arr.ndim == 2:
+        if n is None:
+            raise ValueError(f"Pass n to read shape {arr.shape} as rows of flat n×n matrices")
+        if n * n != arr.shape[1]:
+            raise ValueError(f"Expected {n * n} values per matrix, got {arr.shape[1]}")
+        arr = arr.reshape(-1, n, n)
+    if arr.ndim != 3 or arr.shape[1] != arr.shape[2]:
+        raise ValueError(f"Expected a stack of square matrices, got shape {arr.shape}")
+    if n is not None and arr.shape[1] != n:
+        raise ValueError(f"Expected {n}x{n} matrices, got {arr.shape[1]}x{arr.shape[2]}")
+    return arr
+
+
+def batch_determinant(stack, n=None):
+    """|A| for every matrix in the stack, shape (N,); n as in as_stack()"""
+    a = as_stack(stack, n)
+    n = a.shape[1]
+    if n == 1:
+        return a[:, 0, 0].copy()
+    if n == 2:
+        return a[:, 0, 0] * a[:, 1, 1] - a[:, 0, 1] * a[:, 1, 0]
+    if n == 3:
+        return (a[:, 0, 0] * (a[:, 1, 1] * a[:, 2, 2] - a[:, 1, 2] * a[:, 2, 1])
+                - a[:, 0, 1] * (a[:, 1, 0] * a[:, 2, 2] - a[:, 1, 2] * a[:, 2, 0])
+                + a[:, 0, 2] * (a[:, 1, 0] * a[:, 2, 1] - a[:, 1, 1] * a[:, 2, 0]))
+    return np.linalg.det(a)
+
+
+def batch_adjugate(stack, n=None):
+    """Adj(A) for every matrix in the stack, shape (N, n, n); n as in as_stack()"""
+    a = as_stack(stack, n)
+    n = a.shape[1]
+    adj = np.empty_like(a)
+    if n == 1:
+        adj[:] = 1.0
+    elif n == 2:
+        adj[:, 0, 0] = a[:, 1, 1]
+        adj[:, 0, 1] = -a[:, 0, 1]
+        adj[:, 1, 0] = -a[:, 1, 0]
+        adj[:, 1, 1] = a[:, 0, 0]
+    elif n == 3:
+        # Cyclic indices give the signed 2x2 minors directly: C_ij uses rows
+        # i+1, i+2 and columns j+1, j+2, and Adj(A)[j, i] = C_ij.
+        for i in range(3):
+            r1, r2 = (i + 1) % 3, (i + 2) % 3
+            for j in range(3):
+                c1, c2 = (j + 1) % 3, (j + 2) % 3
+                adj[:, j, i] = a[:, r1, c1] * a[:, r2, c2] - a[:, r1, c2] * a[:, r2, c1]
+    else:
+        # Cofactor expansion, which singular matrices have too (|A| A^-1
+        # does not): C_ij is the signed |A| without row i and column j
+        for i in range(n):
+            rows = np.delete(a, i, axis=1)
+            for j in range(n):
+                sign = -1.0 if (i + j) % 2 else 1.0
+                adj[:, j, i] = sign * batch_determinant(np.delete(rows, j, axis=2))
+    return adj
+
+
+def batch_inverse(stack, n=None):
+    """Determinants, adjugates and inverses of a whole stack in one call
+
+    Returns (det, adj, inv). Singular matrices get NaN in their inverse,
+    use ``det != 0`` as the mask of valid results. n as in as_stack().
+    """
+    a = as_stack(stack, n)
+    det = batch_determinant(a)
+    adj = batch_adjugate(a)
+    inv = np.full_like(a, np.nan)
+    ok = det != 0
+    inv[ok] = adj[ok] / det[ok, None, None]
+    return det, adj, inv
@@ -0,0 +1,75 @@
+# bench.py
+# Engine benchmarks, run with:  python -m engine.bench [section ...]
+import argparse
+import os
+import time
+
+import numpy as np
+
+from .matmul import blocked_matmul, naive_matmul, strassen_matmul
+from .parallel import parallel_matmul
+
+
+def best_time(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_matmul(n=512, naive_rows=16):
+    rng = np.random.default_rng(0)
+    a, b = rng.standard_normal((n, n)), rng.standard_normal((n, n))
+    ref = a @ b
+    tolerance = 1e-10 * n
+
+    # The pure Python loop is far too slow for all n rows, time a slice and scale
+    naive = best_time(lambda: naive_matmul(a[:naive_rows], b), repeat=1) * n / naive_rows
+    print(f"matmul n={n}")
+    print(f"  {'naive (extrapolated)':<24}{naive * 1000:>12.1f} ms")
+    kernels = [
+        ("numpy", lambda: a @ b),
+        ("blocked", lambda: blocked_matmul(a, b)),
+        ("strassen (1 level)", lambda: strassen_matmul(a, b, crossover=n // 2)),
+    ]
+    for name, fn in kernels:
+        t = best_time(fn)
+        err = np.abs(fn() - ref).max()
+        status = "ok" if err <= tolerance else "FAIL"
+        print(f"  {name:<24}{t * 1000:>12.1f} ms  x{naive / t:>9.0f}  err={err:.1e} {status}")
+
+
+def bench_parallel(n=2048, tile_size=512):
+    rng = np.random.default_rng(0)
+    a, b = rng.standard_normal((n, n)), rng.standard_normal((n, n))
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, 16, cores} & set(range(1, cores + 1)))
+    print(f"parallel matmul n={n} tile={tile_size} ({cores} cores)")
+    base = None
+    for workers in counts:
+        t = best_time(lambda: parallel_matmul(a, b, workers=workers, tile_size=tile_size), repeat=2)
+        base = base or t
+        print(f"  workers={workers:<3}{t * 1000:>10.1f} ms  speedup x{base / t:.2f}")
+
+
+SECTIONS = {
+    "matmul": bench_matmul,
+    "parallel": bench_parallel,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Matrix engine benchmarks")
+    parser.add_argument("sections", nargs="*", help=f"any of: {', '.join(SECTIONS)} (default: all)")
+    args = parser.parse_args(argv)
+    unknown = set(args.sections) - set(SECTIONS)
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(sorted(unknown))}")
+    for name in args.sections or SECTIONS:
+        SECTIONS[name]()
+
+
+if __name__ == "__main__":
+    main()
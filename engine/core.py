@@ -0,0 +1,194 @@
+# core.py
+# Plain NumPy matrix operations used by the 2x2 / 3x3 windows.
+# Nothing in here imports PyQt, so the same math can be used from scripts,
+# batch jobs and benchmarks without building any widget.
+import os
+
+import numpy as np
+
+from .lu import factorize
+from .matmul import matmul
+from .outofcore import DEFAULT_MEMORY_BUDGET, outofcore_matmul
+from .parallel import DEFAULT_TILE_SIZE, parallel_matmul
+from .sparse import CSRMatrix, sparse_add, sparse_multiply, sparse_multiply_cost, sparse_subtract
+
+# Dense products at least this big are checked for enough zeros to skip
+SPARSE_MIN_SIZE = 128
+
+
+class SingularMatrixError(ValueError):
+    """Raised when a matrix has no inverse (|A| = 0)"""
+
+
+def as_matrix(values, n=None):
+    """Turn row-major values (flat list or nested rows) into an n×n float array"""
+    arr = np.asarray(values, dtype=float)
+    if arr.ndim == 1:
+        if n is None:
+            n = int(round(arr.size ** 0.5))
+        if n * n != arr.size:
+            raise ValueError(f"Expected {n * n} values for a {n}x{n} matrix, got {arr.size}")
+        arr = arr.reshape(n, n)
+    if arr.ndim != 2:
+        raise ValueError("Matrix must be two dimensional")
+    return arr
+
+
+def split_operands(values, n):
+    """Split the flat input list of a two-matrix window into (A, B)"""
+    size = n * n
+    if len(values) != 2 * size:
+        raise ValueError(f"Expected {2 * size} values for two {n}x{n} matrices, got {len(values)}")
+    return as_matrix(values[:size], n), as_matrix(values[size:], n)
+
+
+def _check_same_shape(a, b):
+    if a.shape != b.shape:
+        raise ValueError(f"Shapes {a.shape} and {b.shape} do not match")
+
+
+def _is_sparse(*operands):
+    return any(isinstance(x, CSRMatrix) for x in operands)
+
+
+def add(a, b):
+    if _is_sparse(a, b):
+        return sparse_add(a, b)
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    _check_same_shape(a, b)
+    return a + b
+
+
+def subtract(a, b):
+    if _is_sparse(a, b):
+        return sparse_subtract(a, b)
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    _check_same_shape(a, b)
+    return a - b
+
+
+def _is_path(x):
+    return isinstance(x, (str, os.PathLike))
+
+
+def multiply(a, b, out=None, memory_budget=DEFAULT_MEMORY_BUDGET, workers=1, tile_size=DEFAULT_TILE_SIZE):
+    """A B, sparse operands (or big dense ones that are mostly zeros) skip the zeros
+
+    A dense product goes the sparse way only when the scalar products that
+    skipping the zeros leaves are estimated to cost less than BLAS doing
+    all of them.
+
+    a and b may also be paths of .npy files too big for memory: the
+    product is then streamed into the .npy file out within memory_budget
+    bytes and returned as a read-only memory map.
+
+    workers > 1 (None for one per core) splits big dense products into
+    tile_size output tiles across the worker processes; small ones stay
+    on BLAS either way.
+    """
+    if _is_path(a) or _is_path(b):
+        if not (_is_path(a) and _is_path(b) and out is not None):
+            raise ValueError("Out-of-core multiplication needs A, B and the output as .npy paths")
+        return outofcore_matmul(a, b, out, memory_budget)
+    if _is_sparse(a, b):
+        return sparse_multiply(a, b)
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    if a.ndim != 2 or b.ndim != 2 or a.shape[1] != b.shape[0]:
+        raise ValueError(f"Cannot multiply {a.shape} by {b.shape}")
+    if (min(a.shape) >= SPARSE_MIN_SIZE
+            and sparse_multiply_cost(a, b) < a.shape[0] * a.shape[1] * b.shape[1]):
+        result = sparse_multiply(a, b)
+        return result.to_dense() if isinstance(result, CSRMatrix) else result
+    if workers != 1:
+        return parallel_matmul(a, b, workers, tile_size)
+    return matmul(a, b)
+
+
+def _check_square(a):
+    if a.ndim != 2 or a.shape[0] != a.shape[1]:
+        raise ValueError(f"Matrix must be square, got shape {a.shape}")
+
+
+def determinant(a):
+    """|A|, using the same closed forms as the windows for n <= 3
+
+    The closed forms keep integer inputs exact (no LU round-off like
+    5.999999 instead of 6), above 3x3 the cached LU factorisation is used.
+    """
+    a = np.asarray(a, dtype=float)
+    _check_square(a)
+    n = a.shape[0]
+    if n == 0:
+        return 1.0
+    if n == 1:
+        return float(a[0, 0])
+    if n == 2:
+        return float(a[0, 0] * a[1, 1] - a[0, 1] * a[1, 0])
+    if n == 3:
+        (p, q, r), (s, t, u), (v, w, x) = a.tolist()
+        return float(p * (t * x - u * w) - q * (s * x - u * v) + r * (s * w - t * v))
+    return factorize(a).det()
+
+
+def minors(a):
+    """Matrix of minors M_ij (determinant with row i and column j removed)"""
+    a = np.asarray(a, dtype=float)
+    _check_square(a)
+    n = a.shape[0]
+    out = np.empty_like(a)
+    for i in range(n):
+        rows = [r for r in range(n) if r != i]
+        for j in range(n):
+            cols = [c for c in range(n) if c != j]
+            out[i, j] = determinant(a[np.ix_(rows, cols)])
+    return out
+
+
+def cofactors(a):
+    """Cofactor matrix A_ij = (-1)^(i+j) M_ij"""
+    m = minors(a)
+    n = m.shape[0]
+    signs = np.where((np.add.outer(np.arange(n), np.arange(n)) % 2) == 0, 1.0, -1.0)
+    return m * signs
+
+
+def adjugate(a):
+    """Adj(A), the transpose of the cofactor matrix"""
+    a = np.asarray(a, dtype=float)
+    _check_square(a)
+    if a.shape[0] == 1:
+        return np.ones((1, 1))
+    return cofactors(a).T
+
+
+def inverse(a):
+    """A^-1, raises SingularMatrixError when |A| = 0
+
+    For n <= 3 this is Adj(A) / |A| (the method the windows show), bigger
+    matrices reuse the cached LU factorisation.
+    """
+    a = np.asarray(a, dtype=float)
+    _check_square(a)
+    n = a.shape[0]
+    if n <= 3:
+        det = determinant(a)
+        if det == 0:
+            raise SingularMatrixError("Inverse does not exist (|A| = 0)")
+        return adjugate(a) / det
+    lu = factorize(a)
+    if lu.singular:
+        raise SingularMatrixError("Inverse does not exist (|A| = 0)")
+    return lu.inverse()
+
+
+def solve(a, b):
+    """x with A x = b, shares the LU factorisation with det/inverse"""
+    a = np.asarray(a, dtype=float)
+    _check_square(a)
+    return factorize(a).solve(b)
+
+
+def rank(a):
+    a = np.asarray(a, dtype=float)
+    _check_square(a)
+    return factorize(a).rank()
@@ -0,0 +1,135 @@
+# exact.py
+# Exact rational arithmetic with fraction-free (Bareiss) elimination.
+# Integer matrices stay integers the whole way through, every division in
+# the elimination is exact, so the entries never grow past the size of the
+# minors of A and no rounding happens anywhere.
+from fractions import Fraction
+from math import lcm
+
+from .core import SingularMatrixError
+from .progress import checkpoint
+
+
+def parse_exact(text):
+    """Parse an input field as an exact number: "3", "-2/5", "0.75" -> Fraction
+
+    Anything that is not a number, "1/0" included, raises ValueError.
+    """
+    try:
+        return Fraction(text.strip())
+    except ZeroDivisionError:
+        raise ValueError(f"Division by zero in {text.strip()!r}") from None
+
+
+def as_exact_matrix(values, n=None):
+    """Turn row-major values (flat or nested) into a list of Fraction rows"""
+    if values and isinstance(values[0], (list, tuple)):
+        rows = [[Fraction(x) for x in row] for row in values]
+    else:
+        if n is None:
+            n = int(round(len(values) ** 0.5))
+        if n * n != len(values):
+            raise ValueError(f"Expected {n * n} values for a {n}x{n} matrix, got {len(values)}")
+        rows = [[Fraction(x) for x in values[i * n:(i + 1) * n]] for i in range(n)]
+    if any(len(row) != len(rows) for row in rows):
+        raise ValueError("Matrix must be square")
+    return rows
+
+
+def _integer_rows(rows):
+    """Scale every row by the LCM of its denominators
+
+    Returns (int_rows, scales) with int_rows[i] = scales[i] * rows[i].
+    """
+    int_rows, scales = [], []
+    for row in rows:
+        scale = lcm(*(x.denominator for x in row)) if row else 1
+        int_rows.append([int(x * scale) for x in row])
+        scales.append(scale)
+    return int_rows, scales
+
+
+def _bareiss_jordan(m, n):
+    """Fraction-free Gauss-Jordan on the integer rows of m, in place
+
+    The left n×n block ends as det·I and anything augmented to the right is
+    multiplied by det·A^-1. Returns the determinant of the left block.
+    """
+    sign = 1
+    prev = 1
+    for k in range(n):
+        checkpoint("compute", 100 * k / n)
+        if m[k][k] == 0:
+            for i in range(k + 1, n):
+                if m[i][k] != 0:
+                    m[k], m[i] = m[i], m[k]
+                    sign = -sign
+                    break
+            else:
+                return 0
+        pivot = m[k][k]
+        row_k = m[k]
+        for i in range(len(m)):
+            if i == k:
+                continue
+            row_i = m[i]
+            factor = row_i[k]
+            m[i] = [(pivot * x - factor * y) // prev for x, y in zip(row_i, row_k)]
+        prev = pivot
+    # Rows above the last pivot are still scaled by older pivots, bring
+    # every row up to the final one (each division is exact).
+    for i in range(n - 1):
+        scale = m[i][i]
+        if scale != prev:
+            m[i] = [x * prev // scale for x in m[i]]
+    return sign * prev
+
+
+def _bareiss_det(m, n):
+    """Fraction-free forward elimination (Bareiss), returns |m|"""
+    sign = 1
+    prev = 1
+    for k in range(n - 1):
+        checkpoint("compute", 100 * k / n)
+        if m[k][k] == 0:
+            for i in range(k + 1, n):
+                if m[i][k] != 0:
+                    m[k], m[i] = m[i], m[k]
+                    sign = -sign
+                    break
+            else:
+                return 0
+        pivot = m[k][k]
+        for i in range(k + 1, n):
+            factor = m[i][k]
+            row_i, row_k = m[i], m[k]
+            for j in range(k + 1, n):
+                row_i[j] = (pivot * row_i[j] - factor * row_k[j]) // prev
+        prev = pivot
+    return sign * m[n - 1][n - 1] if n else 1
+
+
+def exact_determinant(values):
+    """|A| as a Fraction (an int-valued Fraction for integer input)"""
+    rows = as_exact_matrix(values)
+    int_rows, scales = _integer_rows(rows)
+    det = _bareiss_det(int_rows, len(rows))
+    denominator = 1
+    for scale in scales:
+        denominator *= scale
+    return Fraction(det, denominator)
+
+
+def exact_inverse(values):
+    """A^-1 as Fraction rows, raises SingularMatrixError when |A| = 0"""
+    rows = as_exact_matrix(values)
+    n = len(rows)
+    int_rows, scales = _integer_rows(rows)
+    augmented = [row + [int(i == j) for j in range(n)] for i, row in enumerate(int_rows)]
+    det = _bareiss_jordan(augmented, n)
+    if det == 0:
+        raise SingularMatrixError("Inverse does not exist (|A| = 0)")
+    # augmented now holds [d·I | d·B^-1] with B = diag(scales)·A, so
+    # A^-1 = B^-1·diag(scales) and d = augmented[0][0].
+    d = augmented[0][0]
+    return [[Fraction(augmented[i][n + j] * scales[j], d) for j in range(n)] for i in range(n)]
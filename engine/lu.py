@@ -0,0 +1,130 @@
+# lu.py
+# LU factorisation with partial pivoting plus a small cache keyed by matrix
+# content. One factorisation answers det, inverse, rank and solve, so asking
+# for the inverse of a matrix whose determinant was just computed is a
+# dictionary lookup instead of another O(n^3) pass.
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from .progress import checkpoint
+
+
+class LUFactorization:
+    """PA = LU, stored packed in one array (unit lower L below the diagonal)"""
+
+    def __init__(self, a):
+        source = np.array(a, dtype=float)
+        a = source.copy()
+        if a.ndim != 2 or a.shape[0] != a.shape[1]:
+            raise ValueError(f"Matrix must be square, got shape {a.shape}")
+        n = a.shape[0]
+        perm = np.arange(n)
+        swaps = 0
+        scale = np.abs(a).max() if a.size else 0.0
+        self.tol = max(n, 1) * np.finfo(float).eps * scale
+        for k in range(n):
+            checkpoint("compute", 100 * k / n)
+            p = k + int(np.argmax(np.abs(a[k:, k])))
+            if p != k:
+                a[[k, p]] = a[[p, k]]
+                perm[[k, p]] = perm[[p, k]]
+                swaps += 1
+            pivot = a[k, k]
+            if abs(pivot) <= self.tol:
+                continue
+            a[k + 1:, k] /= pivot
+            a[k + 1:, k + 1:] -= np.outer(a[k + 1:, k], a[k, k + 1:])
+        self.lu = a
+        self.perm = perm
+        self.sign = -1.0 if swaps % 2 else 1.0
+        self.n = n
+        self._source = source
+        self._rank = None
+        self._inverse = None
+
+    @property
+    def singular(self):
+        return bool(np.any(np.abs(np.diag(self.lu)) <= self.tol))
+
+    def det(self):
+        return float(self.sign * np.prod(np.diag(self.lu)))
+
+    def solve(self, b):
+        """Solve A x = b for a vector or a matrix of right-hand sides"""
+        from .core import SingularMatrixError
+
+        if self.singular:
+            raise SingularMatrixError("Matrix is singular (|A| = 0)")
+        x = np.array(np.asarray(b, dtype=float)[self.perm], dtype=float)
+        lu = self.lu
+        for k in range(self.n):                 # forward: L y = P b
+            x[k + 1:] -= np.multiply.outer(lu[k + 1:, k], x[k])
+        for k in range(self.n - 1, -1, -1):     # backward: U x = y
+            x[k] /= lu[k, k]
+            x[:k] -= np.multiply.outer(lu[:k, k], x[k])
+        return x
+
+    def inverse(self):
+        if self._inverse is None:
+            self._inverse = self.solve(np.eye(self.n))
+        return self._inverse.copy()
+
+    def rank(self):
+        """Non-singular matrices read their rank off the pivots
+
+        Partial pivoting is not rank revealing, so a singular matrix falls
+        back to an SVD of the original (computed once and kept).
+        """
+        if self._rank is None:
+            if not self.singular:
+                self._rank = self.n
+            else:
+                self._rank = int(np.linalg.matrix_rank(self._source))
+        return self._rank
+
+
+class FactorizationCache:
+    """Bounded LRU of LUFactorization objects keyed by matrix content"""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(a):
+        digest = hashlib.blake2b(a.tobytes(), digest_size=16).hexdigest()
+        return (a.shape, digest)
+
+    def factorize(self, a):
+        a = np.ascontiguousarray(a, dtype=float)
+        key = self.key(a)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = LUFactorization(a)
+        self._entries[key] = entry
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared by every caller in the process (windows, scripts, benchmarks)
+factorization_cache = FactorizationCache()
+
+
+def factorize(a):
+    return factorization_cache.factorize(a)
@@ -0,0 +1,159 @@
+# matmul.py
+# Matrix multiplication for sizes well beyond the 3x3 window.
+# Products go straight to NumPy's BLAS. The blocked (tiled) kernel and the
+# Strassen-Winograd recursion, which trades one of eight block products for
+# a few additions, are kept for benchmarks and for machines where
+# tune_crossover() measures a win over BLAS; Strassen is off by default.
+import math
+import time
+
+import numpy as np
+
+from .progress import checkpoint
+
+DEFAULT_BLOCK_SIZE = 256
+
+# Size from which matmul() recurses with Strassen: never, unless tuned
+DEFAULT_CROSSOVER = math.inf
+
+# Below this strassen_matmul() hands the blocks to BLAS
+DEFAULT_LEAF_SIZE = 1024
+
+# Strassen has to be this much faster than BLAS to count as a win
+TUNE_MARGIN = 0.95
+
+
+def _check_operands(a, b):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    if a.ndim != 2 or b.ndim != 2 or a.shape[1] != b.shape[0]:
+        raise ValueError(f"Cannot multiply {a.shape} by {b.shape}")
+    return a, b
+
+
+def naive_matmul(a, b):
+    """Textbook triple loop, kept only as the reference for benchmarks"""
+    a, b = _check_operands(a, b)
+    rows, inner = a.shape
+    cols = b.shape[1]
+    a_rows, b_rows = a.tolist(), b.tolist()
+    out = [[0.0] * cols for _ in range(rows)]
+    for i in range(rows):
+        row, out_row = a_rows[i], out[i]
+        for k in range(inner):
+            x = row[k]
+            b_row = b_rows[k]
+            for j in range(cols):
+                out_row[j] += x * b_row[j]
+    return np.array(out)
+
+
+def blocked_matmul(a, b, block_size=DEFAULT_BLOCK_SIZE, out=None):
+    """C = A B computed tile by tile (i, k, j order) so tiles stay in cache"""
+    a, b = _check_operands(a, b)
+    rows, inner = a.shape
+    cols = b.shape[1]
+    if out is None:
+        out = np.zeros((rows, cols))
+    else:
+        out[...] = 0.0
+    bs = block_size
+    for i in range(0, rows, bs):
+        checkpoint("compute", 100 * i / rows)
+        for k in range(0, inner, bs):
+            a_tile = a[i:i + bs, k:k + bs]
+            for j in range(0, cols, bs):
+                out[i:i + bs, j:j + bs] += a_tile @ b[k:k + bs, j:j + bs]
+    return out
+
+
+def strassen_matmul(a, b, crossover=DEFAULT_LEAF_SIZE):
+    """Strassen-Winograd recursion, BLAS for blocks at or below the crossover
+
+    Odd dimensions are zero padded by one at each level and trimmed on the
+    way back up.
+    """
+    a, b = _check_operands(a, b)
+    return _winograd(a, b, crossover)
+
+
+def _winograd(a, b, crossover):
+    rows, inner = a.shape
+    cols = b.shape[1]
+    if min(rows, inner, cols) <= crossover:
+        return a @ b
+
+    pr, pi, pc = rows % 2, inner % 2, cols % 2
+    if pr or pi or pc:
+        a = np.pad(a, ((0, pr), (0, pi)))
+        b = np.pad(b, ((0, pi), (0, pc)))
+    h, m, w = a.shape[0] // 2, a.shape[1] // 2, b.shape[1] // 2
+
+    a11, a12, a21, a22 = a[:h, :m], a[:h, m:], a[h:, :m], a[h:, m:]
+    b11, b12, b21, b22 = b[:m, :w], b[:m, w:], b[m:, :w], b[m:, w:]
+
+    s1 = a21 + a22
+    s2 = s1 - a11
+    s3 = a11 - a21
+    s4 = a12 - s2
+    t1 = b12 - b11
+    t2 = b22 - t1
+    t3 = b22 - b12
+    t4 = t2 - b21
+
+    def mul(x, y):
+        return _winograd(x, y, crossover)
+
+    m1 = mul(a11, b11)
+    m2 = mul(a12, b21)
+    m3 = mul(s4, b22)
+    m4 = mul(a22, t4)
+    m5 = mul(s1, t1)
+    m6 = mul(s2, t2)
+    m7 = mul(s3, t3)
+
+    out = np.empty((2 * h, 2 * w))
+    out[:h, :w] = m1 + m2
+    u2 = m1 + m6
+    u3 = u2 + m7
+    out[:h, w:] = u2 + m5 + m3
+    out[h:, :w] = u3 - m4
+    out[h:, w:] = u3 + m5
+    return out[:rows, :cols]
+
+
+def matmul(a, b, block_size=None, crossover=DEFAULT_CROSSOVER):
+    """Pick a kernel by size
+
+    NumPy's own product (BLAS) unless a block size is asked for. From the
+    crossover on the Strassen-Winograd recursion takes over, which only
+    happens with a crossover measured by tune_crossover().
+    """
+    a, b = _check_operands(a, b)
+    if min(a.shape[0], a.shape[1], b.shape[1]) >= crossover:
+        return strassen_matmul(a, b, crossover)
+    if block_size is not None:
+        return blocked_matmul(a, b, block_size)
+    return a @ b
+
+
+def tune_crossover(sizes=(512, 1024, 2048, 4096), repeat=3):
+    """Smallest size at which one Strassen level beats NumPy's own product
+
+    Strassen has to be faster than a @ b by TUNE_MARGIN to count. Returns
+    None when it never wins on this machine for the sizes tried; matmul()
+    then keeps its default of plain BLAS.
+    """
+    rng = np.random.default_rng(0)
+    for n in sizes:
+        a, b = rng.standard_normal((n, n)), rng.standard_normal((n, n))
+        plain = strassen = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            a @ b
+            plain = min(plain, time.perf_counter() - start)
+            start = time.perf_counter()
+            strassen_matmul(a, b, crossover=n // 2)
+            strassen = min(strassen, time.perf_counter() - start)
+        if strassen < plain * TUNE_MARGIN:
+            return n
+    return None
@@ -0,0 +1,140 @@
+# outofcore.py
+# Streaming multiplication of .npy operands that do not fit in memory.
+# Tiles of A and B are read row by row (seek + readinto on an unbuffered
+# file, no copy through a Python buffer) into four fixed buffers (A tile,
+# B tile, accumulator, product) and every finished C tile is written
+# straight to the output file, so the resident set stays at four tiles
+# whatever the operand size. No operand is memory mapped while
+# computing: touched mmap pages would count against the process until the
+# mapping is dropped.
+import numpy as np
+
+from .progress import checkpoint
+
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024  # bytes
+
+# A tile, B tile, the accumulated C tile and the product added to it
+TILE_BUFFERS = 4
+
+# Share of the budget left to the interpreter's own allocations in the loop
+HEADROOM = 1 / 16
+
+
+def tile_size_for_budget(memory_budget, itemsize=8):
+    """Largest square tile t with the four tile buffers (4·t² items) inside the budget
+
+    BLAS' fixed per-process workspace is not counted, it is there after
+    the first product of any size anyway.
+    """
+    t = int((memory_budget * (1 - HEADROOM) / (TILE_BUFFERS * itemsize)) ** 0.5)
+    if t < 1:
+        raise ValueError(f"Memory budget of {memory_budget} bytes is too small for one tile")
+    return t
+
+
+class _NpyFile:
+    """Shape, dtype and data offset of a C-ordered 2-D .npy file, read by rows"""
+
+    def __init__(self, path):
+        self.file = open(path, "rb", buffering=0)
+        try:
+            version = np.lib.format.read_magic(self.file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(self.file)
+            elif version == (2, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(self.file)
+            else:
+                raise ValueError(f"{path}: unsupported .npy format version {version}")
+        except Exception:
+            self.file.close()
+            raise
+        if fortran_order:
+            self.file.close()
+            raise ValueError(f"{path}: Fortran-ordered arrays are not supported")
+        self.shape = shape
+        self.dtype = dtype
+        self.offset = self.file.tell()
+
+    def read(self, out, i0, j0, scratch):
+        """Fill out (h×w) with rows i0.. and columns j0.. of the array"""
+        h, w = out.shape
+        stride = self.shape[1] * self.dtype.itemsize
+        for r in range(h):
+            start = self.offset + (i0 + r) * stride + j0 * self.dtype.itemsize
+            row = out[r] if scratch is None else scratch[:w]
+            view = memoryview(row).cast("B")
+            self.file.seek(start)
+            if self.file.readinto(view) != len(view):
+                raise ValueError("Unexpected end of .npy file")
+            if scratch is not None:
+                out[r] = row
+
+    def close(self):
+        self.file.close()
+
+
+def outofcore_matmul(a_path, b_path, out_path, memory_budget=DEFAULT_MEMORY_BUDGET, tile_size=None):
+    """Write A @ B to out_path (.npy) reading A and B from .npy files on disk
+
+    The tile size is derived from memory_budget unless given; the four tile
+    buffers are the only memory that grows with it. File pages go through
+    the page cache, not the process. Returns the result opened read-only
+    as a memory map (pages are only read in when used).
+    """
+    a = _NpyFile(a_path)
+    try:
+        b = _NpyFile(b_path)
+    except Exception:
+        a.close()
+        raise
+    try:
+        if len(a.shape) != 2 or len(b.shape) != 2 or a.shape[1] != b.shape[0]:
+            raise ValueError(f"Cannot multiply {a.shape} by {b.shape}")
+        dtype = np.result_type(a.dtype, b.dtype, np.float64)
+        itemsize = np.dtype(dtype).itemsize
+        t = tile_size or tile_size_for_budget(memory_budget, itemsize)
+        rows, inner = a.shape
+        cols = b.shape[1]
+        th, tw, tk = min(t, rows), min(t, cols), min(t, inner)
+
+        # Flat buffers, every (edge) tile is a contiguous view into them
+        a_buf = np.empty(th * tk, dtype=dtype)
+        b_buf = np.empty(tk * tw, dtype=dtype)
+        acc_buf = np.empty(th * tw, dtype=dtype)
+        prod_buf = np.empty(th * tw, dtype=dtype)
+        # Rows of an operand whose dtype differs are read here and converted
+        a_scratch = None if a.dtype == dtype else np.empty(tk, dtype=a.dtype)
+        b_scratch = None if b.dtype == dtype else np.empty(tw, dtype=b.dtype)
+
+        with open(out_path, "wb", buffering=0) as out:
+            np.lib.format.write_array_header_2_0(out, {
+                "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                "fortran_order": False,
+                "shape": (rows, cols),
+            })
+            out_offset = out.tell()
+            out.truncate(out_offset + rows * cols * itemsize)
+            for i in range(0, rows, t):
+                checkpoint("compute", 100 * i / rows)
+                h = min(t, rows - i)
+                for j in range(0, cols, t):
+                    w = min(t, cols - j)
+                    acc = acc_buf[:h * w].reshape(h, w)
+                    prod = prod_buf[:h * w].reshape(h, w)
+                    acc[...] = 0
+                    for k in range(0, inner, t):
+                        d = min(t, inner - k)
+                        a_tile = a_buf[:h * d].reshape(h, d)
+                        b_tile = b_buf[:d * w].reshape(d, w)
+                        a.read(a_tile, i, k, a_scratch)
+                        b.read(b_tile, k, j, b_scratch)
+                        np.matmul(a_tile, b_tile, out=prod)
+                        acc += prod
+                    for r in range(h):
+                        out.seek(out_offset + ((i + r) * cols + j) * itemsize)
+                        out.write(acc[r])
+                    out.flush()
+    finally:
+        a.close()
+        b.close()
+    return np.load(out_path, mmap_mode="r")
@@ -0,0 +1,179 @@
+# parallel.py
+# Multi-process tiled multiplication. A, B and C live in shared memory so
+# workers attach to them by name instead of receiving pickled copies; each
+# task only carries the block names and the corners of the output tile it
+# should fill.
+#
+# The pool is started once per process and kept: spawning workers costs far
+# more than a mid-sized product. Products below PARALLEL_MIN_SIZE stay on
+# BLAS, the copies into shared memory would cost more than they save.
+#
+# Workers run single-threaded BLAS: the pool is the parallelism, N workers
+# each running a full BLAS thread pool would oversubscribe the cores. BLAS
+# reads its thread count once, when it is loaded, so this has to be in a
+# worker's environment when it starts; a forked worker would inherit the
+# parent's already loaded BLAS instead.
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from multiprocessing import context, shared_memory
+
+import numpy as np
+
+from .progress import checkpoint
+
+DEFAULT_TILE_SIZE = 512
+
+# Smallest dimension from which parallel_matmul() uses the pool
+PARALLEL_MIN_SIZE = 1024
+
+# Read by OpenBLAS, OpenMP builds and MKL when they load
+BLAS_THREAD_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+# The process's pool and its size; one product at a time
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+_environ_lock = threading.Lock()
+
+
+def _to_shared(arr):
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+    view[...] = arr
+    return shm
+
+
+def _multiply_tile(specs, tile):
+    blocks = {name: shared_memory.SharedMemory(name=shm_name) for name, (shm_name, _) in specs.items()}
+    try:
+        a, b, c = (np.ndarray(specs[name][1], dtype=float, buffer=blocks[name].buf) for name in "abc")
+        i0, i1, j0, j1 = tile
+        np.matmul(a[i0:i1], b[:, j0:j1], out=c[i0:i1, j0:j1])
+        del a, b, c  # the views must go before the blocks are closed
+    finally:
+        for shm in blocks.values():
+            shm.close()
+    return tile
+
+
+@contextmanager
+def _single_threaded_blas():
+    """BLAS variables at 1 in this process's environment, restored on exit"""
+    with _environ_lock:
+        saved = {var: os.environ.get(var) for var in BLAS_THREAD_VARIABLES}
+        os.environ.update({var: "1" for var in BLAS_THREAD_VARIABLES})
+        try:
+            yield
+        finally:
+            for var, value in saved.items():
+                if value is None:
+                    os.environ.pop(var, None)
+                else:
+                    os.environ[var] = value
+
+
+class _WorkerProcess(context.SpawnProcess):
+    """A spawned process that starts with single-threaded BLAS
+
+    The variables are set only while the child is launched, which is when
+    it copies the environment; this process's BLAS is already loaded and
+    keeps its threads.
+    """
+
+    @staticmethod
+    def _Popen(process_obj):
+        with _single_threaded_blas():
+            return context.SpawnProcess._Popen(process_obj)
+
+
+class _WorkerContext(context.SpawnContext):
+    Process = _WorkerProcess
+
+
+def _worker_pool(workers):
+    """The process's worker pool, made on first use or for another size
+
+    Workers are spawned as tiles need them and then kept. Call with
+    _pool_lock held.
+    """
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        _drop_pool()
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=_WorkerContext())
+        _pool_workers = workers
+    return _pool
+
+
+def _drop_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+    _pool, _pool_workers = None, 0
+
+
+def shutdown_pool():
+    """Stop the worker pool, the next parallel product starts a new one"""
+    with _pool_lock:
+        _drop_pool()
+
+
+atexit.register(shutdown_pool)
+
+
+def tiles(rows, cols, tile_size):
+    """Row/column tiles (i0, i1, j0, j1) covering a rows×cols output"""
+    return [(i, min(i + tile_size, rows), j, min(j + tile_size, cols))
+            for i in range(0, rows, tile_size)
+            for j in range(0, cols, tile_size)]
+
+
+def parallel_matmul(a, b, workers=None, tile_size=DEFAULT_TILE_SIZE, min_size=PARALLEL_MIN_SIZE):
+    """C = A B split into output tiles across the process pool
+
+    workers defaults to os.cpu_count(). Products with a dimension below
+    min_size, or a single worker, are left to BLAS. Operands are copied
+    once into shared memory, results are written straight into a shared C.
+    """
+    a = np.ascontiguousarray(a, dtype=float)
+    b = np.ascontiguousarray(b, dtype=float)
+    if a.ndim != 2 or b.ndim != 2 or a.shape[1] != b.shape[0]:
+        raise ValueError(f"Cannot multiply {a.shape} by {b.shape}")
+    if tile_size < 1:
+        raise ValueError("tile_size must be positive")
+    workers = workers or os.cpu_count() or 1
+    rows, cols = a.shape[0], b.shape[1]
+    if workers == 1 or rows * cols == 0 or min(rows, a.shape[1], cols) < min_size:
+        return a @ b
+
+    blocks = {"a": _to_shared(a), "b": _to_shared(b),
+              "c": shared_memory.SharedMemory(create=True, size=max(rows * cols * 8, 1))}
+    shapes = {"a": a.shape, "b": b.shape, "c": (rows, cols)}
+    specs = {name: (shm.name, shapes[name]) for name, shm in blocks.items()}
+    try:
+        work = tiles(rows, cols, tile_size)
+        with _pool_lock:
+            pool = _worker_pool(workers)
+            futures = [pool.submit(_multiply_tile, specs, tile) for tile in work]
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    future.result()
+                    checkpoint("compute", 100 * done / len(work))
+            except BaseException as err:
+                # drop the queued tiles, the running ones have to finish
+                # before the blocks are unlinked
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+                if isinstance(err, BrokenProcessPool):
+                    _drop_pool()  # a worker died, start afresh next time
+                raise
+        return np.ndarray((rows, cols), dtype=float, buffer=blocks["c"].buf).copy()
+    finally:
+        for shm in blocks.values():
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,59 @@
+# progress.py
+# Cooperative cancellation and progress reporting for long computations.
+# A CancelToken is installed for the current thread with use_token(); engine
+# loops call checkpoint() between chunks of work, which raises Cancelled once
+# the token is cancelled and forwards progress to whoever is listening.
+# Without an installed token checkpoint() is a single attribute lookup.
+import threading
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+class Cancelled(Exception):
+    """Raised inside a computation whose token was cancelled"""
+
+
+class CancelToken:
+    def __init__(self, on_progress=None):
+        self._event = threading.Event()
+        self.on_progress = on_progress
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+    def report(self, phase, percent):
+        if self.on_progress is not None:
+            self.on_progress(phase, int(percent))
+
+
+def current_token():
+    return getattr(_local, "token", None)
+
+
+@contextmanager
+def use_token(token):
+    previous = current_token()
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
+
+
+def checkpoint(phase=None, percent=None):
+    """Raise Cancelled if the current token is cancelled, report progress if given"""
+    token = getattr(_local, "token", None)
+    if token is None:
+        return
+    token.check()
+    if phase is not None:
+        token.report(phase, percent or 0)
@@ -1,4 +1,5 @@
 # main.py
+from ui.startup import timer, prepare_application, watch_first_paint  # first, starts the clock
 import sys
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QRadioButton,
@@ -7,9 +8,8 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtGui  import QFont
 from PyQt6.QtCore import Qt, QSize
 
-# Import your two calculator windows directly:
-from two.main   import TwoMainWindow   # two/main.py defines class TwoWindow(QMainWindow)
-from three.main import MainWindow # three/main.py defines class ThreeWindow(QMainWindow)
+timer.mark("qt imported")
+# The calculator windows (and their operations) are imported once chosen
 
 class MatrixSelector(QWidget):
     def __init__(self):
@@ -95,15 +95,21 @@ class MatrixSelector(QWidget):
     def launch_calculator(self):
         # pick the class, create & show it on the same event loop:
         if self.radio2.isChecked():
+            from two.main import TwoMainWindow   # two/main.py defines class TwoMainWindow(QMainWindow)
             self.child = TwoMainWindow()
         else:
+            from three.main import MainWindow    # three/main.py defines class MainWindow(QMainWindow)
             self.child = MainWindow()
 
         self.child.show()
         self.close()
 
 if __name__ == '__main__':
+    prepare_application()
     app = QApplication(sys.argv)
+    timer.mark("application")
     w = MatrixSelector()
+    timer.mark("launcher built")
+    watch_first_paint(w)
     w.show()
     sys.exit(app.exec())
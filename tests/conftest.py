@@ -0,0 +1,5 @@
+# The calculator is run from the repository root, not installed
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
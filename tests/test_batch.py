@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from engine.batch import as_stack, batch_adjugate, batch_determinant, batch_inverse
+from engine.core import adjugate, determinant
+
+
+def _integer_stack(n, count=50, seed=0):
+    return np.random.default_rng(seed).integers(-9, 10, (count, n, n)).astype(float)
+
+
+@pytest.mark.parametrize("n", [1, 2, 3])
+def test_closed_forms_match_per_matrix_code(n):
+    stack = _integer_stack(n)
+    # integer input stays exact in the closed forms
+    assert batch_determinant(stack).tolist() == [determinant(m) for m in stack]
+    np.testing.assert_array_equal(batch_adjugate(stack), [adjugate(m) for m in stack])
+
+
+@pytest.mark.parametrize("n", [4, 5])
+def test_larger_matrices(n):
+    stack = _integer_stack(n)
+    np.testing.assert_allclose(batch_determinant(stack), np.linalg.det(stack), rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(batch_adjugate(stack), [adjugate(m) for m in stack], atol=1e-6)
+
+
+@pytest.mark.parametrize("n", [2, 3, 4, 5])
+def test_adjugate_of_singular_matrices(n):
+    stack = _integer_stack(n, count=10)
+    stack[:, -1] = stack[:, 0] + stack[:, 1] if n > 2 else 2 * stack[:, 0]
+    adj = batch_adjugate(stack)
+    assert np.isfinite(adj).all()
+    # A Adj(A) = |A| I = 0, and the adjugate of a rank n-1 matrix is not zero
+    np.testing.assert_allclose(stack @ adj, 0, atol=1e-6)
+    np.testing.assert_allclose(adj, [adjugate(m) for m in stack], atol=1e-6)
+
+
+def test_inverse_masks_singular_matrices():
+    stack = _integer_stack(3)
+    stack[0] = [[1, 2, 3], [2, 4, 6], [0, 1, 1]]
+    det, adj, inv = batch_inverse(stack)
+    ok = det != 0
+    assert not ok[0] and np.isnan(inv[0]).all()
+    np.testing.assert_allclose(stack[ok] @ inv[ok], np.broadcast_to(np.eye(3), stack[ok].shape), atol=1e-9)
+
+
+def test_flat_rows_need_n():
+    # four flat 2x2 answers look exactly like one 4x4 matrix
+    flat = np.arange(16.0).reshape(4, 4) ** 2
+    with pytest.raises(ValueError):
+        as_stack(flat)
+    det = batch_determinant(flat, n=2)
+    assert det.tolist() == [determinant(row.reshape(2, 2)) for row in flat]
+    nine = _integer_stack(3, count=9).reshape(9, 9)
+    assert batch_determinant(nine, n=3).shape == (9,)
+    with pytest.raises(ValueError):
+        batch_determinant(flat, n=3)
+
+
+def test_single_matrix_is_a_stack_of_one():
+    m = np.array([[2.0, 1.0], [7.0, 4.0]])
+    assert batch_determinant(m[np.newaxis]).tolist() == [1.0]
@@ -0,0 +1,107 @@
+import random
+from fractions import Fraction
+
+import pytest
+
+from engine.core import SingularMatrixError
+from engine.exact import as_exact_matrix, exact_determinant, exact_inverse, parse_exact
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("3", Fraction(3)),
+    (" -2/5 ", Fraction(-2, 5)),
+    ("0.75", Fraction(3, 4)),
+])
+def test_parse_exact(text, expected):
+    assert parse_exact(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "abc", "1/0", "0/0"])
+def test_parse_exact_rejects_with_value_error(text):
+    with pytest.raises(ValueError):
+        parse_exact(text)
+
+
+def _gauss_jordan(rows):
+    """Reference (det, inverse or None) by plain Fraction Gauss-Jordan"""
+    n = len(rows)
+    m = [[Fraction(x) for x in row] + [Fraction(int(i == j)) for j in range(n)] for i, row in enumerate(rows)]
+    det = Fraction(1)
+    for k in range(n):
+        p = next((i for i in range(k, n) if m[i][k] != 0), None)
+        if p is None:
+            return Fraction(0), None
+        if p != k:
+            m[k], m[p] = m[p], m[k]
+            det = -det
+        pivot = m[k][k]
+        det *= pivot
+        m[k] = [x / pivot for x in m[k]]
+        for i in range(n):
+            if i != k and m[i][k] != 0:
+                factor = m[i][k]
+                m[i] = [x - factor * y for x, y in zip(m[i], m[k])]
+    return det, [row[n:] for row in m]
+
+
+def _random_matrix(rng, n, fractions):
+    def value():
+        numerator = rng.randint(-9, 9)
+        return Fraction(numerator, rng.randint(1, 7)) if fractions else Fraction(numerator)
+    return [[value() for _ in range(n)] for _ in range(n)]
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4, 6])
+@pytest.mark.parametrize("fractions", [False, True])
+def test_matches_fraction_gauss_jordan(n, fractions):
+    rng = random.Random(n * 10 + fractions)
+    for _ in range(10):
+        rows = _random_matrix(rng, n, fractions)
+        det, inv = _gauss_jordan(rows)
+        assert exact_determinant(rows) == det
+        if inv is None:
+            with pytest.raises(SingularMatrixError):
+                exact_inverse(rows)
+        else:
+            assert exact_inverse(rows) == inv
+
+
+def test_zero_pivots_need_row_swaps():
+    rows = [[0, 2, 1], [0, 0, 3], [4, 1, 0]]
+    det, inv = _gauss_jordan(rows)
+    assert exact_determinant(rows) == det == 24
+    assert exact_inverse(rows) == inv
+
+
+def test_rows_scaled_by_different_denominators():
+    rows = [[Fraction(1, 2), Fraction(1, 3)], [Fraction(1, 5), Fraction(-7, 4)]]
+    det, inv = _gauss_jordan(rows)
+    assert exact_determinant(rows) == det
+    assert exact_inverse(rows) == inv
+    assert exact_inverse(["0.5", "1/3", "0.2", "-7/4"]) == inv
+
+
+@pytest.mark.parametrize("rows", [
+    [[1, 2], [2, 4]],
+    [[1, 2, 3], [4, 5, 6], [7, 8, 9]],
+    [[0, 0], [0, 0]],
+    [[Fraction(1, 3), 1, 2], [Fraction(2, 3), 2, 4], [5, 6, 7]],
+])
+def test_singular(rows):
+    assert exact_determinant(rows) == 0
+    with pytest.raises(SingularMatrixError):
+        exact_inverse(rows)
+
+
+def test_integer_input_gives_integer_results():
+    det = exact_determinant([3, 8, 4, 6])
+    assert det == -14 and det.denominator == 1
+    assert exact_inverse([2, 1, 7, 4]) == [[4, -1], [-7, 2]]
+
+
+def test_as_exact_matrix_shape():
+    assert as_exact_matrix([1, 2, 3, 4]) == [[1, 2], [3, 4]]
+    with pytest.raises(ValueError):
+        as_exact_matrix([1, 2, 3])
+    with pytest.raises(ValueError):
+        as_exact_matrix([[1, 2], [3]])
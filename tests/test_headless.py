@@ -0,0 +1,13 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_engine_does_not_import_qt():
+    # a fresh interpreter, the test session itself may have loaded PyQt
+    code = ("import sys, engine, engine.bench; "
+            "print(sorted(m for m in sys.modules if m.split('.')[0] in ('PyQt6', 'ui')))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from engine.core import SingularMatrixError, determinant, inverse, rank, solve
+from engine.exact import exact_determinant
+from engine.lu import FactorizationCache, LUFactorization, factorization_cache
+
+
+def _integer_matrix(n, seed=0):
+    return np.random.default_rng(seed).integers(-9, 10, (n, n)).astype(float)
+
+
+@pytest.mark.parametrize("n", [1, 4, 7, 12])
+def test_matches_reference(n):
+    a = _integer_matrix(n, seed=n)
+    lu = LUFactorization(a)
+    exact = exact_determinant(a.astype(int).tolist())
+    assert lu.det() == pytest.approx(float(exact), rel=1e-9, abs=1e-9)
+    np.testing.assert_allclose(lu.inverse() @ a, np.eye(n), atol=1e-9)
+    b = np.arange(n * 2, dtype=float).reshape(n, 2)
+    np.testing.assert_allclose(a @ lu.solve(b), b, atol=1e-9)
+    np.testing.assert_allclose(a @ lu.solve(b[:, 0]), b[:, 0], atol=1e-9)
+    assert lu.rank() == n
+
+
+def test_pivoting_handles_a_zero_leading_entry():
+    a = np.array([[0.0, 2.0, 1.0], [1.0, 1.0, 0.0], [3.0, 0.0, 1.0]])
+    lu = LUFactorization(a)
+    assert lu.det() == pytest.approx(float(exact_determinant(a.astype(int).tolist())))
+    np.testing.assert_allclose(lu.inverse(), np.linalg.inv(a), atol=1e-12)
+
+
+@pytest.mark.parametrize("a, expected_rank", [
+    (np.zeros((4, 4)), 0),
+    (np.outer([1.0, 2, 3, 4], [1.0, -1, 2, 5]), 1),
+    (np.array([[1.0, 2, 3, 4], [2, 4, 6, 8], [0, 1, 1, 1], [1, 3, 4, 5]]), 2),
+    (np.array([[1.0, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12], [1, 0, 0, 1]]), 3),
+])
+def test_singular_matrices_fall_back_to_svd_rank(a, expected_rank):
+    lu = LUFactorization(a)
+    assert lu.singular
+    assert lu.det() == pytest.approx(0.0, abs=1e-9)
+    assert lu.rank() == expected_rank
+    with pytest.raises(SingularMatrixError):
+        lu.solve(np.ones(4))
+
+
+def test_cache_is_keyed_by_content():
+    cache = FactorizationCache()
+    a = _integer_matrix(5)
+    first = cache.factorize(a)
+    assert cache.factorize(a.copy()) is first
+    assert cache.factorize(a.T.copy().T) is first  # same values, other layout
+    b = a.copy()
+    b[0, 0] += 1
+    assert cache.factorize(b) is not first
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = FactorizationCache(maxsize=2)
+    a, b, c = (_integer_matrix(4, seed) for seed in range(3))
+    cache.factorize(a)
+    cache.factorize(b)
+    cache.factorize(a)      # a is now the most recent
+    cache.factorize(c)      # evicts b
+    assert len(cache) == 2
+    misses = cache.misses
+    cache.factorize(a)
+    assert cache.misses == misses
+    cache.factorize(b)
+    assert cache.misses == misses + 1
+
+
+def test_cached_inverse_is_not_shared_with_callers():
+    lu = LUFactorization(_integer_matrix(4))
+    first = lu.inverse()
+    first[:] = 0
+    assert np.any(lu.inverse() != 0)
+
+
+def test_operations_share_one_factorization():
+    factorization_cache.clear()
+    a = _integer_matrix(6, seed=3)
+    det = determinant(a)
+    inv = inverse(a)
+    x = solve(a, np.ones(6))
+    assert rank(a) == 6
+    assert (factorization_cache.misses, factorization_cache.hits) == (1, 3)
+    assert det == pytest.approx(float(exact_determinant(a.astype(int).tolist())), rel=1e-9)
+    np.testing.assert_allclose(a @ inv, np.eye(6), atol=1e-9)
+    np.testing.assert_allclose(a @ x, np.ones(6), atol=1e-9)
+
+
+def test_inverse_of_singular_matrix_raises():
+    a = np.array([[1.0, 2, 3, 4], [2, 4, 6, 8], [0, 1, 1, 1], [1, 3, 4, 5]])
+    with pytest.raises(SingularMatrixError):
+        inverse(a)
+    assert rank(a) == 2
+    assert determinant(a) == pytest.approx(0.0, abs=1e-9)
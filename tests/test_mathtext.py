@@ -0,0 +1,90 @@
+import importlib
+import inspect
+import threading
+
+import pytest
+
+pytest.importorskip("matplotlib")
+pytest.importorskip("PyQt6.QtWidgets")
+
+from ui.mathtext import MathTextRenderer, parse  # noqa: E402
+from ui.steps import VERBOSITY  # noqa: E402
+from ui.theme import palette, resolve  # noqa: E402
+from ui.typeset_cache import MATH_PATTERN  # noqa: E402
+
+OPERATIONS = (
+    "two.addition:AdditionWindow",
+    "two.subtraction:SubtractionWindow",
+    "two.multiplication:MultiplicationWindow",
+    "two.determinent:DeterminantWindow",
+    "two.inverse:InverseWindow",
+    "two.inv_row:InvRowWindow",
+    "three.addition:AdditionWindow",
+    "three.subtraction:SubtractionWindow",
+    "three.multiplication:MultiplicationWindow",
+    "three.inverse:InverseWindow3x3",
+)
+
+# Integers, fractions and negatives; the determinants are non-zero
+INPUTS = ([2, -1, 0.5, 3, 1, 4, -2, 1.25, 5], [1, 2, 3, 0, 1, 4, 5, 6, 0])
+
+
+@pytest.fixture(scope="module")
+def renderer():
+    return MathTextRenderer(cache_dir=None)
+
+
+def test_trailing_control_space_is_kept():
+    (run, matrix), = [parse(r"\text{A =}\ \begin{bmatrix} 1 & 2 \\ 3 & 4 \end{bmatrix}").children]
+    assert run.tex == r"$\text{A =}\ $"
+
+
+@pytest.mark.parametrize("operation", OPERATIONS)
+def test_every_step_fragment_renders(operation, renderer):
+    module_name, class_name = operation.split(":")
+    module = importlib.import_module(module_name)
+    generate = getattr(module, class_name).generate_steps
+    arity = len(inspect.signature(generate.__wrapped__).parameters)
+    color = palette("dark")["text"]
+    for values in INPUTS:
+        values = [float(x) for x in (values * 2)[:arity]]
+        for level in VERBOSITY:
+            html = resolve(module.step_list(generate(*values, verbosity=level)).html(), "dark")
+            fragments = [next(g for g in m.groups() if g is not None) for m in MATH_PATTERN.finditer(html)]
+            assert fragments
+            for tex in fragments:
+                assert renderer.render(tex, color)
+
+
+def test_page_draws_missing_fragments_off_the_ui_thread(monkeypatch):
+    monkeypatch.setenv("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtCore import QThreadPool
+    from PyQt6.QtWidgets import QApplication
+
+    from ui.mathtext import MathTextPage, MathTextView
+
+    app = QApplication.instance() or QApplication([])
+    renderer = MathTextRenderer(cache_dir=None)
+    ui_draws = []
+    draw = renderer.draw
+
+    def tracking_draw(*args, **kwargs):
+        ui_draws.append(threading.current_thread() is threading.main_thread())
+        return draw(*args, **kwargs)
+
+    monkeypatch.setattr(renderer, "draw", tracking_draw)
+    view = MathTextView()
+    page = MathTextPage(view, lambda body, bg, text: body, renderer=renderer)
+    typeset = []
+    page.typeset.connect(lambda: typeset.append(1))
+    try:
+        page.show(r"<p>\(x^2\)</p><p>\[\frac{1}{2}\]</p>")
+        assert not view.images  # nothing drawn, the old page stays up
+        while not typeset:
+            QThreadPool.globalInstance().waitForDone(50)
+            app.processEvents()
+        assert len(view.images) == 2
+        assert ui_draws == [False, False]
+    finally:
+        page.release()
+        view.deleteLater()
@@ -0,0 +1,22 @@
+import math
+
+import numpy as np
+import pytest
+
+from engine.matmul import DEFAULT_CROSSOVER, blocked_matmul, matmul, strassen_matmul
+
+
+def test_strassen_is_off_by_default():
+    assert DEFAULT_CROSSOVER == math.inf
+
+
+@pytest.mark.parametrize("shape", [(7, 10, 6), (33, 36, 32), (64, 64, 64)])
+def test_kernels_match_numpy(shape):
+    rows, inner, cols = shape
+    rng = np.random.default_rng(0)
+    a, b = rng.standard_normal((rows, inner)), rng.standard_normal((inner, cols))
+    expected = a @ b
+    np.testing.assert_array_equal(matmul(a, b), expected)
+    np.testing.assert_allclose(matmul(a, b, crossover=4), expected, atol=1e-12)
+    np.testing.assert_allclose(strassen_matmul(a, b, crossover=4), expected, atol=1e-12)
+    np.testing.assert_allclose(blocked_matmul(a, b, block_size=8), expected, atol=1e-12)
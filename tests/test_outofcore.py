@@ -0,0 +1,115 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+import pytest
+
+from engine.core import multiply
+from engine.outofcore import outofcore_matmul, tile_size_for_budget
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _save(path, arr):
+    np.save(path, arr)
+    return str(path)
+
+
+@pytest.mark.parametrize("shape, tile_size", [
+    ((5, 7, 3), 2),
+    ((40, 33, 21), 16),
+    ((3, 3, 3), 64),
+])
+def test_matches_numpy(tmp_path, shape, tile_size):
+    rows, inner, cols = shape
+    rng = np.random.default_rng(0)
+    a = rng.standard_normal((rows, inner))
+    b = rng.standard_normal((inner, cols))
+    c = outofcore_matmul(_save(tmp_path / "a.npy", a), _save(tmp_path / "b.npy", b),
+                         str(tmp_path / "c.npy"), tile_size=tile_size)
+    np.testing.assert_allclose(c, a @ b, atol=1e-12)
+
+
+def test_uses_portable_file_calls(tmp_path, monkeypatch):
+    # positioned reads and writes do not exist on Windows
+    for name in ("pread", "preadv", "pwrite", "pwritev"):
+        monkeypatch.delattr(os, name, raising=False)
+    rng = np.random.default_rng(2)
+    a, b = rng.standard_normal((9, 6)), rng.standard_normal((6, 7))
+    c = outofcore_matmul(_save(tmp_path / "a.npy", a), _save(tmp_path / "b.npy", b),
+                         str(tmp_path / "c.npy"), tile_size=4)
+    np.testing.assert_allclose(c, a @ b, atol=1e-12)
+
+
+def test_multiply_streams_npy_paths(tmp_path):
+    rng = np.random.default_rng(3)
+    a, b = rng.standard_normal((30, 20)), rng.standard_normal((20, 10))
+    _save(tmp_path / "b.npy", b)
+    # str and pathlib paths alike, the budget allows 7x7 tiles
+    c = multiply(_save(tmp_path / "a.npy", a), tmp_path / "b.npy",
+                 out=tmp_path / "c.npy", memory_budget=4 * 8 * 64)
+    np.testing.assert_allclose(c, a @ b, atol=1e-12)
+    with pytest.raises(ValueError):
+        multiply(str(tmp_path / "a.npy"), b)
+
+
+def test_mixed_dtypes(tmp_path):
+    rng = np.random.default_rng(1)
+    a = rng.standard_normal((20, 12)).astype(np.float32)
+    b = rng.integers(-5, 5, (12, 9))
+    c = outofcore_matmul(_save(tmp_path / "a.npy", a), _save(tmp_path / "b.npy", b),
+                         str(tmp_path / "c.npy"), tile_size=5)
+    assert c.dtype == np.float64
+    np.testing.assert_allclose(c, a.astype(float) @ b, atol=1e-5)
+
+
+def test_shape_mismatch(tmp_path):
+    a = _save(tmp_path / "a.npy", np.ones((3, 4)))
+    with pytest.raises(ValueError):
+        outofcore_matmul(a, a, str(tmp_path / "c.npy"))
+
+
+def test_tile_size_counts_four_buffers():
+    t = tile_size_for_budget(16 * 1024 * 1024)
+    assert 4 * t * t * 8 <= 16 * 1024 * 1024
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/clear_refs"), reason="needs Linux /proc")
+def test_peak_rss_stays_within_budget(tmp_path):
+    n, budget = 2000, 16 * 1024 * 1024
+    for name in ("a", "b"):
+        arr = np.lib.format.open_memmap(tmp_path / f"{name}.npy", mode="w+", dtype=float, shape=(n, n))
+        for i in range(0, n, 250):
+            arr[i:i + 250] = np.random.default_rng(i).standard_normal((min(250, n - i), n))
+        arr.flush()
+        del arr
+
+    # Peak resident set of a fresh process, counted from after imports and
+    # a first product that sets up BLAS' workspace (VmHWM is reset through
+    # clear_refs)
+    script = textwrap.dedent(f"""
+        import numpy as np
+        from engine.outofcore import outofcore_matmul
+
+        def status(field):
+            with open("/proc/self/status") as fh:
+                return next(int(line.split()[1]) * 1024 for line in fh if line.startswith(field))
+
+        np.ones((1024, 1024)) @ np.ones((1024, 1024))
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+        base = status("VmRSS:")
+        outofcore_matmul({str(tmp_path / "a.npy")!r}, {str(tmp_path / "b.npy")!r},
+                         {str(tmp_path / "c.npy")!r}, memory_budget={budget})
+        print(status("VmHWM:") - base)
+    """)
+    # A fixed mmap threshold makes glibc return the warm-up product's memory
+    # instead of keeping it for the buffers, which would hide them
+    env = dict(os.environ, MALLOC_MMAP_THRESHOLD_="131072",
+               OPENBLAS_NUM_THREADS="1", OMP_NUM_THREADS="1", MKL_NUM_THREADS="1")
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    growth = int(result.stdout.split()[-1])
+    assert growth < budget, f"peak RSS grew by {growth / 2 ** 20:.1f} MB for a {budget / 2 ** 20:.0f} MB budget"
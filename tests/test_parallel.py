@@ -0,0 +1,96 @@
+import ctypes
+import os
+
+import numpy as np
+import pytest
+
+import engine.core
+import engine.parallel as parallel
+from engine.core import multiply
+from engine.parallel import BLAS_THREAD_VARIABLES, parallel_matmul, shutdown_pool
+from engine.progress import Cancelled, CancelToken, use_token
+
+# OpenBLAS thread count getters, by build (plain, 64-bit int, numpy's wheels)
+OPENBLAS_GETTERS = ("openblas_get_num_threads", "openblas_get_num_threads64_",
+                    "scipy_openblas_get_num_threads64_", "scipy_openblas_get_num_threads")
+
+
+def _blas_threads(_=None):
+    """(BLAS variables, OpenBLAS' own thread count or None) inside a worker"""
+    np.ones((64, 64)) @ np.ones((64, 64))
+    env = {var: os.environ.get(var) for var in BLAS_THREAD_VARIABLES}
+    try:
+        with open("/proc/self/maps") as fh:
+            libs = {line.split()[-1] for line in fh if "openblas" in line.lower()}
+    except OSError:
+        libs = set()
+    for path in libs:
+        lib = ctypes.CDLL(path)
+        for name in OPENBLAS_GETTERS:
+            getter = getattr(lib, name, None)
+            if getter is not None:
+                return env, getter()
+    return env, None
+
+
+def test_matches_numpy():
+    rng = np.random.default_rng(0)
+    a, b = rng.standard_normal((70, 50)), rng.standard_normal((50, 90))
+    np.testing.assert_allclose(parallel_matmul(a, b, workers=2, tile_size=32, min_size=0), a @ b, atol=1e-12)
+
+
+def test_pool_is_kept_between_products():
+    rng = np.random.default_rng(1)
+    a = rng.standard_normal((40, 40))
+    parallel_matmul(a, a, workers=2, tile_size=16, min_size=0)
+    pool = parallel._pool
+    np.testing.assert_allclose(parallel_matmul(a, a.T, workers=2, tile_size=16, min_size=0), a @ a.T, atol=1e-12)
+    assert parallel._pool is pool
+
+
+def test_small_products_stay_on_blas(monkeypatch):
+    def fail(workers):
+        raise AssertionError("pool used")
+
+    monkeypatch.setattr(parallel, "_worker_pool", fail)
+    a = np.ones((64, 64))
+    np.testing.assert_array_equal(parallel_matmul(a, a, workers=2), a @ a)
+
+
+def test_cancel_skips_the_remaining_tiles():
+    rng = np.random.default_rng(2)
+    a = rng.standard_normal((200, 200))
+    token = CancelToken(on_progress=lambda phase, percent: token.cancel())
+    with use_token(token), pytest.raises(Cancelled):
+        parallel_matmul(a, a, workers=2, tile_size=20, min_size=0)
+    # the pool is usable again right away
+    np.testing.assert_allclose(parallel_matmul(a, a, workers=2, tile_size=50, min_size=0), a @ a, atol=1e-10)
+
+
+def test_workers_run_single_threaded_blas(monkeypatch):
+    for var in BLAS_THREAD_VARIABLES:
+        monkeypatch.setenv(var, "4")
+    shutdown_pool()
+    with parallel._pool_lock:
+        results = parallel._worker_pool(2).map(_blas_threads, range(2))
+    for env, threads in results:
+        assert env == {var: "1" for var in BLAS_THREAD_VARIABLES}
+        assert threads in (None, 1)
+    # the parent's environment is left as it was
+    assert all(os.environ[var] == "4" for var in BLAS_THREAD_VARIABLES)
+
+
+def test_shape_mismatch():
+    with pytest.raises(ValueError):
+        parallel_matmul(np.ones((3, 4)), np.ones((3, 4)), workers=2, min_size=0)
+
+
+def test_multiply_dispatches_on_workers(monkeypatch):
+    calls = []
+    monkeypatch.setattr(engine.core, "parallel_matmul",
+                        lambda a, b, workers, tile_size: calls.append((workers, tile_size)) or a @ b)
+    a = np.ones((8, 8))
+    multiply(a, a)
+    assert calls == []
+    np.testing.assert_array_equal(multiply(a, a, workers=4, tile_size=256), a @ a)
+    assert calls == [(4, 256)]
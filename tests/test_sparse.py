@@ -0,0 +1,92 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import engine.core
+import engine.sparse
+from engine.core import multiply
+from engine.sparse import CSRMatrix, sparse_add, sparse_multiply, sparse_subtract
+
+
+def _sparse_dense(rng, shape, fill):
+    return rng.standard_normal(shape) * (rng.random(shape) < fill)
+
+
+def _dense(m):
+    return m.to_dense() if isinstance(m, CSRMatrix) else m
+
+
+def test_from_coo_sums_duplicates_and_drops_zeros():
+    m = CSRMatrix.from_coo([2, 0, 2, 1, 1], [1, 2, 1, 0, 0], [1.0, 4.0, 2.0, 5.0, -5.0], (3, 3))
+    np.testing.assert_array_equal(m.to_dense(), [[0, 0, 4], [0, 0, 0], [0, 3, 0]])
+    assert m.nnz == 2
+    np.testing.assert_array_equal(m.indptr, [0, 1, 1, 2])
+
+
+def test_empty_matrix():
+    m = CSRMatrix.from_coo([], [], [], (2, 3))
+    assert m.nnz == 0
+    np.testing.assert_array_equal(m.matmul_dense(np.ones((3, 4))), np.zeros((2, 4)))
+
+
+@pytest.mark.parametrize("fill", [0.0, 0.02, 0.3, 1.0])
+def test_products_match_dense(fill):
+    rng = np.random.default_rng(0)
+    a, b = _sparse_dense(rng, (30, 20), fill), _sparse_dense(rng, (20, 25), fill)
+    ca, cb = CSRMatrix.from_dense(a), CSRMatrix.from_dense(b)
+    np.testing.assert_allclose(ca.matmul(cb).to_dense(), a @ b, atol=1e-12)
+    np.testing.assert_allclose(ca.matmul_dense(b), a @ b, atol=1e-12)
+    np.testing.assert_allclose(ca.matvec(b[:, 0]), a @ b[:, 0], atol=1e-12)
+    np.testing.assert_allclose(_dense(sparse_multiply(ca, cb)), a @ b, atol=1e-12)
+    c = _sparse_dense(rng, (30, 20), fill)
+    np.testing.assert_allclose(_dense(sparse_add(a, c)), a + c, atol=1e-12)
+    np.testing.assert_allclose(_dense(sparse_subtract(a, c)), a - c, atol=1e-12)
+
+
+def test_matmul_dense_chunks_rows_across_boundaries(monkeypatch):
+    # chunks of 3 non-zeros split the 10-entry row and span short rows
+    monkeypatch.setattr(engine.sparse, "CHUNK_ITEMS", 3 * 4)
+    rng = np.random.default_rng(1)
+    a = _sparse_dense(rng, (6, 12), 0.4)
+    a[2] = rng.standard_normal(12)
+    b = rng.standard_normal((12, 4))
+    np.testing.assert_allclose(CSRMatrix.from_dense(a).matmul_dense(b), a @ b, atol=1e-12)
+
+
+def test_matmul_dense_temporaries_stay_bounded():
+    rng = np.random.default_rng(2)
+    n = 400
+    a = CSRMatrix.from_dense(_sparse_dense(rng, (n, n), 0.05))
+    b = rng.standard_normal((n, n))
+    tracemalloc.start()
+    try:
+        out = a.matmul_dense(b)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # the output, the row index of every non-zero and a few chunk temporaries;
+    # gathering every product at once would be nnz × n floats (25 MB here)
+    assert a.nnz * n * 8 > 20 * 1024 * 1024
+    assert peak < out.nbytes + a.nnz * 8 + 4 * engine.sparse.CHUNK_ITEMS * 8
+    np.testing.assert_allclose(out, a.to_dense() @ b, atol=1e-10)
+
+
+def test_multiply_keeps_moderately_sparse_dense_operands_on_blas(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("sparse path taken")
+
+    monkeypatch.setattr(engine.core, "sparse_multiply", fail)
+    rng = np.random.default_rng(3)
+    a, b = _sparse_dense(rng, (300, 300), 0.05), rng.standard_normal((300, 300))
+    np.testing.assert_allclose(multiply(a, b), a @ b)
+
+
+def test_multiply_takes_sparse_path_when_it_is_cheaper(monkeypatch):
+    calls = []
+    monkeypatch.setattr(engine.core, "sparse_multiply",
+                        lambda a, b: calls.append(1) or sparse_multiply(a, b))
+    rng = np.random.default_rng(4)
+    a, b = _sparse_dense(rng, (300, 300), 0.001), rng.standard_normal((300, 300))
+    np.testing.assert_allclose(multiply(a, b), a @ b, atol=1e-12)
+    assert calls
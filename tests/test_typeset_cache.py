@@ -0,0 +1,30 @@
+from ui.typeset_cache import TypesetCache, css_rules
+
+BASE = "mjx-container[jax=\"CHTML\"] { line-height: 0; }"
+BRACE = 'mjx-c.mjx-c7B::before { padding: 0.75em 0.5em 0.25em 0; content: "{"; }'
+PAREN = 'mjx-c.mjx-c28::before { content: "("; }'
+
+
+def test_css_rules_skip_braces_in_strings_and_comments():
+    font = '@font-face /* { */ { font-family: MJXZERO; src: url("zero}.woff"); }'
+    media = "@media print { mjx-container { display: none } }"
+    assert css_rules("\n".join([BASE, BRACE, font, media])) == [BASE, BRACE, font, media]
+
+
+def test_harvested_sheets_are_merged():
+    cache = TypesetCache()
+    cache.store([], "t", "\n".join([BASE, BRACE, PAREN]))
+    # a shorter sheet from another page still brings a rule of its own
+    cache.store([], "t", "\n".join([BASE, 'mjx-c.mjx-c78::before { content: "x"; }']))
+    assert css_rules(cache.stylesheet) == [BASE, BRACE, PAREN, 'mjx-c.mjx-c78::before { content: "x"; }']
+
+
+def test_stylesheet_survives_save_and_load(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = TypesetCache(path)
+    cache.store([["x", True, "<mjx-container>x</mjx-container>"]], "t", "\n".join([BASE, BRACE]))
+    cache.save()
+    restored = TypesetCache(path)
+    restored.store([], "t", PAREN)
+    assert css_rules(restored.stylesheet) == [BASE, BRACE, PAREN]
+    assert len(restored) == 1
@@ -1,6 +1,112 @@
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
-from PyQt6.QtWebEngineWidgets import QWebEngineView
+
+import engine
+from engine.progress import checkpoint
+from ui.progress import JobProgress
+from ui.stepview import create_step_view
+from ui.steps import Step, StepList, matrix, verbosity_levels
+from ui.theme import STEP_COLORS
+from ui.mathjax import mathjax_script
+from ui.verbosity import VerbosityBox
+from ui.worker import run_steps
+
+
+COLORS = dict(STEP_COLORS, error="#ff0000")
+
+
+def format_num(num):
+    if isinstance(num, float) and num.is_integer():
+        return str(int(num))
+    return f"{num:.2f}"
+
+
+def render_step(step):
+    colors = COLORS
+    kind = step.kind
+
+    if kind == "singular":
+        return fr"\[\color{{{colors['error']}}}\text{{Inverse does not exist (|A| = 0)}}\]"
+    if kind == "exists":
+        return fr"\[\color{{{colors['header']}}}\text{{Since }} |A| \neq 0, A^{{-1}} \text{{ exists.}}\]"
+    if kind == "heading":
+        return fr"\[\color{{{colors['header']}}}\text{{{step.operands[0]}}}\]"
+    if kind == "minor":
+        row, col = step.operands
+        return fr"\[\color{{{colors['calculation']}}}M_{{{row + 1}{col + 1}}} = {format_num(step.result)}\]"
+    if kind == "minor_matrix":
+        cells = list(map(format_num, step.result))
+        return fr"\[\color{{{colors['matrix']}}}\text{{Minor of A =}}\ {matrix(cells, 'bmatrix')}\]"
+    if kind == "cofactor":
+        row, col, sign, minor = step.operands
+        return (fr"\[\color{{{colors['calculation']}}}A_{{{row + 1}{col + 1}}} = "
+                fr"({'+' if sign == 1 else '-'}1){format_num(minor)} = {format_num(step.result)}\]")
+    if kind == "cofactor_matrix":
+        cells = list(map(format_num, step.result))
+        return fr"\[\color{{{colors['matrix']}}}\text{{Cofactor of A =}}\ {matrix(cells, 'bmatrix')}\]"
+    if kind == "adjoint":
+        cells = list(map(format_num, step.result))
+        return fr"\[\color{{{colors['matrix']}}}\text{{Adj(A) =}}\ {matrix(cells, 'bmatrix')}\]"
+    if kind == "formula":
+        adjoint, det = step.operands
+        return (
+            fr"\[\color{{{colors['calculation']}}}A^{{-1}} = \frac{{1}}{{|A|}} \times \text{{Adj}}(A) = "
+            fr"\frac{{1}}{{{format_num(det)}}} \times {matrix(list(map(format_num, adjoint)), 'bmatrix')}\]"
+        )
+    if kind == "scalar":
+        adjoint, inv_det = step.operands
+        return (
+            fr"\[\color{{{colors['calculation']}}}A^{{-1}} = "
+            fr"{format_num(inv_det)} \times {matrix(list(map(format_num, adjoint)), 'bmatrix')}\]"
+        )
+    if kind == "final":
+        cells = list(map(format_num, step.result))
+        return fr"\[\color{{{colors['final']}}}A^{{-1}} = {matrix(cells, 'bmatrix')}\]"
+
+    a_f, b_f, c_f, d_f, e_f, f_f, g_f, h_f, i_f = map(format_num, step.operands)
+    if kind == "matrix":
+        return (
+            fr"\[\color{{{colors['header']}}}\text{{Let }}A = "
+            fr"\color{{{colors['matrix']}}}"
+            fr"\begin{{bmatrix}} {a_f} & {b_f} & {c_f} \\ "
+            fr"{d_f} & {e_f} & {f_f} \\ {g_f} & {h_f} & {i_f} \end{{bmatrix}}\]"
+        )
+    if kind == "expand":
+        return (
+            fr"\[\color{{{colors['header']}}}|A| = {a_f}({e_f}×{i_f} - {f_f}×{h_f}) "
+            fr"- {b_f}({d_f}×{i_f} - {f_f}×{g_f}) + {c_f}({d_f}×{h_f} - {e_f}×{g_f})\]"
+        )
+    if kind == "minors_2x2":
+        m1, m2, m3 = map(format_num, step.result)
+        return fr"\[\color{{{colors['calculation']}}}|A| = {a_f}({m1}) - {b_f}({m2}) + {c_f}({m3})\]"
+    if kind == "terms":
+        t1, t2, t3 = map(format_num, step.result)
+        return fr"\[\color{{{colors['calculation']}}}|A| = {t1} - {t2} + {t3}\]"
+    # kind == "det"
+    return fr"\[\color{{{colors['calculation']}}}|A| = {format_num(step.result)}\]"
+
+
+# Steps kept at KEY verbosity: the matrices, not the entries they are built from
+KEY_STEPS = {"matrix", "det", "singular", "exists", "minor_matrix", "cofactor_matrix", "adjoint", "final"}
+
+
+def result_step(a, b, c, d, e, f, g, h, i):
+    """The final step alone, for RESULT verbosity: no minors, cofactors or adjoint"""
+    A = (a, b, c, d, e, f, g, h, i)
+    try:
+        inverse = engine.inverse(engine.as_matrix(A))
+    except engine.SingularMatrixError:
+        return Step("singular")
+    return Step("final", A, tuple(inverse.ravel().tolist()))
+
+
+def step_list(steps=()):
+    """The StepList generate_steps' records are collected in"""
+    return StepList(steps, render_step, separator="<hr>", head="""
+        <div style="text-align: center; padding: 20px;">
+            """, tail="""
+        </div>
+        """)
 
 
 class InverseWindow3x3(QWidget):
@@ -15,8 +121,6 @@ class InverseWindow3x3(QWidget):
     def update_theme(self, theme):
         self.current_theme = theme
         self.update_styles()
-        if hasattr(self, 'last_values'):
-            self.update_display()
 
     def update_styles(self, text_color=None):
         is_dark = self.current_theme == "dark"
@@ -40,23 +144,13 @@ class InverseWindow3x3(QWidget):
         for inp in self.all_inputs:
             inp.setStyleSheet(input_style)
 
-        if hasattr(self, 'last_html'):
-            self.web_view.setHtml(self.get_mathjax_template(self.last_html, bg_color, text_color))
+        if hasattr(self, 'step_page'):
+            self.step_page.set_theme(self.current_theme)
 
     def update_web_view_content(self, html):
-        is_dark = self.current_theme == "dark"
-        bg_color = "#0d1117" if is_dark else "#ffffff"
-        text_color = "#c9d1d9" if is_dark else "#1f1f1f"
-
-        self.web_view.page().runJavaScript(
-            "window.scrollY",
-            lambda pos: self.apply_theme_with_scroll(pos, html, bg_color, text_color)
-        )
-
-    def apply_theme_with_scroll(self, scroll_pos, html, bg_color, text_color):
-        styled_html = self.get_mathjax_template(html, bg_color, text_color)
-        self.web_view.setHtml(styled_html)
-        self.web_view.page().runJavaScript(f"window.scrollTo(0, {scroll_pos});")
+        # The page stays loaded, so the scroll position survives the update
+        self.step_page.set_theme(self.current_theme)
+        self.step_page.show(html)
 
     def format_number(self, num):
         if isinstance(num, float) and num.is_integer():
@@ -86,12 +180,22 @@ class InverseWindow3x3(QWidget):
             QPushButton:hover { background: #2ea043; }
         """)
         btn.clicked.connect(self.calculate)
-        layout.addWidget(btn)
+
+        # How much of the solution Calculate shows
+        self.verbosity_box = VerbosityBox()
+        button_row = QHBoxLayout()
+        button_row.addWidget(btn, 1)
+        button_row.addWidget(self.verbosity_box)
+        layout.addLayout(button_row)
+
+        # Progress of the running calculation (hidden when idle)
+        self.progress = JobProgress()
+        layout.addWidget(self.progress)
 
         # Steps Display
-        self.web_view = QWebEngineView()
-        self.web_view.setHtml(self.get_mathjax_template())
-        layout.addWidget(self.web_view, 1)
+        self.step_view, self.step_page = create_step_view(self.get_mathjax_template)
+        self.step_page.typeset.connect(self.progress.finish)
+        layout.addWidget(self.step_view, 1)
 
     def create_matrix_input(self):
         matrix = QWidget()
@@ -107,195 +211,75 @@ class InverseWindow3x3(QWidget):
         return matrix, inputs
 
     def calculate(self):
-        try:
-            values = [float(inp.text()) for inp in self.all_inputs]
-            a, b, c, d, e, f, g, h, i = values
-            steps = self.generate_steps(a, b, c, d, e, f, g, h, i)
-            self.last_html = steps
-            is_dark = self.current_theme == "dark"
-            bg_color = "#0d1117" if is_dark else "#ffffff"
-            text_color = "#c9d1d9" if is_dark else "#1f1f1f"
-            self.web_view.setHtml(self.get_mathjax_template(steps, bg_color, text_color))
-            self.last_values = values
-        except ValueError as err:
-            error_html = self.get_mathjax_template(
-                f"<div style='color: red'>⚠️ Please check and enter an integer value in each field correctly. All fields are required.</div>",
-                "#0d1117" if self.current_theme == "dark" else "#ffffff",
-                "#c9d1d9" if self.current_theme == "dark" else "#1f1f1f"
-            )
-            self.web_view.setHtml(error_html)
-
-    def update_display(self):
-        if hasattr(self, 'last_values'):
-            steps = self.generate_steps(*self.last_values)
-            self.web_view.setHtml(self.get_mathjax_template(steps))
-
-    def generate_steps(self, a, b, c, d, e, f, g, h, i):
-        is_dark = self.current_theme == "dark"
-        colors = {
-            'header': "#4192f0" if is_dark else "#d60326",
-            'matrix': "#db2c52" if is_dark else "#400612",
-            'calculation': "#0d9e66" if is_dark else "#bc4c00",
-            'final': "#291be3" if is_dark else "#8250df",
-            'error': "#ff0000"
-        }
+        run_steps(self, float, step_list)
+
+    def show_steps(self, steps, values):
+        self.last_steps = steps
+        self.progress.report("render", 100)
+        self.step_view.show_steps(steps)
+        self.last_values = values
 
-        format_num = lambda x: self.format_number(x)
-        elements = [a, b, c, d, e, f, g, h, i]
-        formatted = list(map(format_num, elements))
-        a_f, b_f, c_f, d_f, e_f, f_f, g_f, h_f, i_f = formatted
+    def show_error(self, e):
+        self.step_view.show_html(f"<div style='color: red'>⚠️ Please check and enter an integer value in each field correctly. All fields are required.</div>")
 
-        steps = []
+    @staticmethod
+    @verbosity_levels(KEY_STEPS, result_step)
+    def generate_steps(a, b, c, d, e, f, g, h, i):
+        A = (a, b, c, d, e, f, g, h, i)
 
         # Step 1: Matrix definition
-        matrix_def = (
-            fr"\color{{{colors['header']}}}\text{{Let }}A = "
-            fr"\color{{{colors['matrix']}}}"
-            fr"\begin{{bmatrix}} {a_f} & {b_f} & {c_f} \\ "
-            fr"{d_f} & {e_f} & {f_f} \\ {g_f} & {h_f} & {i_f} \end{{bmatrix}}"
-        )
-        steps.append(fr"\[{matrix_def}\]")
+        yield Step("matrix", A)
 
         # Step 2: Determinant calculation
-        det = a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
-        det_steps = [
-            fr"\color{{{colors['header']}}}|A| = {a_f}({e_f}×{i_f} - {f_f}×{h_f}) "
-            fr"- {b_f}({d_f}×{i_f} - {f_f}×{g_f}) + {c_f}({d_f}×{h_f} - {e_f}×{g_f})",
-
-            fr"\color{{{colors['calculation']}}}|A| = {a_f}({format_num(e * i - f * h)}) "
-            fr"- {b_f}({format_num(d * i - f * g)}) + {c_f}({format_num(d * h - e * g)})",
-
-            fr"\color{{{colors['calculation']}}}|A| = {format_num(a * (e * i - f * h))} "
-            fr"- {format_num(b * (d * i - f * g))} + {format_num(c * (d * h - e * g))}",
-
-            fr"\color{{{colors['calculation']}}}|A| = {format_num(det)}"
-        ]
-        steps.extend([fr"\[{s}\]" for s in det_steps])
+        yield Step("expand", A)
+        yield Step("minors_2x2", A, (e * i - f * h, d * i - f * g, d * h - e * g))
+        yield Step("terms", A, (a * (e * i - f * h), b * (d * i - f * g), c * (d * h - e * g)))
+        matrix = engine.as_matrix(A)
+        det = engine.determinant(matrix)
+        checkpoint("steps", 50)
+        yield Step("det", A, det)
 
         if det == 0:
-            steps.append(fr"\[\color{{{colors['error']}}}\text{{Inverse does not exist (|A| = 0)}}\]")
-        else:
-            # Step 3: Matrix of Minors with element labels
-            steps.append(
-                fr"\[\color{{{colors['header']}}}\text{{Since }} |A| \neq 0, A^{{-1}} \text{{ exists.}}\]")
-            steps.append(fr"\[\color{{{colors['header']}}}\text{{Matrix of Minors:}}\]")
-            minors = [
-                (0, 0, e * i - f * h), (0, 1, d * i - f * g), (0, 2, d * h - e * g),
-                (1, 0, b * i - c * h), (1, 1, a * i - c * g), (1, 2, a * h - b * g),
-                (2, 0, b * f - c * e), (2, 1, a * f - c * d), (2, 2, a * e - b * d)
-            ]
-
-            minor_steps = []
-            for row, col, val in minors:
-                minor_steps.append(
-                    fr"\color{{{colors['calculation']}}}M_{{{row + 1}{col + 1}}} = {format_num(val)}"
-                )
-            steps.extend([fr"\[{s}\]" for s in minor_steps])
-
-            # Display full minors matrix
-            minors_matrix = (
-                fr"\color{{{colors['matrix']}}}"
-                fr"\text{{Minor of A =}}\ \begin{{bmatrix}} "
-                fr"{format_num(minors[0][2])} & {format_num(minors[1][2])} & {format_num(minors[2][2])} \\ "
-                fr"{format_num(minors[3][2])} & {format_num(minors[4][2])} & {format_num(minors[5][2])} \\ "
-                fr"{format_num(minors[6][2])} & {format_num(minors[7][2])} & {format_num(minors[8][2])}"
-                fr"\end{{bmatrix}}"
-            )
-            steps.append(fr"\[{minors_matrix}\]")
-
-            # Step 4: Cofactor matrix with signs (corrected)
-            steps.append(fr"\[\color{{{colors['header']}}}\text{{Apply Cofactor Signs:}}\]")
-            signs = [1, -1, 1, -1, 1, -1, 1, -1, 1]
-            cofactors = [
-                (f"A_{{{row + 1}{col + 1}}}", sign * val, sign)
-                for (row, col, val), sign in zip(minors, signs)
-            ]
-
-            cofactor_steps = []
-            for (label, val, sign), (row, col, _) in zip(cofactors, minors):
-                cofactor_steps.append(
-                    fr"\color{{{colors['calculation']}}}{label} = ({'+' if sign == 1 else '-'}1){format_num(val / sign)} = {format_num(val)}"
-                )
-            steps.extend([fr"\[{s}\]" for s in cofactor_steps])
-
-            # Display full cofactor matrix
-            cofactor_matrix = (
-                fr"\color{{{colors['matrix']}}}"
-                fr"\text{{Cofactor of A =}}\ \begin{{bmatrix}} "
-                fr"{format_num(cofactors[0][1])} & {format_num(cofactors[1][1])} & {format_num(cofactors[2][1])} \\ "
-                fr"{format_num(cofactors[3][1])} & {format_num(cofactors[4][1])} & {format_num(cofactors[5][1])} \\ "
-                fr"{format_num(cofactors[6][1])} & {format_num(cofactors[7][1])} & {format_num(cofactors[8][1])}"
-                fr"\end{{bmatrix}}"
-            )
-            steps.append(fr"\[{cofactor_matrix}\]")
-
-            # Step 5: Adjoint Matrix (Transpose)
-            steps.append(fr"\[\color{{{colors['header']}}}\text{{Adjoint Matrix (Transpose of Cofactor):}}\]")
-            adjoint = [
-                cofactors[0][1], cofactors[3][1], cofactors[6][1],
-                cofactors[1][1], cofactors[4][1], cofactors[7][1],
-                cofactors[2][1], cofactors[5][1], cofactors[8][1]
-            ]
-
-            adjoint_matrix = (
-                fr"\color{{{colors['matrix']}}}\text{{Adj(A) =}}\ "
-                fr"\begin{{bmatrix}} "
-                fr"{format_num(adjoint[0])} & {format_num(adjoint[1])} & {format_num(adjoint[2])} \\ "
-                fr"{format_num(adjoint[3])} & {format_num(adjoint[4])} & {format_num(adjoint[5])} \\ "
-                fr"{format_num(adjoint[6])} & {format_num(adjoint[7])} & {format_num(adjoint[8])}"
-                fr"\end{{bmatrix}}"
-            )
-            steps.append(fr"\[{adjoint_matrix}\]")
-
-            # Step 6: Inverse Calculation
-            inv_det = 1 / det
-            steps.append(fr"\[\color{{{colors['header']}}}\text{{Inverse Formula:}}\]")
-            steps.append(
-                fr"\[\color{{{colors['calculation']}}}A^{{-1}} = \frac{{1}}{{|A|}} \times \text{{Adj}}(A) = "
-                fr"\frac{{1}}{{{format_num(det)}}} \times "
-                fr"\begin{{bmatrix}} "
-                fr"{format_num(adjoint[0])} & {format_num(adjoint[1])} & {format_num(adjoint[2])} \\ "
-                fr"{format_num(adjoint[3])} & {format_num(adjoint[4])} & {format_num(adjoint[5])} \\ "
-                fr"{format_num(adjoint[6])} & {format_num(adjoint[7])} & {format_num(adjoint[8])}"
-                fr"\end{{bmatrix}}\]"
-            )
-
-            # Step 7: Numerical inverse
-            steps.append(fr"\[\color{{{colors['header']}}}\text{{Scalar Multiplication:}}\]")
-            steps.append(
-                fr"\[\color{{{colors['calculation']}}}A^{{-1}} = "
-                fr"{format_num(inv_det)} \times "
-                fr"\begin{{bmatrix}} "
-                fr"{format_num(adjoint[0])} & {format_num(adjoint[1])} & {format_num(adjoint[2])} \\ "
-                fr"{format_num(adjoint[3])} & {format_num(adjoint[4])} & {format_num(adjoint[5])} \\ "
-                fr"{format_num(adjoint[6])} & {format_num(adjoint[7])} & {format_num(adjoint[8])}"
-                fr"\end{{bmatrix}}\]"
-            )
-
-            # Step 8: Final inverse matrix
-            final_inv = [format_num(x * inv_det) for x in adjoint]
-            final_matrix = (
-                fr"\color{{{colors['final']}}}A^{{-1}} = "
-                fr"\begin{{bmatrix}} "
-                fr"{final_inv[0]} & {final_inv[1]} & {final_inv[2]} \\ "
-                fr"{final_inv[3]} & {final_inv[4]} & {final_inv[5]} \\ "
-                fr"{final_inv[6]} & {final_inv[7]} & {final_inv[8]}"
-                fr"\end{{bmatrix}}"
-            )
-            steps.append(fr"\[{final_matrix}\]")
-
-        return f'''
-        <div style="text-align: center; padding: 20px;">
-            {"<hr>".join(steps)}
-        </div>
-        '''
+            yield Step("singular")
+            return
+
+        # Step 3: Matrix of Minors with element labels
+        yield Step("exists")
+        yield Step("heading", ("Matrix of Minors:",))
+        minors = engine.minors(matrix).ravel().tolist()
+        for n, value in enumerate(minors):
+            yield Step("minor", (n // 3, n % 3), value)
+        yield Step("minor_matrix", (), tuple(minors))
+
+        # Step 4: Cofactor matrix with signs
+        yield Step("heading", ("Apply Cofactor Signs:",))
+        signs = [1, -1, 1, -1, 1, -1, 1, -1, 1]
+        cofactors = tuple(sign * value for sign, value in zip(signs, minors))
+        for n, (sign, minor, cofactor) in enumerate(zip(signs, minors, cofactors)):
+            yield Step("cofactor", (n // 3, n % 3, sign, minor), cofactor)
+        yield Step("cofactor_matrix", (), cofactors)
+
+        # Step 5: Adjoint Matrix (Transpose)
+        yield Step("heading", ("Adjoint Matrix (Transpose of Cofactor):",))
+        adjoint = tuple(cofactors[col * 3 + row] for row in range(3) for col in range(3))
+        yield Step("adjoint", (), adjoint)
+
+        # Step 6: Inverse Calculation
+        yield Step("heading", ("Inverse Formula:",))
+        yield Step("formula", (adjoint, det))
+
+        # Step 7: Numerical inverse
+        yield Step("heading", ("Scalar Multiplication:",))
+        yield Step("scalar", (adjoint, 1 / det))
+
+        # Step 8: Final inverse matrix
+        yield Step("final", A, tuple(engine.inverse(matrix).ravel().tolist()))
 
     def get_mathjax_template(self, content="", bg_color="#0d1117", text_color="white"):
         return f"""
         <html>
         <head>
-            <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-            <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
+            {mathjax_script()}
             <style>
                 body {{ 
                     background-color: {bg_color}; 
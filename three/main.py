@@ -4,10 +4,18 @@ from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
 from PyQt6.QtGui import *
 
-from .addition       import AdditionWindow
-from .subtraction    import SubtractionWindow
-from .multiplication import MultiplicationWindow
-from .inverse import InverseWindow3x3
+from ui.mathjax import mathjax_script
+from ui.qss import APP_STYLESHEET, apply_theme, repolish, set_flag
+from ui.registry import LazyOperation
+from ui.startup import prepare_application
+from ui.stepview import schedule_prewarm
+from ui.widget_cache import DEFAULT_CAPACITY, WidgetCache
+
+# Operation windows, each module is imported the first time it is opened
+AdditionWindow       = LazyOperation("three.addition", "AdditionWindow")
+SubtractionWindow    = LazyOperation("three.subtraction", "SubtractionWindow")
+MultiplicationWindow = LazyOperation("three.multiplication", "MultiplicationWindow")
+InverseWindow3x3     = LazyOperation("three.inverse", "InverseWindow3x3")
 
 # import addition
 # import subtraction
@@ -33,17 +41,10 @@ class AnimatedSidebar(QWidget):
         layout.setContentsMargins(10, 20, 10, 20)
         layout.setSpacing(15)
 
-        # Header with dynamic color
+        # Header, coloured by the window's theme (see ui/qss.py)
         self.header = QLabel("MatriQ")
+        self.header.setObjectName("sidebarHeader")
         self.header.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.header.setStyleSheet("""A:\Isa\python\Gui\Matrix C
-            QLabel {
-                font-family: 'Lucida Console';
-                font-size: 24px;
-                font-weight: bold;
-                padding: 15px;
-            }
-        """)
         layout.addWidget(self.header)
 
         # Menu Items
@@ -55,21 +56,12 @@ class AnimatedSidebar(QWidget):
             ("📏 Determinant", None)
         ]
 
-        # Create buttons with theme-aware styling
+        # Create buttons, styled through their nav/active properties
         for text, _ in self.menu_items:
             btn = QPushButton(text)
             btn.original_text = text
             btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            btn.setStyleSheet("""
-                QPushButton {
-                    background: transparent;
-                    font-family: 'Lucida Console';
-                    font-size: 16px;
-                    padding: 12px 20px;
-                    border: none;
-                    text-align: left;
-                }
-            """)
+            btn.setProperty("nav", True)
             btn.clicked.connect(self.create_click_handler(btn))
             layout.addWidget(btn)
             self.buttons.append(btn)
@@ -105,27 +97,11 @@ class AnimatedSidebar(QWidget):
         self.collapse_btn.clicked.connect(self.toggle_sidebar)
         layout.addWidget(self.collapse_btn)
 
-        # Initial theme setup
-        self.update_colors(self.main_window.current_theme == "dark")
-
     def set_active_button(self, button):
-        # Clear previous active style from all buttons
-        for btn in self.buttons:
-            btn.setStyleSheet(btn.styleSheet().replace(
-                "border-left: 3px solid #ff7b72;",
-                "border-left: 3px solid transparent;"
-            ))
-            btn.setStyleSheet(btn.styleSheet().replace(
-                "background: rgba(200,200,200,0.1);",
-                ""
-            ))
-
-        # Apply active style to selected button
-        active_style = f"""
-            border-left: 3px solid #ff7b72;
-            background: rgba{("200,200,200", "0,0,0")[self.main_window.current_theme == "dark"]}0.1;
-        """
-        button.setStyleSheet(button.styleSheet() + active_style)
+        # Only the two buttons whose state changes are restyled
+        if self.active_button is not None and self.active_button is not button:
+            set_flag(self.active_button, "active", False)
+        set_flag(button, "active", True)
         self.active_button = button
 
     def create_click_handler(self, button):
@@ -164,9 +140,6 @@ class AnimatedSidebar(QWidget):
         self.main_window.set_theme(new_theme)
         is_dark = new_theme == "dark"
 
-        # Update sidebar colors
-        self.update_colors(is_dark)
-
         # Update theme button
         if self.collapsed:
             self.theme_btn.setText("☀️" if not is_dark else "🌙")
@@ -181,44 +154,19 @@ class AnimatedSidebar(QWidget):
 
         return handler
 
-    def update_colors(self, is_dark):
-        # Header color
-        header_color = "#ff7b72" if is_dark else "#cf222e"
-        self.header.setStyleSheet(f"""
-            QLabel {{
-                color: {header_color};
-                font-size: 24px;
-                font-weight: bold;
-                padding: 15px;
-            }}
-        """)
-
-        # Button styling
-        text_color = "#c9d1d9" if is_dark else "#1f1f1f"
-        button_style = f"""
-            QPushButton {{
-                color: {text_color};
-                border-left: 3px solid transparent;
-            }}
-            QPushButton:hover {{
-                background: rgba{("200,200,200", "0,0,0")[not is_dark]}0.1;
-                border-left: 3px solid {header_color};
-            }}
-        """
-        for btn in self.buttons:
-            btn.setStyleSheet(btn.styleSheet() + button_style)
-
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, max_widgets=DEFAULT_CAPACITY):
         super().__init__()
         self.setWindowTitle("MatriQ - Matrix Calculator")
         self.setGeometry(100, 100, 1200, 800)
-        self.content_widgets = {}
+        self.max_widgets = max_widgets  # live operation widgets, older ones are evicted
         self.current_theme = "dark"
         self.setup_ui()
+        schedule_prewarm()  # the first steps render warm
 
     def setup_ui(self):
+        self.setStyleSheet(APP_STYLESHEET)
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
 
@@ -237,6 +185,7 @@ class MainWindow(QMainWindow):
         # Create content area AFTER sidebar
         self.content_area = QStackedWidget()
         main_layout.addWidget(self.content_area)
+        self.content_widgets = WidgetCache(self.content_area, self.max_widgets)
 
         # Set initial content and highlight based on first button
         if self.sidebar.buttons:
@@ -258,35 +207,29 @@ class MainWindow(QMainWindow):
     # Moved outside of setup_ui and fixed indentation
     def set_theme(self, theme):
         self.current_theme = theme
-        style = f"""
-            QWidget {{
-                background: {'#0d1117' if theme == 'dark' else '#ffffff'};
-                color: {'#c9d1d9' if theme == 'dark' else '#1f1f1f'};
-            }}
-        """
-        self.setStyleSheet(style)
-
-        # Update content widgets only if they exist
-        for widget in self.content_widgets.values():
-            if hasattr(widget, 'update_theme'):
-                widget.update_theme(theme)
-            if isinstance(widget, (AdditionWindow, SubtractionWindow, MultiplicationWindow, InverseWindow3x3)) and widget.web_view:
-                widget.web_view.setHtml(widget.get_mathjax_template(
-                    widget.last_html if hasattr(widget, 'last_html') else "",
-                    "#0d1117" if theme == "dark" else "#ffffff",
-                    "#c9d1d9" if theme == "dark" else "#1f1f1f"
-                ))
+        # The stylesheet covers both themes, switching only flips a property
+        apply_theme(self, theme)
+
+        # Only the visible operation is restyled now, hidden ones are stale
+        # until show_operation brings them up to date
+        widget = self.content_area.currentWidget()
+        if widget is not None and hasattr(widget, 'update_theme'):
+            widget.update_theme(theme)
+
+    def show_operation(self, key, cls):
+        # Rebuilt widgets start dark and hidden ones kept the theme they
+        # were last shown in, bring them to the current one
+        widget = self.content_widgets.get(key, cls)
+        if widget.current_theme != self.current_theme:
+            widget.update_theme(self.current_theme)
+            repolish(widget)
+        self.content_area.setCurrentWidget(widget)
 
     def load_content(self, operation):
-        if operation not in self.content_widgets:
-            for text, cls in self.sidebar.menu_items:
-                if text.split()[-1] == operation and cls:
-                    self.content_widgets[operation] = cls()
-                    self.content_area.addWidget(self.content_widgets[operation])
-                    break
-
-        if operation in self.content_widgets:
-            self.content_area.setCurrentWidget(self.content_widgets[operation])
+        for text, cls in self.sidebar.menu_items:
+            if text.split()[-1] == operation and cls:
+                self.show_operation(operation, cls)
+                break
 
         # Update button states
         for btn in self.sidebar.buttons:
@@ -315,8 +258,7 @@ class MainWindow(QMainWindow):
                     }}
                 }};
             </script>
-            <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-            <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
+            {mathjax_script()}
             <style>
                 body {{ 
                     background-color: {bg_color}; 
@@ -351,6 +293,7 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == "__main__":
+    prepare_application()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
@@ -1,6 +1,133 @@
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
-from PyQt6.QtWebEngineWidgets import QWebEngineView
+
+import engine
+from engine.progress import checkpoint
+from ui.progress import JobProgress
+from ui.stepview import create_step_view
+from ui.steps import Step, StepList, matrix, verbosity_levels
+from ui.theme import STEP_COLORS
+from ui.mathjax import mathjax_script
+from ui.verbosity import VerbosityBox
+from ui.worker import run_steps
+
+
+SIZE = 3
+
+
+def format_num(x):
+    """Remove .0 for whole numbers, two decimals otherwise"""
+    return str(int(x)) if x.is_integer() else f"{x:.2f}"
+
+
+def render_step(step):
+    colors = STEP_COLORS
+    first, second = (list(map(format_num, m)) for m in step.operands)
+
+    if step.kind == "define":
+        # Step 1: Matrix definitions
+        step1 = (
+            fr"\large\color{{{colors['header']}}}\text{{Matrix A = }}"
+            fr"\color{{{colors['matrix']}}}{matrix(first)}"
+        )
+        step2 = (
+            fr"\large\color{{{colors['header']}}}\text{{Matrix B = }}"
+            fr"\color{{{colors['matrix']}}}{matrix(second)}"
+        )
+        return f"""
+                <div class="step">
+                    <div class="step-number">Step 1: Define Matrices</div>
+                    \[{step1}\]
+                    \[{step2}\]
+                </div>
+        """
+
+    if step.kind == "multiply":
+        # Step 2: Multiplication expression
+        step3 = (
+            fr"\large\color{{{colors['header']}}}\text{{A × B = }}"
+            fr"\color{{{colors['matrix']}}}"
+            fr"\left( {matrix(first)} \times {matrix(second)} \right)"
+        )
+        return f"""
+                <div class="step">
+                    <div class="step-number">Step 2: Multiply Matrices</div>
+                    \[{step3}\]
+                </div>
+        """
+
+    # Row of A times column of B for every element of A × B
+    products = [
+        " + ".join(f"{first[row * SIZE + k]}×{second[k * SIZE + col]}" for k in range(SIZE))
+        for row in range(SIZE) for col in range(SIZE)
+    ]
+
+    if step.kind == "expand":
+        # Step 3: Multiplication expansion
+        step4 = (
+            fr"\large\color{{{colors['calculation']}}}\text{{A × B = }}"
+            fr"{matrix([f'({p})' for p in products])}"
+        )
+        return f"""
+                <div class="step">
+                    <div class="step-number">Step 3: Expand Multiplication</div>
+                    \[{step4}\]
+                </div>
+        """
+
+    if step.kind == "products":
+        # Step 4: Calculate products
+        step5 = (
+            fr"\large\color{{{colors['extra']}}}\text{{Calculate Elements:}}"
+            fr"{matrix(products)}"
+        )
+        return f"""
+                <div class="step">
+                    <div class="step-number">Step 4: Calculate Products</div>
+                    \[{step5}\]
+                </div>
+        """
+
+    totals = list(map(format_num, step.result))
+    if step.kind == "sums":
+        # Step 5: Sum results
+        step6 = (
+            fr"\large\color{{{colors['calculation']}}}\text{{Sum Results:}}"
+            fr"{matrix(totals)}"
+        )
+        return f"""
+                <div class="step">
+                    <div class="step-number">Step 5: Sum Results</div>
+                    \[{step6}\]
+                </div>
+        """
+
+    # Final result
+    step7 = (
+        fr"\large\color{{{colors['final']}}}\text{{A × B = }}"
+        fr"{matrix(totals)}"
+    )
+    return f"""
+                <div class="final-result">
+                    \[{step7}\]
+                </div>
+    """
+
+
+# Steps kept at KEY verbosity
+KEY_STEPS = {"define", "sums", "result"}
+
+
+def result_step(a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p, q, r):
+    """The result step alone, for RESULT verbosity"""
+    result = engine.multiply(engine.as_matrix([a, b, c, d, e, f, g, h, i]),
+                             engine.as_matrix([j, k, l, m, n, o, p, q, r])).ravel().tolist()
+    return Step("result", ((a, b, c, d, e, f, g, h, i), (j, k, l, m, n, o, p, q, r)), tuple(result))
+
+
+def step_list(steps=()):
+    """The StepList generate_steps' records are collected in"""
+    return StepList(steps, render_step, head='<div class="steps">', tail='</div>')
 
 
 class MultiplicationWindow(QWidget):
@@ -15,8 +142,6 @@ class MultiplicationWindow(QWidget):
     def update_theme(self, theme):
         self.current_theme = theme
         self.update_styles()
-        if hasattr(self, 'last_values'):
-            self.update_display()
 
     def update_styles(self, text_color=None):
         is_dark = self.current_theme == "dark"
@@ -40,30 +165,19 @@ class MultiplicationWindow(QWidget):
         for inp in self.all_inputs:
             inp.setStyleSheet(input_style)
 
-        if hasattr(self, 'last_html'):
-            self.web_view.setHtml(self.get_mathjax_template(self.last_html, bg_color, text_color))
+        if hasattr(self, 'step_page'):
+            self.step_page.set_theme(self.current_theme)
 
     def update_web_view_content(self, html):
-        is_dark = self.current_theme == "dark"
-        bg_color = "#0d1117" if is_dark else "#ffffff"
-        text_color = "#c9d1d9" if is_dark else "#1f1f1f"
-
-        self.web_view.page().runJavaScript(
-            "window.scrollY",
-            lambda pos: self.apply_theme_with_scroll(pos, html, bg_color, text_color)
-        )
-
-    def apply_theme_with_scroll(self, scroll_pos, html, bg_color, text_color):
-        styled_html = self.get_mathjax_template(html, bg_color, text_color)
-        self.web_view.setHtml(styled_html)
-        self.web_view.page().runJavaScript(f"window.scrollTo(0, {scroll_pos});")
+        # The page stays loaded, so the scroll position survives the update
+        self.step_page.set_theme(self.current_theme)
+        self.step_page.show(html)
 
     def get_mathjax_template(self, content="", bg_color="#0d1117", text_color="white"):
         return f"""
         <html>
         <head>
-            <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-            <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
+            {mathjax_script()}
             <style>
                 body {{ 
                     background-color: {bg_color}; 
@@ -117,12 +231,22 @@ class MultiplicationWindow(QWidget):
             QPushButton:hover { background: #2ea043; }
         """)
         btn.clicked.connect(self.calculate)
-        layout.addWidget(btn)
+
+        # How much of the solution Calculate shows
+        self.verbosity_box = VerbosityBox()
+        button_row = QHBoxLayout()
+        button_row.addWidget(btn, 1)
+        button_row.addWidget(self.verbosity_box)
+        layout.addLayout(button_row)
+
+        # Progress of the running calculation (hidden when idle)
+        self.progress = JobProgress()
+        layout.addWidget(self.progress)
 
         # Steps Display
-        self.web_view = QWebEngineView()
-        self.web_view.setHtml(self.get_mathjax_template())
-        layout.addWidget(self.web_view, 1)
+        self.step_view, self.step_page = create_step_view(self.get_mathjax_template)
+        self.step_page.typeset.connect(self.progress.finish)
+        layout.addWidget(self.step_view, 1)
 
     def create_matrix_input(self):
         matrix = QWidget()
@@ -138,187 +262,27 @@ class MultiplicationWindow(QWidget):
         return matrix, inputs
 
     def calculate(self):
-        try:
-            values = [float(inp.text()) for inp in self.all_inputs]
-            # First matrix (a-i), second matrix (j-r)
-            a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p, q, r = values
-            steps = self.generate_steps(a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p, q, r)
-
-            self.last_html = steps
-            is_dark = self.current_theme == "dark"
-            bg_color = "#0d1117" if is_dark else "#ffffff"
-            text_color = "#c9d1d9" if is_dark else "#1f1f1f"
-
-            self.web_view.setHtml(self.get_mathjax_template(steps, bg_color, text_color))
-
-        except ValueError as e:
-            error_html = self.get_mathjax_template(
-                f"<div style='color: red'>⚠️ Please check and enter an integer value in each field correctly. All fields are required.</div>",
-                "#0d1117" if self.current_theme == "dark" else "#ffffff",
-                "#c9d1d9" if self.current_theme == "dark" else "#1f1f1f"
-            )
-            self.web_view.setHtml(error_html)
-
-    def update_display(self):
-        if hasattr(self, 'last_values'):
-            steps = self.generate_steps(*self.last_values)
-            self.web_view.setHtml(self.get_mathjax_template(steps))
-
-    def generate_steps(self, a, b, c, d, e, f, g, h, i,
-                       j, k, l, m, n, o, p, q, r):
-        is_dark = self.current_theme == "dark"
-        colors = {
-            'header': "#4192f0" if is_dark else "#d60326",
-            'matrix': "#db2c52" if is_dark else "#400612",
-            'calculation': "#0d9e66" if is_dark else "#bc4c00",
-            'final': "#291be3" if is_dark else "#8250df",
-            'extra': "#7a4815" if is_dark else "#8250df"
-        }
-
-        format_num = lambda x: str(int(x)) if x.is_integer() else f"{x:.2f}"
-
-        # Format first matrix elements
-        a_f, b_f, c_f = map(format_num, [a, b, c])
-        d_f, e_f, f_f = map(format_num, [d, e, f])
-        g_f, h_f, i_f = map(format_num, [g, h, i])
-
-        # Format second matrix elements
-        j_f, k_f, l_f = map(format_num, [j, k, l])
-        m_f, n_f, o_f = map(format_num, [m, n, o])
-        p_f, q_f, r_f = map(format_num, [p, q, r])
-
-        # Step 1: Matrix definitions
-        step1 = (
-            fr"\large\color{{{colors['header']}}}\text{{Matrix A = }}"
-            fr"\color{{{colors['matrix']}}}"
-            fr"\begin{{vmatrix}} {a_f} & {b_f} & {c_f} \\ "
-            fr"{d_f} & {e_f} & {f_f} \\ {g_f} & {h_f} & {i_f} \end{{vmatrix}}"
-        )
-
-        step2 = (
-            fr"\large\color{{{colors['header']}}}\text{{Matrix B = }}"
-            fr"\color{{{colors['matrix']}}}"
-            fr"\begin{{vmatrix}} {j_f} & {k_f} & {l_f} \\ "
-            fr"{m_f} & {n_f} & {o_f} \\ {p_f} & {q_f} & {r_f} \end{{vmatrix}}"
-        )
-
-        # Step 2: Multiplication expression
-        step3 = (
-            fr"\large\color{{{colors['header']}}}\text{{A × B = }}"
-            fr"\color{{{colors['matrix']}}}"
-            fr"\left( \begin{{vmatrix}} {a_f} & {b_f} & {c_f} \\ "
-            fr"{d_f} & {e_f} & {f_f} \\ {g_f} & {h_f} & {i_f} \end{{vmatrix}} "
-            fr"\times \begin{{vmatrix}} {j_f} & {k_f} & {l_f} \\ "
-            fr"{m_f} & {n_f} & {o_f} \\ {p_f} & {q_f} & {r_f} \end{{vmatrix}} \right)"
-        )
-
-        # Step 3: Multiplication expansion
-        step4_lines = [
-            fr"({a_f}×{j_f} + {b_f}×{m_f} + {c_f}×{p_f}) & "
-            fr"({a_f}×{k_f} + {b_f}×{n_f} + {c_f}×{q_f}) & "
-            fr"({a_f}×{l_f} + {b_f}×{o_f} + {c_f}×{r_f}) \\ ",
-
-            fr"({d_f}×{j_f} + {e_f}×{m_f} + {f_f}×{p_f}) & "
-            fr"({d_f}×{k_f} + {e_f}×{n_f} + {f_f}×{q_f}) & "
-            fr"({d_f}×{l_f} + {e_f}×{o_f} + {f_f}×{r_f}) \\ ",
-
-            fr"({g_f}×{j_f} + {h_f}×{m_f} + {i_f}×{p_f}) & "
-            fr"({g_f}×{k_f} + {h_f}×{n_f} + {i_f}×{q_f}) & "
-            fr"({g_f}×{l_f} + {h_f}×{o_f} + {i_f}×{r_f})"
-        ]
-
-        step4 = (
-            fr"\large\color{{{colors['calculation']}}}\text{{A × B = }}"
-            fr"\begin{{vmatrix}}"
-            fr"{''.join(step4_lines)}"
-            fr"\end{{vmatrix}}"
-        )
-
-        # Calculate intermediate products and sums
-        def calculate_element(row, col):
-            products = [
-                (row[0] * col[0], f"{format_num(row[0])}×{format_num(col[0])}"),
-                (row[1] * col[1], f"{format_num(row[1])}×{format_num(col[1])}"),
-                (row[2] * col[2], f"{format_num(row[2])}×{format_num(col[2])}")
-            ]
-            sum_total = sum(p[0] for p in products)
-            return (sum_total, " + ".join(p[1] for p in products))
-
-        # Calculate all elements
-        elements = []
-        for row in [[a, b, c], [d, e, f], [g, h, i]]:
-            for col in [[j, k, l], [m, n, o], [p, q, r]]:
-                elements.append(calculate_element(row, col))
-
-        # Step 4: Intermediate calculations
-        step5_lines = [
-            fr"{elements[0][1]} & {elements[1][1]} & {elements[2][1]} \\ ",
-            fr"{elements[3][1]} & {elements[4][1]} & {elements[5][1]} \\ ",
-            fr"{elements[6][1]} & {elements[7][1]} & {elements[8][1]}"
-        ]
-
-        step5 = (
-            fr"\large\color{{{colors['extra']}}}\text{{Calculate Elements:}}"
-            fr"\begin{{vmatrix}}"
-            fr"{''.join(step5_lines)}"
-            fr"\end{{vmatrix}}"
-        )
+        run_steps(self, float, step_list)
+
+    def show_steps(self, steps, values):
+        self.last_steps = steps
+        self.progress.report("render", 100)
+        self.step_view.show_steps(steps)
+
+    def show_error(self, e):
+        self.step_view.show_html(f"<div style='color: red'>⚠️ Please check and enter an integer value in each field correctly. All fields are required.</div>")
+
+    @staticmethod
+    @verbosity_levels(KEY_STEPS, result_step)
+    def generate_steps(a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p, q, r):
+        operands = ((a, b, c, d, e, f, g, h, i), (j, k, l, m, n, o, p, q, r))
+        yield Step("define", operands)
+        yield Step("multiply", operands)
+        yield Step("expand", operands)
+        yield Step("products", operands)
+        totals = engine.multiply(engine.as_matrix([a, b, c, d, e, f, g, h, i]),
+                                 engine.as_matrix([j, k, l, m, n, o, p, q, r])).ravel().tolist()
+        checkpoint("steps", 50)
+        yield Step("sums", operands, tuple(totals))
+        yield Step("result", operands, tuple(totals))
 
-        # Step 5: Intermediate sums
-        step6_lines = [
-            fr"{format_num(elements[0][0])} & {format_num(elements[1][0])} & {format_num(elements[2][0])} \\ ",
-            fr"{format_num(elements[3][0])} & {format_num(elements[4][0])} & {format_num(elements[5][0])} \\ ",
-            fr"{format_num(elements[6][0])} & {format_num(elements[7][0])} & {format_num(elements[8][0])}"
-        ]
-
-        step6 = (
-            fr"\large\color{{{colors['calculation']}}}\text{{Sum Results:}}"
-            fr"\begin{{vmatrix}}"
-            fr"{''.join(step6_lines)}"
-            fr"\end{{vmatrix}}"
-        )
-
-        # Final result
-        final = lambda x: str(int(x)) if x.is_integer() else f"{x:.2f}"
-        step7 = (
-            fr"\large\color{{{colors['final']}}}\text{{A × B = }}"
-            fr"\begin{{vmatrix}}"
-            fr"{final(elements[0][0])} & {final(elements[1][0])} & {final(elements[2][0])} \\ "
-            fr"{final(elements[3][0])} & {final(elements[4][0])} & {final(elements[5][0])} \\ "
-            fr"{final(elements[6][0])} & {final(elements[7][0])} & {final(elements[8][0])}"
-            fr"\end{{vmatrix}}"
-        )
-
-        return f"""
-            <div class="steps">
-                <div class="step">
-                    <div class="step-number">Step 1: Define Matrices</div>
-                    \[{step1}\]
-                    \[{step2}\]
-                </div>
-
-                <div class="step">
-                    <div class="step-number">Step 2: Multiply Matrices</div>
-                    \[{step3}\]
-                </div>
-
-                <div class="step">
-                    <div class="step-number">Step 3: Expand Multiplication</div>
-                    \[{step4}\]
-                </div>
-
-                <div class="step">
-                    <div class="step-number">Step 4: Calculate Products</div>
-                    \[{step5}\]
-                </div>
-
-                <div class="step">
-                    <div class="step-number">Step 5: Sum Results</div>
-                    \[{step6}\]
-                </div>
-
-                <div class="final-result">
-                    \[{step7}\]
-                </div>
-            </div>
-        """
\ No newline at end of file
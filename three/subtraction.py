@@ -1,6 +1,101 @@
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
-from PyQt6.QtWebEngineWidgets import QWebEngineView
+
+import engine
+from engine.progress import checkpoint
+from ui.progress import JobProgress
+from ui.stepview import create_step_view
+from ui.steps import Step, StepList, matrix, verbosity_levels
+from ui.theme import STEP_COLORS
+from ui.mathjax import mathjax_script
+from ui.verbosity import VerbosityBox
+from ui.worker import run_steps
+
+
+def format_num(x):
+    """Remove .0 for whole numbers, two decimals otherwise"""
+    return str(int(x)) if x.is_integer() else f"{x:.2f}"
+
+
+##################################################################################################
+#########################   Latex code for step generation      ##################################
+##################################################################################################
+def render_step(step):
+    colors = STEP_COLORS
+    first, second = (list(map(format_num, m)) for m in step.operands)
+
+    if step.kind == "define":
+        # Step 1: Matrix definitions
+        step1 = (
+            fr"\large\color{{{colors['header']}}}\text{{Matrix A = }}"
+            fr"\color{{{colors['matrix']}}}{matrix(first)}"
+        )
+        step2 = (
+            fr"\large\color{{{colors['header']}}}\text{{Matrix B = }}"
+            fr"\color{{{colors['matrix']}}}{matrix(second)}"
+        )
+        return f"""
+                <div class="step">
+                    <div class="step-number">Step 1: Define Matrices</div>
+                    \[{step1}\]
+                    \[{step2}\]
+                </div>
+        """
+
+    if step.kind == "subtract":
+        # Step 2: Matrix subtraction
+        step3 = (
+            fr"\large\color{{{colors['header']}}}\text{{A - B = }}"
+            fr"\color{{{colors['matrix']}}}"
+            fr"\left( {matrix(first)} + {matrix(second)} \right)"
+        )
+        return f"""
+                <div class="step">
+                    <div class="step-number">Step 2: Add Matrices</div>
+                    \[{step3}\]
+                </div>
+        """
+
+    if step.kind == "perform":
+        # Step 3: Calculation
+        cells = [f"{x}-{y}" for x, y in zip(first, second)]
+        step4 = (
+            fr"\large\color{{{colors['calculation']}}}\text{{A - B = }}"
+            fr"{matrix(cells)}"
+        )
+        return f"""
+                <div class="step">
+                    <div class="step-number">Step 3: Perform Subtraction</div>
+                    \[{step4}\]
+                </div>
+        """
+
+    # Final result
+    step5 = (
+        fr"\large\color{{{colors['final']}}}\text{{A - B = }}"
+        fr"{matrix(list(map(format_num, step.result)))}"
+    )
+    return f"""
+                <div class="final-result">
+                    \[{step5}\]
+                </div>
+    """
+
+
+# Steps kept at KEY verbosity
+KEY_STEPS = {"define", "result"}
+
+
+def result_step(a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p, q, r):
+    """The result step alone, for RESULT verbosity"""
+    result = engine.subtract(engine.as_matrix([a, b, c, d, e, f, g, h, i]),
+                             engine.as_matrix([j, k, l, m, n, o, p, q, r])).ravel().tolist()
+    return Step("result", ((a, b, c, d, e, f, g, h, i), (j, k, l, m, n, o, p, q, r)), tuple(result))
+
+
+def step_list(steps=()):
+    """The StepList generate_steps' records are collected in"""
+    return StepList(steps, render_step, head='<div class="steps">', tail='</div>')
 
 
 class SubtractionWindow(QWidget):
@@ -15,8 +110,6 @@ class SubtractionWindow(QWidget):
     def update_theme(self, theme):
         self.current_theme = theme
         self.update_styles()
-        if hasattr(self, 'last_values'):
-            self.update_display()
 
     def update_styles(self, text_color=None):
         is_dark = self.current_theme == "dark"
@@ -40,30 +133,19 @@ class SubtractionWindow(QWidget):
         for inp in self.all_inputs:
             inp.setStyleSheet(input_style)
 
-        if hasattr(self, 'last_html'):
-            self.web_view.setHtml(self.get_mathjax_template(self.last_html, bg_color, text_color))
+        if hasattr(self, 'step_page'):
+            self.step_page.set_theme(self.current_theme)
 
     def update_web_view_content(self, html):
-        is_dark = self.current_theme == "dark"
-        bg_color = "#0d1117" if is_dark else "#ffffff"
-        text_color = "#c9d1d9" if is_dark else "#1f1f1f"
-
-        self.web_view.page().runJavaScript(
-            "window.scrollY",
-            lambda pos: self.apply_theme_with_scroll(pos, html, bg_color, text_color)
-        )
-
-    def apply_theme_with_scroll(self, scroll_pos, html, bg_color, text_color):
-        styled_html = self.get_mathjax_template(html, bg_color, text_color)
-        self.web_view.setHtml(styled_html)
-        self.web_view.page().runJavaScript(f"window.scrollTo(0, {scroll_pos});")
+        # The page stays loaded, so the scroll position survives the update
+        self.step_page.set_theme(self.current_theme)
+        self.step_page.show(html)
 
     def get_mathjax_template(self, content="", bg_color="#0d1117", text_color="white"):
         return f"""
         <html>
         <head>
-            <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-            <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
+            {mathjax_script()}
             <style>
                 body {{ 
                     background-color: {bg_color}; 
@@ -117,12 +199,22 @@ class SubtractionWindow(QWidget):
             QPushButton:hover { background: #2ea043; }
         """)
         btn.clicked.connect(self.calculate)
-        layout.addWidget(btn)
+
+        # How much of the solution Calculate shows
+        self.verbosity_box = VerbosityBox()
+        button_row = QHBoxLayout()
+        button_row.addWidget(btn, 1)
+        button_row.addWidget(self.verbosity_box)
+        layout.addLayout(button_row)
+
+        # Progress of the running calculation (hidden when idle)
+        self.progress = JobProgress()
+        layout.addWidget(self.progress)
 
         # Steps Display
-        self.web_view = QWebEngineView()
-        self.web_view.setHtml(self.get_mathjax_template())
-        layout.addWidget(self.web_view, 1)
+        self.step_view, self.step_page = create_step_view(self.get_mathjax_template)
+        self.step_page.typeset.connect(self.progress.finish)
+        layout.addWidget(self.step_view, 1)
 
     def create_matrix_input(self):
         matrix = QWidget()
@@ -138,112 +230,25 @@ class SubtractionWindow(QWidget):
         return matrix, inputs
 
     def calculate(self):
-        try:
-            values = [float(inp.text()) for inp in self.all_inputs]
-            # First matrix (a-i), second matrix (j-r)
-            a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p, q, r = values
-            steps = self.generate_steps(a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p, q, r)
-
-            self.last_html = steps
-            is_dark = self.current_theme == "dark"
-            bg_color = "#0d1117" if is_dark else "#ffffff"
-            text_color = "#c9d1d9" if is_dark else "#1f1f1f"
-
-            self.web_view.setHtml(self.get_mathjax_template(steps, bg_color, text_color))
-
-        except ValueError as e:
-            error_html = self.get_mathjax_template(
-                f"<div style='color: red'>⚠️ Please check and enter an integer value in each field correctly. All fields are required.</div>",
-                "#0d1117" if self.current_theme == "dark" else "#ffffff",
-                "#c9d1d9" if self.current_theme == "dark" else "#1f1f1f"
-            )
-            self.web_view.setHtml(error_html)
-
-    def update_display(self):
-        if hasattr(self, 'last_values'):
-            steps = self.generate_steps(*self.last_values)
-            self.web_view.setHtml(self.get_mathjax_template(steps))
-
-    def generate_steps(self, a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p, q, r):
-        is_dark = self.current_theme == "dark"
-        colors = {
-            'header': "#4192f0" if is_dark else "#d60326",
-            'matrix': "#db2c52" if is_dark else "#400612",
-            'calculation': "#0d9e66" if is_dark else "#bc4c00",
-            'final': "#291be3" if is_dark else "#8250df",
-            'extra': "#7a4815" if is_dark else "#8250df"
-        }
-
-        format_num = lambda x: str(int(x)) if x.is_integer() else f"{x:.2f}"
-        a_f, b_f, c_f = format_num(a), format_num(b), format_num(c)
-        d_f, e_f, f_f = format_num(d), format_num(e), format_num(f)
-        g_f, h_f, i_f = format_num(g), format_num(h), format_num(i)
-        j_f, k_f, l_f = format_num(j), format_num(k), format_num(l)
-        m_f, n_f, o_f = format_num(m), format_num(n), format_num(o)
-        p_f, q_f, r_f = format_num(p), format_num(q), format_num(r)
-
-        # Step 1: Matrix definitions
-        step1 = (
-            fr"\large\color{{{colors['header']}}}\text{{Matrix A = }}"
-            fr"\color{{{colors['matrix']}}}"
-            fr"\begin{{vmatrix}} {a_f} & {b_f} & {c_f} \\ {d_f} & {e_f} & {f_f} \\ {g_f} & {h_f} & {i_f} \end{{vmatrix}}"
-        )
+        run_steps(self, float, step_list)
+
+    def show_steps(self, steps, values):
+        self.last_steps = steps
+        self.progress.report("render", 100)
+        self.step_view.show_steps(steps)
+
+    def show_error(self, e):
+        self.step_view.show_html(f"<div style='color: red'>⚠️ Please check and enter an integer value in each field correctly. All fields are required.</div>")
+
+    @staticmethod
+    @verbosity_levels(KEY_STEPS, result_step)
+    def generate_steps(a, b, c, d, e, f, g, h, i, j, k, l, m, n, o, p, q, r):
+        operands = ((a, b, c, d, e, f, g, h, i), (j, k, l, m, n, o, p, q, r))
+        yield Step("define", operands)
+        yield Step("subtract", operands)
+        yield Step("perform", operands)
+        result = engine.subtract(engine.as_matrix([a, b, c, d, e, f, g, h, i]),
+                                 engine.as_matrix([j, k, l, m, n, o, p, q, r])).ravel().tolist()
+        checkpoint("steps", 50)
+        yield Step("result", operands, tuple(result))
 
-        step2 = (
-            fr"\large\color{{{colors['header']}}}\text{{Matrix B = }}"
-            fr"\color{{{colors['matrix']}}}"
-            fr"\begin{{vmatrix}} {j_f} & {k_f} & {l_f} \\ {m_f} & {n_f} & {o_f} \\ {p_f} & {q_f} & {r_f} \end{{vmatrix}}"
-        )
-
-        # Step 2: Matrix Subtraction
-        step3 = (
-            fr"\large\color{{{colors['header']}}}\text{{A - B = }}"
-            fr"\color{{{colors['matrix']}}}"
-            fr"\left( \begin{{vmatrix}} {a_f} & {b_f} & {c_f} \\ {d_f} & {e_f} & {f_f} \\ {g_f} & {h_f} & {i_f} \end{{vmatrix}} "
-            fr"+ \begin{{vmatrix}} {j_f} & {k_f} & {l_f} \\ {m_f} & {n_f} & {o_f} \\ {p_f} & {q_f} & {r_f} \end{{vmatrix}} \right)"
-        )
-
-        # Step 3: Calculation
-        step4 = (
-            fr"\large\color{{{colors['calculation']}}}\text{{A - B = }}"
-            fr"\begin{{vmatrix}}"
-            fr"{a_f}-{j_f} & {b_f}-{k_f} & {c_f}-{l_f} \\ "
-            fr"{d_f}-{m_f} & {e_f}-{n_f} & {f_f}-{o_f} \\ "
-            fr"{g_f}-{p_f} & {h_f}-{q_f} & {i_f}-{r_f}"
-            fr"\end{{vmatrix}}"
-        )
-
-        # Final result
-        final = lambda x: str(int(x)) if (x).is_integer() else f"{x:.2f}"
-        step5 = (
-            fr"\large\color{{{colors['final']}}}\text{{A - B = }}"
-            fr"\begin{{vmatrix}}"
-            fr"{final(a - j)} & {final(b - k)} & {final(c - l)} \\ "
-            fr"{final(d - m)} & {final(e - n)} & {final(f - o)} \\ "
-            fr"{final(g - p)} & {final(h - q)} & {final(i - r)}"
-            fr"\end{{vmatrix}}"
-        )
-
-        return f"""
-            <div class="steps">
-                <div class="step">
-                    <div class="step-number">Step 1: Define Matrices</div>
-                    \[{step1}\]
-                    \[{step2}\]
-                </div>
-
-                <div class="step">
-                    <div class="step-number">Step 2: Add Matrices</div>
-                    \[{step3}\]
-                </div>
-
-                <div class="step">
-                    <div class="step-number">Step 3: Perform Subtraction</div>
-                    \[{step4}\]
-                </div>
-
-                <div class="final-result">
-                    \[{step5}\]
-                </div>
-            </div>
-        """
\ No newline at end of file
@@ -1,6 +1,57 @@
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
-from PyQt6.QtWebEngineWidgets import QWebEngineView
+
+import engine
+from engine.progress import checkpoint
+from ui.progress import JobProgress
+from ui.stepview import create_step_view
+from ui.steps import Step, StepList, verbosity_levels
+from ui.mathjax import mathjax_script
+from ui.verbosity import VerbosityBox
+from ui.worker import run_steps
+
+
+def format_num(num):
+    if isinstance(num, float) and num.is_integer():
+        return str(int(num))
+    return f"{num:.2f}"
+
+
+def render_step(step):
+    if step.kind == "symbols":
+        return r"\[ \color{#d17711} \text{Let A = }\begin{vmatrix} a & b \\ c & d \end{vmatrix} \]"
+    if step.kind == "formula":
+        return r"\[ \color{#41db1f} |A| = ( a \times d - b \times c ) \]"
+
+    a_f, b_f, c_f, d_f = map(format_num, step.operands)
+    if step.kind == "matrix":
+        return fr"\[ \color{{#3041db}} \text{{i.e A = }}\begin{{vmatrix}} {a_f} & {b_f} \\ {c_f} & {d_f} \end{{vmatrix}} \]"
+    if step.kind == "substitute":
+        return fr"\[ \color{{#8217cf}} |A| = ( {a_f} \times {d_f} - {b_f} \times {c_f} ) \]"
+    if step.kind == "products":
+        product_ad_f, product_bc_f = map(format_num, step.result)
+        return fr"\[ \color{{#06d4bf}} |A| = ( {product_ad_f} - {product_bc_f} ) \]"
+    return fr"<p style='font-size: 13px; color: #cf0c20;'>\[ |A| = {format_num(step.result)} \]</p>"
+
+
+# Steps kept at KEY verbosity
+KEY_STEPS = {"matrix", "substitute", "result"}
+
+
+def result_step(a, b, c, d):
+    """The result step alone, for RESULT verbosity"""
+    return Step("result", (a, b, c, d), engine.determinant(engine.as_matrix([a, b, c, d])))
+
+
+def step_list(steps=()):
+    """The StepList generate_steps' records are collected in"""
+    return StepList(steps, render_step, separator="<hr><hr>", head="""
+        <div style="text-align: center; padding: 20px;">
+            <font color='blue'>
+        """, tail="""
+            </font>
+        </div>
+        """)
 
 
 class DeterminantWindow(QWidget):
@@ -15,8 +66,6 @@ class DeterminantWindow(QWidget):
     def update_theme(self, theme):
         self.current_theme = theme
         self.update_styles()
-        if hasattr(self, 'last_values'):
-            self.update_display()
 
     def update_styles(self, text_color=None):
         is_dark = self.current_theme == "dark"
@@ -40,22 +89,13 @@ class DeterminantWindow(QWidget):
         for inp in self.all_inputs:
             inp.setStyleSheet(input_style)
 
-        if hasattr(self, 'last_html'):
-            self.web_view.setHtml(self.get_mathjax_template(self.last_html, bg_color, text_color))
+        if hasattr(self, 'step_page'):
+            self.step_page.set_theme(self.current_theme)
 
     def update_web_view_content(self, html):
-        is_dark = self.current_theme == "dark"
-        bg_color = "#0d1117" if is_dark else "#ffffff"
-        text_color = "#c9d1d9" if is_dark else "#1f1f1f"
-
-        self.web_view.page().runJavaScript(
-            "window.scrollY",
-            lambda pos: self.apply_theme_with_scroll(pos, html, bg_color, text_color))
-
-    def apply_theme_with_scroll(self, scroll_pos, html, bg_color, text_color):
-        styled_html = self.get_mathjax_template(html, bg_color, text_color)
-        self.web_view.setHtml(styled_html)
-        self.web_view.page().runJavaScript(f"window.scrollTo(0, {scroll_pos});")
+        # The page stays loaded, so the scroll position survives the update
+        self.step_page.set_theme(self.current_theme)
+        self.step_page.show(html)
 
     def format_number(self, num):
         if isinstance(num, float) and num.is_integer():
@@ -85,12 +125,22 @@ class DeterminantWindow(QWidget):
             QPushButton:hover { background: #2ea043; }
         """)
         btn.clicked.connect(self.calculate)
-        layout.addWidget(btn)
+
+        # How much of the solution Calculate shows
+        self.verbosity_box = VerbosityBox()
+        button_row = QHBoxLayout()
+        button_row.addWidget(btn, 1)
+        button_row.addWidget(self.verbosity_box)
+        layout.addLayout(button_row)
+
+        # Progress of the running calculation (hidden when idle)
+        self.progress = JobProgress()
+        layout.addWidget(self.progress)
 
         # Steps Display
-        self.web_view = QWebEngineView()
-        self.web_view.setHtml(self.get_mathjax_template())
-        layout.addWidget(self.web_view, 1)
+        self.step_view, self.step_page = create_step_view(self.get_mathjax_template)
+        self.step_page.typeset.connect(self.progress.finish)
+        layout.addWidget(self.step_view, 1)
 
     def create_matrix_input(self):
         matrix = QWidget()
@@ -106,73 +156,35 @@ class DeterminantWindow(QWidget):
         return matrix, inputs
 
     def calculate(self):
-        try:
-            values = [float(inp.text()) for inp in self.all_inputs]
-            a, b, c, d = values
-            steps = self.generate_steps(a, b, c, d)
-            self.last_html = steps
-            is_dark = self.current_theme == "dark"
-            bg_color = "#0d1117" if is_dark else "#ffffff"
-            text_color = "#c9d1d9" if is_dark else "#1f1f1f"
-            self.web_view.setHtml(self.get_mathjax_template(steps, bg_color, text_color))
-            self.last_values = values
-        except ValueError as e:
-            error_html = self.get_mathjax_template(
-                f"<div style='color: red'>⚠️ Please check and enter an integer value in each field correctly. All fields are required.</div>",
-                "#0d1117" if self.current_theme == "dark" else "#ffffff",
-                "#c9d1d9" if self.current_theme == "dark" else "#1f1f1f"
-            )
-            self.web_view.setHtml(error_html)
-
-    def update_display(self):
-        if hasattr(self, 'last_values'):
-            steps = self.generate_steps(*self.last_values)
-            self.web_view.setHtml(self.get_mathjax_template(steps))
-
-    def generate_steps(self, a, b, c, d):
-        format_num = self.format_number
-        a_f = format_num(a)
-        b_f = format_num(b)
-        c_f = format_num(c)
-        d_f = format_num(d)
-        det = a * d - b * c
-        det_f = format_num(det)
-        product_ad = a * d
-        product_ad_f = format_num(product_ad)
-        product_bc = b * c
-        product_bc_f = format_num(product_bc)
-
-        step1 = r"\text{Let A = }\begin{vmatrix} a & b \\ c & d \end{vmatrix}"
-        step2 = fr"\text{{i.e A = }}\begin{{vmatrix}} {a_f} & {b_f} \\ {c_f} & {d_f} \end{{vmatrix}}"
-        step3 = r"|A| = ( a \times d - b \times c )"
-        step4 = fr"|A| = ( {a_f} \times {d_f} - {b_f} \times {c_f} )"
-        step5 = fr"|A| = ( {product_ad_f} - {product_bc_f} )"
-        step6 = fr"|A| = {det_f}"
-
-        steps_html = [
-            fr"\[ \color{{#d17711}} {step1} \]",
-            fr"\[ \color{{#3041db}} {step2} \]",
-            fr"\[ \color{{#41db1f}} {step3} \]",
-            fr"\[ \color{{#8217cf}} {step4} \]",
-            fr"\[ \color{{#06d4bf}} {step5} \]",
-            fr"<p style='font-size: 13px; color: #cf0c20;'>\[ {step6} \]</p>"
-        ]
-
-        content = f'''
-        <div style="text-align: center; padding: 20px;">
-            <font color='blue'>
-                {"<hr><hr>".join(steps_html)}
-            </font>
-        </div>
-        '''
-        return content
+        run_steps(self, float, step_list)
+
+    def show_steps(self, steps, values):
+        self.last_steps = steps
+        self.progress.report("render", 100)
+        self.step_view.show_steps(steps)
+        self.last_values = values
+
+    def show_error(self, e):
+        self.step_view.show_html(f"<div style='color: red'>⚠️ Please check and enter an integer value in each field correctly. All fields are required.</div>")
+
+    @staticmethod
+    @verbosity_levels(KEY_STEPS, result_step)
+    def generate_steps(a, b, c, d):
+        operands = (a, b, c, d)
+        yield Step("symbols")
+        yield Step("matrix", operands)
+        yield Step("formula")
+        yield Step("substitute", operands)
+        yield Step("products", operands, (a * d, b * c))
+        det = engine.determinant(engine.as_matrix([a, b, c, d]))
+        checkpoint("steps", 50)
+        yield Step("result", operands, det)
 
     def get_mathjax_template(self, content="", bg_color="#0d1117", text_color="white"):
         return f"""
             <html>
             <head>
-                <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-                <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
+                {mathjax_script()}
                 <style>
                     body {{
                         background-color: {bg_color};
@@ -182,19 +194,19 @@ class DeterminantWindow(QWidget):
                         padding: 20px;
                     }}
                     .step-header {{
-                        color: {("#58a6ff" if bg_color == "#0d1117" else "#0366d6")};
+                        color: var(--mq-step-header);
                         font-size: 18px;
                         margin-top: 15px;
                     }}
                     .calculation-step {{
-                        color: {("#ff9b72" if bg_color == "#0d1117" else "#bc4c00")};
+                        color: var(--mq-step-calculation);
                     }}
                     .final-result {{
-                        color: {("#d2a8ff" if bg_color == "#0d1117" else "#8250df")};
+                        color: var(--mq-step-final);
                         font-size: 20px;
                     }}
                     hr {{
-                        border-color: {("#30363d" if bg_color == "#0d1117" else "#d0d7de")};
+                        border-color: var(--mq-border);
                     }}
                 </style>
             </head>
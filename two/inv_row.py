@@ -1,7 +1,94 @@
-import numpy as np
+from fractions import Fraction
+
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
-from PyQt6.QtWebEngineWidgets import QWebEngineView
+
+import engine
+from engine.progress import checkpoint
+from ui.progress import JobProgress
+from ui.stepview import create_step_view
+from ui.steps import Step, StepList, verbosity_levels
+from ui.mathjax import mathjax_script
+from ui.verbosity import VerbosityBox
+from ui.worker import run_steps
+
+# Fixed colours, the row-reduction view does not follow the theme
+COLORS = {
+    'header': "#4192f0",
+    'matrix': "#db2c52",
+    'operation': "#0d9e66",
+    'final': "#291be3"
+}
+
+
+# turn exact values into fraction strings (Fraction keeps the denominator positive)
+def fmt(x):
+    f = Fraction(x)
+    if f.denominator == 1:
+        return str(f.numerator)
+    return f"\\frac{{{f.numerator}}}{{{f.denominator}}}"
+
+
+# helper to render a 2×2 matrix in LaTeX
+def mat(m):
+    return (
+        "\\begin{bmatrix}"
+        f"{fmt(m[0][0])} & {fmt(m[0][1])}\\\\ "
+        f"{fmt(m[1][0])} & {fmt(m[1][1])}"
+        "\\end{bmatrix}"
+    )
+
+
+def render_step(step):
+    if step.kind == "initial":
+        L, R = step.result
+        return f"""
+        <div class="step">
+          <span style="color:{COLORS['header']}">Initial Equation:</span><br/>
+          $$\\color{{{COLORS['matrix']}}}{mat(L)}\\color{{black}}\\cdot A^{{-1}}
+             =\\color{{{COLORS['matrix']}}}{mat(R)}$$
+        </div>
+        """
+
+    if step.kind == "final":
+        R = step.result
+        return f"""
+        <div class="step" style="color:{COLORS['final']}">
+          $${mat([[1, 0], [0, 1]])}\\cdot A^{{-1}}={mat(R)}$$
+          $$\\therefore A^{{-1}}={mat(R)}$$
+        </div>
+        """
+
+    if step.kind == "scale":
+        row, d = step.operands
+        desc = f"R_{row + 1} \\to \\tfrac{{1}}{{{fmt(d)}}}R_{row + 1}"
+    else:
+        row, source, m = step.operands
+        desc = f"R_{row + 1} \\to R_{row + 1} - ({fmt(m)})R_{source + 1}"
+    newL, newR = step.result
+    return f"""
+            <div class="step">
+              <span style="color:{COLORS['operation']}">Row Operation:</span>&nbsp;
+              ${desc}$<br/>
+              $$\\color{{{COLORS['matrix']}}}{mat(newL)}\\color{{black}}\\cdot A^{{-1}}
+                 =\\color{{{COLORS['matrix']}}}{mat(newR)}$$
+            </div>
+            """
+
+
+# Steps kept at KEY verbosity
+KEY_STEPS = {"initial", "final"}
+
+
+def result_step(a, b, c, d):
+    """The final step alone, for RESULT verbosity (raises when |A| = 0)"""
+    return Step("final", (), tuple(map(tuple, engine.exact_inverse([a, b, c, d]))))
+
+
+def step_list(steps=()):
+    """The StepList generate_steps' records are collected in"""
+    return StepList(steps, render_step)
+
 
 class InvRowWindow(QWidget):
     def __init__(self):
@@ -15,8 +102,6 @@ class InvRowWindow(QWidget):
     def update_theme(self, theme):
         self.current_theme = theme
         self.update_styles()
-        if hasattr(self, 'last_values'):
-            self.update_display()
 
     def update_styles(self, text_color=None):
         is_dark = self.current_theme == "dark"
@@ -40,23 +125,13 @@ class InvRowWindow(QWidget):
         for inp in self.all_inputs:
             inp.setStyleSheet(input_style)
 
-        if hasattr(self, 'last_html'):
-            self.web_view.setHtml(self.get_mathjax_template(self.last_html, bg_color, text_color))
+        if hasattr(self, 'step_page'):
+            self.step_page.set_theme(self.current_theme)
 
     def update_web_view_content(self, html):
-        is_dark = self.current_theme == "dark"
-        bg_color = "#0d1117" if is_dark else "#ffffff"
-        text_color = "#c9d1d9" if is_dark else "#1f1f1f"
-
-        self.web_view.page().runJavaScript(
-            "window.scrollY",
-            lambda pos: self.apply_theme_with_scroll(pos, html, bg_color, text_color)
-        )
-
-    def apply_theme_with_scroll(self, scroll_pos, html, bg_color, text_color):
-        styled_html = self.get_mathjax_template(html, bg_color, text_color)
-        self.web_view.setHtml(styled_html)
-        self.web_view.page().runJavaScript(f"window.scrollTo(0, {scroll_pos});")
+        # The page stays loaded, so the scroll position survives the update
+        self.step_page.set_theme(self.current_theme)
+        self.step_page.show(html)
 
     def format_number(self, num):
         if isinstance(num, float) and num.is_integer():
@@ -86,12 +161,22 @@ class InvRowWindow(QWidget):
             QPushButton:hover { background: #2ea043; }
         """)
         btn.clicked.connect(self.calculate)
-        layout.addWidget(btn)
+
+        # How much of the solution Calculate shows
+        self.verbosity_box = VerbosityBox()
+        button_row = QHBoxLayout()
+        button_row.addWidget(btn, 1)
+        button_row.addWidget(self.verbosity_box)
+        layout.addLayout(button_row)
+
+        # Progress of the running calculation (hidden when idle)
+        self.progress = JobProgress()
+        layout.addWidget(self.progress)
 
         # Steps Display
-        self.web_view = QWebEngineView()
-        self.web_view.setHtml(self.get_mathjax_template())
-        layout.addWidget(self.web_view, 1)
+        self.step_view, self.step_page = create_step_view(self.get_mathjax_template)
+        self.step_page.typeset.connect(self.progress.finish)
+        layout.addWidget(self.step_view, 1)
 
     def create_matrix_input(self):
         matrix = QWidget()
@@ -107,135 +192,68 @@ class InvRowWindow(QWidget):
         return matrix, inputs
 
     def calculate(self):
-        try:
-            values = [float(inp.text()) for inp in self.all_inputs]
-            a, b, c, d = values
-            steps = self.generate_steps(a, b, c, d)
-            self.last_html = steps
-            is_dark = self.current_theme == "dark"
-            bg_color = "#0d1117" if is_dark else "#ffffff"
-            text_color = "#c9d1d9" if is_dark else "#1f1f1f"
-            self.web_view.setHtml(self.get_mathjax_template(steps, bg_color, text_color))
-            self.last_values = values
-        except ValueError as e:
-            error_html = self.get_mathjax_template(
-                f"<div style='color: red'>Error: {e}</div>",
-                "#0d1117" if self.current_theme == "dark" else "#ffffff",
-                "#c9d1d9" if self.current_theme == "dark" else "#1f1f1f"
-            )
-            self.web_view.setHtml(error_html)
-
-    def update_display(self):
-        """Refresh display with current theme"""
-        if hasattr(self, 'last_values'):
-            steps = self.generate_steps(*self.last_values)
-            self.web_view.setHtml(self.get_mathjax_template(steps))
-
-    def generate_steps(self, a, b, c, d):
-        from fractions import Fraction
-
-        # turn floats/ints into nice fraction strings
-        def fmt(x):
-            f = Fraction(x).limit_denominator()
-            if f.denominator == 1:
-                return str(f.numerator)
-            # keep denominator positive
-            if f.denominator < 0:
-                f = Fraction(-f.numerator, -f.denominator)
-            return f"\\frac{{{f.numerator}}}{{{f.denominator}}}"
-
-        colors = {
-            'header': "#4192f0",
-            'matrix': "#db2c52",
-            'operation': "#0d9e66",
-            'final': "#291be3"
-        }
-
-        # helper to render a 2×2 matrix in LaTeX
-        def mat(m):
-            return (
-                "\\begin{bmatrix}"
-                f"{fmt(m[0][0])} & {fmt(m[0][1])}\\\\ "
-                f"{fmt(m[1][0])} & {fmt(m[1][1])}"
-                "\\end{bmatrix}"
-            )
-
-        steps = []
-        L = [[a, b], [c, d]]
-        R = [[1, 0], [0, 1]]
-
-        # — Initial Equation —
-        steps.append(f"""
-        <div class="step">
-          <span style="color:{colors['header']}">Initial Equation:</span><br/>
-          $$\\color{{{colors['matrix']}}}{mat(L)}\\color{{black}}\\cdot A^{{-1}}
-             =\\color{{{colors['matrix']}}}{mat(R)}$$
-        </div>
-        """)
-
-        def row_op(desc, newL, newR):
-            steps.append(f"""
-            <div class="step">
-              <span style="color:{colors['operation']}">Row Operation:</span>&nbsp;
-              ${desc}$<br/>
-              $$\\color{{{colors['matrix']}}}{mat(newL)}\\color{{black}}\\cdot A^{{-1}}
-                 =\\color{{{colors['matrix']}}}{mat(newR)}$$
-            </div>
-            """)
+        # Exact mode: entries are Fractions so the shown steps are the computed ones
+        run_steps(self, engine.parse_exact, step_list)
+
+    def show_steps(self, steps, values):
+        self.last_steps = steps
+        self.progress.report("render", 100)
+        self.step_view.show_steps(steps)
+        self.last_values = values
+
+    def show_error(self, e):
+        self.step_view.show_html(f"<div style='color: red'>Error: {e}</div>")
+
+    @staticmethod
+    @verbosity_levels(KEY_STEPS, result_step)
+    def generate_steps(a, b, c, d):
+        a, b, c, d = map(Fraction, (a, b, c, d))
+        if engine.exact_determinant([a, b, c, d]) == 0:
+            raise engine.SingularMatrixError("Inverse does not exist (|A| = 0)")
+        checkpoint("steps", 50)
+
+        L = ((a, b), (c, d))
+        R = ((Fraction(1), Fraction(0)), (Fraction(0), Fraction(1)))
+        yield Step("initial", (), (L, R))
+
+        # Each row operation's step carries the (L, R) it leads to
+        def scale(row, L, R):
+            # R_row -> (1/d) R_row
+            d = L[row][row]
+            L = tuple(tuple(x / d for x in r) if i == row else r for i, r in enumerate(L))
+            R = tuple(tuple(x / d for x in r) if i == row else r for i, r in enumerate(R))
+            return Step("scale", (row, d), (L, R))
+
+        def eliminate(row, source, L, R):
+            # R_row -> R_row - m R_source
+            m = L[row][source]
+            L = tuple(tuple(x - m * y for x, y in zip(r, L[source])) if i == row else r for i, r in enumerate(L))
+            R = tuple(tuple(x - m * y for x, y in zip(r, R[source])) if i == row else r for i, r in enumerate(R))
+            return Step("eliminate", (row, source, m), (L, R))
 
         # Step 1: Normalize R1
         if L[0][0] != 1:
-            d = L[0][0]
-            newL = [[x / d for x in L[0]], L[1].copy()]
-            newR = [[x / d for x in R[0]], R[1].copy()]
-            row_op(f"R_1 \\to \\tfrac{{1}}{{{fmt(d)}}}R_1", newL, newR)
-            L, R = newL, newR
-
+            step = scale(0, L, R)
+            L, R = step.result
+            yield step
         # Step 2: Eliminate below
         if L[1][0] != 0:
-            m = L[1][0]
-            newL = [
-                L[0].copy(),
-                [L[1][i] - m * L[0][i] for i in (0, 1)]
-            ]
-            newR = [
-                R[0].copy(),
-                [R[1][i] - m * R[0][i] for i in (0, 1)]
-            ]
-            row_op(f"R_2 \\to R_2 - ({fmt(m)})R_1", newL, newR)
-            L, R = newL, newR
-
+            step = eliminate(1, 0, L, R)
+            L, R = step.result
+            yield step
         # Step 3: Normalize R2
         if L[1][1] not in (0, 1):
-            d = L[1][1]
-            newL = [L[0].copy(), [x / d for x in L[1]]]
-            newR = [R[0].copy(), [x / d for x in R[1]]]
-            row_op(f"R_2 \\to \\tfrac{{1}}{{{fmt(d)}}}R_2", newL, newR)
-            L, R = newL, newR
-
+            step = scale(1, L, R)
+            L, R = step.result
+            yield step
         # Step 4: Eliminate above
         if L[0][1] != 0:
-            m = L[0][1]
-            newL = [
-                [L[0][i] - m * L[1][i] for i in (0, 1)],
-                L[1].copy()
-            ]
-            newR = [
-                [R[0][i] - m * R[1][i] for i in (0, 1)],
-                R[1].copy()
-            ]
-            row_op(f"R_1 \\to R_1 - ({fmt(m)})R_2", newL, newR)
-            L, R = newL, newR
+            step = eliminate(0, 1, L, R)
+            L, R = step.result
+            yield step
 
         # — Final Result —
-        steps.append(f"""
-        <div class="step" style="color:{colors['final']}">
-          $${mat([[1, 0], [0, 1]])}\\cdot A^{{-1}}={mat(R)}$$
-          $$\\therefore A^{{-1}}={mat(R)}$$
-        </div>
-        """)
-
-        return "".join(steps)
+        yield Step("final", (), R)
 
     def get_mathjax_template(self, content="", bg_color="#0d1117", text_color="white"):
         return f"""
@@ -254,8 +272,7 @@ class InvRowWindow(QWidget):
                     }}
                 }};
             </script>
-            <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-            <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
+            {mathjax_script()}
             <style>
                 body {{
                     background-color: {bg_color};
@@ -297,8 +314,7 @@ class InvRowWindow(QWidget):
                     }}
                 }};
             </script>
-            <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-            <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
+            {mathjax_script()}
             <style>
                 body {{
                     background-color: {bg_color};
@@ -334,8 +350,7 @@ class InvRowWindow(QWidget):
                     }}
                 }};
             </script>
-            <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-            <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
+            {mathjax_script()}
             <style>
                 body {{
                     background-color: {bg_color};
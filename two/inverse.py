@@ -1,6 +1,89 @@
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
-from PyQt6.QtWebEngineWidgets import QWebEngineView
+
+import engine
+from engine.progress import checkpoint
+from ui.progress import JobProgress
+from ui.stepview import create_step_view
+from ui.steps import Step, StepList, verbosity_levels
+from ui.theme import STEP_COLORS
+from ui.mathjax import mathjax_script
+from ui.verbosity import VerbosityBox
+from ui.worker import run_steps
+
+def format_num(num):
+    if isinstance(num, float) and num.is_integer():
+        return str(int(num))
+    return f"{num:.2f}"
+
+
+def render_step(step):
+    colors = STEP_COLORS
+
+    if step.kind == "singular":
+        return fr"\[\color{{{colors['final']}}}\text{{Inverse does not exist (|A| = 0)}}\]"
+    if step.kind == "heading":
+        return fr"\[\color{{{colors['header']}}}\text{{{step.operands[0]}}}\]"
+    if step.kind == "cofactor":
+        index, sign, entry = step.operands
+        return (fr"\[\color{{{colors['calculation']}}}A_{{{index}}} = "
+                fr"({'+' if sign > 0 else '-'}1){format_num(entry)} = {format_num(step.result)}\]")
+
+    a, b, c, d = step.operands
+    a_f, b_f, c_f, d_f = map(format_num, step.operands)
+    if step.kind == "matrix":
+        return (
+            fr"\[\color{{{colors['header']}}}\text{{Let }}A = "
+            fr"\color{{{colors['matrix']}}}"
+            fr"\begin{{bmatrix}} {a_f} & {b_f} \\ {c_f} & {d_f} \end{{bmatrix}}\]"
+        )
+    if step.kind == "determinant":
+        return fr"\[\color{{{colors['header']}}}|A| = ({a_f})({d_f}) - ({b_f})({c_f})\]"
+    if step.kind == "products":
+        ad, bc = map(format_num, step.result)
+        return fr"\[\color{{{colors['calculation']}}}|A| = {ad} - {bc}\]"
+    if step.kind == "det":
+        return fr"\[\color{{{colors['calculation']}}}|A| = {format_num(step.result)}\]"
+    if step.kind == "cofactors":
+        return (
+            fr"\[\color{{{colors['header']}}}\text{{Cofactor Matrix:}}"
+            fr"\color{{{colors['matrix']}}}"
+            fr"\begin{{bmatrix}} {format_num(d)} & {format_num(-c)} \\ {format_num(-b)} & {format_num(a)} \end{{bmatrix}}\]"
+        )
+
+    adjoint = fr"\begin{{bmatrix}} {format_num(d)} & {format_num(-b)} \\ {format_num(-c)} & {format_num(a)} \end{{bmatrix}}"
+    if step.kind == "adjoint":
+        return (
+            fr"\[\color{{{colors['header']}}}\text{{Adjoint Matrix (Transpose):}}"
+            fr"\color{{{colors['matrix']}}}{adjoint}\]"
+        )
+    # Inverse calculation
+    return (
+        fr"\[\color{{{colors['final']}}}A^{{-1}} = \frac{{1}}{{{format_num(step.result)}}}"
+        fr"\color{{{colors['matrix']}}}{adjoint}\]"
+    )
+
+
+# Steps kept at KEY verbosity
+KEY_STEPS = {"matrix", "det", "singular", "adjoint", "inverse"}
+
+
+def result_step(a, b, c, d):
+    """The final step alone, for RESULT verbosity"""
+    det = engine.determinant(engine.as_matrix([a, b, c, d]))
+    if det == 0:
+        return Step("singular")
+    return Step("inverse", (a, b, c, d), det)
+
+
+def step_list(steps=()):
+    """The StepList generate_steps' records are collected in"""
+    return StepList(steps, render_step, separator="<hr>", head="""
+        <div style="text-align: center; padding: 20px;">
+            """, tail="""
+        </div>
+        """)
+
 
 class InverseWindow(QWidget):
     def __init__(self):
@@ -14,8 +97,6 @@ class InverseWindow(QWidget):
     def update_theme(self, theme):
         self.current_theme = theme
         self.update_styles()
-        if hasattr(self, 'last_values'):
-            self.update_display()
 
     def update_styles(self, text_color=None):
         is_dark = self.current_theme == "dark"
@@ -39,23 +120,13 @@ class InverseWindow(QWidget):
         for inp in self.all_inputs:
             inp.setStyleSheet(input_style)
 
-        if hasattr(self, 'last_html'):
-            self.web_view.setHtml(self.get_mathjax_template(self.last_html, bg_color, text_color))
+        if hasattr(self, 'step_page'):
+            self.step_page.set_theme(self.current_theme)
 
     def update_web_view_content(self, html):
-        is_dark = self.current_theme == "dark"
-        bg_color = "#0d1117" if is_dark else "#ffffff"
-        text_color = "#c9d1d9" if is_dark else "#1f1f1f"
-
-        self.web_view.page().runJavaScript(
-            "window.scrollY",
-            lambda pos: self.apply_theme_with_scroll(pos, html, bg_color, text_color)
-        )
-
-    def apply_theme_with_scroll(self, scroll_pos, html, bg_color, text_color):
-        styled_html = self.get_mathjax_template(html, bg_color, text_color)
-        self.web_view.setHtml(styled_html)
-        self.web_view.page().runJavaScript(f"window.scrollTo(0, {scroll_pos});")
+        # The page stays loaded, so the scroll position survives the update
+        self.step_page.set_theme(self.current_theme)
+        self.step_page.show(html)
 
     def format_number(self, num):
         if isinstance(num, float) and num.is_integer():
@@ -85,12 +156,22 @@ class InverseWindow(QWidget):
             QPushButton:hover { background: #2ea043; }
         """)
         btn.clicked.connect(self.calculate)
-        layout.addWidget(btn)
+
+        # How much of the solution Calculate shows
+        self.verbosity_box = VerbosityBox()
+        button_row = QHBoxLayout()
+        button_row.addWidget(btn, 1)
+        button_row.addWidget(self.verbosity_box)
+        layout.addLayout(button_row)
+
+        # Progress of the running calculation (hidden when idle)
+        self.progress = JobProgress()
+        layout.addWidget(self.progress)
 
         # Steps Display
-        self.web_view = QWebEngineView()
-        self.web_view.setHtml(self.get_mathjax_template())
-        layout.addWidget(self.web_view, 1)
+        self.step_view, self.step_page = create_step_view(self.get_mathjax_template)
+        self.step_page.typeset.connect(self.progress.finish)
+        layout.addWidget(self.step_view, 1)
 
     def create_matrix_input(self):
         matrix = QWidget()
@@ -106,104 +187,42 @@ class InverseWindow(QWidget):
         return matrix, inputs
 
     def calculate(self):
-        try:
-            values = [float(inp.text()) for inp in self.all_inputs]
-            a, b, c, d = values
-            steps = self.generate_steps(a, b, c, d)
-            self.last_html = steps
-            is_dark = self.current_theme == "dark"
-            bg_color = "#0d1117" if is_dark else "#ffffff"
-            text_color = "#c9d1d9" if is_dark else "#1f1f1f"
-            self.web_view.setHtml(self.get_mathjax_template(steps, bg_color, text_color))
-            self.last_values = values
-        except ValueError as e:
-            error_html = self.get_mathjax_template(
-                f"<div style='color: red'>⚠️ Please check and enter an integer value in each field correctly. All fields are required.</div>",
-                "#0d1117" if self.current_theme == "dark" else "#ffffff",
-                "#c9d1d9" if self.current_theme == "dark" else "#1f1f1f"
-            )
-            self.web_view.setHtml(error_html)
-
-    def update_display(self):
-        """Refresh display with current theme"""
-        if hasattr(self, 'last_values'):
-            steps = self.generate_steps(*self.last_values)
-            self.web_view.setHtml(self.get_mathjax_template(steps))
-
-    def generate_steps(self, a, b, c, d):
-        is_dark = self.current_theme == "dark"
-        colors = {
-            'header': "#4192f0" if is_dark else "#d60326",
-            'matrix': "#db2c52" if is_dark else "#400612",
-            'calculation': "#0d9e66" if is_dark else "#bc4c00",
-            'final': "#291be3" if is_dark else "#8250df"
-        }
-
-        format_num = lambda x: self.format_number(x)
-        a_f, b_f, c_f, d_f = map(format_num, [a, b, c, d])
-        det = a * d - b * c
-
-        steps = []
-
-        # Step 1: Matrix definition
-        matrix_def = (
-            fr"\color{{{colors['header']}}}\text{{Let }}A = "
-            fr"\color{{{colors['matrix']}}}"
-            fr"\begin{{bmatrix}} {a_f} & {b_f} \\ {c_f} & {d_f} \end{{bmatrix}}"
-        )
-        steps.append(fr"\[{matrix_def}\]")
+        run_steps(self, float, step_list)
+
+    def show_steps(self, steps, values):
+        self.last_steps = steps
+        self.progress.report("render", 100)
+        self.step_view.show_steps(steps)
+        self.last_values = values
+
+    def show_error(self, e):
+        self.step_view.show_html(f"<div style='color: red'>⚠️ Please check and enter an integer value in each field correctly. All fields are required.</div>")
 
-        # Step 2: Determinant calculation
-        det_steps = [
-            fr"\color{{{colors['header']}}}|A| = ({a_f})({d_f}) - ({b_f})({c_f})",
-            fr"\color{{{colors['calculation']}}}|A| = {format_num(a * d)} - {format_num(b * c)}",
-            fr"\color{{{colors['calculation']}}}|A| = {format_num(det)}"
-        ]
-        steps.extend([fr"\[{s}\]" for s in det_steps])
+    @staticmethod
+    @verbosity_levels(KEY_STEPS, result_step)
+    def generate_steps(a, b, c, d):
+        A = (a, b, c, d)
+
+        # Step 1: Matrix definition, Step 2: Determinant calculation
+        yield Step("matrix", A)
+        yield Step("determinant", A)
+        yield Step("products", A, (a * d, b * c))
+        det = engine.determinant(engine.as_matrix([a, b, c, d]))
+        checkpoint("steps", 50)
+        yield Step("det", A, det)
 
         if det == 0:
-            steps.append(fr"\[\color{{{colors['final']}}}\text{{Inverse does not exist (|A| = 0)}}\]")
-        else:
-            # Step 3: Cofactor calculations
-            steps.append(fr"\[\color{{{colors['header']}}}\text{{Cofactor Calculations:}}\]")
-
-            cofactor_steps = [
-                fr"\color{{{colors['calculation']}}}A_{{11}} = (+1){d_f} = {format_num(d)}",
-                fr"\color{{{colors['calculation']}}}A_{{12}} = (-1){c_f} = {format_num(-c)}",
-                fr"\color{{{colors['calculation']}}}A_{{21}} = (-1){b_f} = {format_num(-b)}",
-                fr"\color{{{colors['calculation']}}}A_{{22}} = (+1){a_f} = {format_num(a)}"
-            ]
-            steps.extend([fr"\[{s}\]" for s in cofactor_steps])
-
-            # Step 4: Cofactor Matrix
-            cofactor_matrix = (
-                fr"\color{{{colors['header']}}}\text{{Cofactor Matrix:}}"
-                fr"\color{{{colors['matrix']}}}"
-                fr"\begin{{bmatrix}} {format_num(d)} & {format_num(-c)} \\ {format_num(-b)} & {format_num(a)} \end{{bmatrix}}"
-            )
-            steps.append(fr"\[{cofactor_matrix}\]")
-
-            # Step 5: Adjoint Matrix
-            adjoint_step = (
-                fr"\color{{{colors['header']}}}\text{{Adjoint Matrix (Transpose):}}"
-                fr"\color{{{colors['matrix']}}}"
-                fr"\begin{{bmatrix}} {format_num(d)} & {format_num(-b)} \\ {format_num(-c)} & {format_num(a)} \end{{bmatrix}}"
-            )
-            steps.append(fr"\[{adjoint_step}\]")
-
-            # Step 6: Inverse Calculation
-            inverse_step = (
-                fr"\color{{{colors['final']}}}A^{{-1}} = \frac{{1}}{{{format_num(det)}}}"
-                fr"\color{{{colors['matrix']}}}"
-                fr"\begin{{bmatrix}} {format_num(d)} & {format_num(-b)} \\ {format_num(-c)} & {format_num(a)} \end{{bmatrix}}"
-            )
-            steps.append(fr"\[{inverse_step}\]")
-
-        return f'''
-        <div style="text-align: center; padding: 20px;">
-            {"<hr>".join(steps)}
-        </div>
-        '''
+            yield Step("singular")
+            return
+
+        # Step 3: Cofactor calculations, A_ij = (sign) times the remaining entry
+        yield Step("heading", ("Cofactor Calculations:",))
+        for index, sign, entry in (("11", 1, d), ("12", -1, c), ("21", -1, b), ("22", 1, a)):
+            yield Step("cofactor", (index, sign, entry), sign * entry)
+        # Step 4-6: Cofactor matrix, adjoint, inverse
+        yield Step("cofactors", A)
+        yield Step("adjoint", A)
+        yield Step("inverse", A, det)
 
     def get_mathjax_template(self, content="", bg_color="#0d1117", text_color="white"):
         return f"""
@@ -222,8 +241,7 @@ class InverseWindow(QWidget):
                     }}
                 }};
             </script>
-            <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-            <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
+            {mathjax_script()}
             <style>
                 body {{
                     background-color: {bg_color};
@@ -265,8 +283,7 @@ class InverseWindow(QWidget):
                     }}
                 }};
             </script>
-            <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-            <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
+            {mathjax_script()}
             <style>
                 body {{
                     background-color: {bg_color};
@@ -302,8 +319,7 @@ class InverseWindow(QWidget):
                     }}
                 }};
             </script>
-            <script src="https://polyfill.io/v3/polyfill.min.js?features=es6"></script>
-            <script id="MathJax-script" async src="https://cdn.jsdelivr.net/npm/mathjax@3/es5/tex-mml-chtml.js"></script>
+            {mathjax_script()}
             <style>
                 body {{
                     background-color: {bg_color};
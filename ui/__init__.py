@@ -0,0 +1,2 @@
+# ui
+# Qt helpers shared by the 2x2 and 3x3 calculator windows.
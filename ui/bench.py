@@ -0,0 +1,60 @@
+# bench.py
+# Step benchmarks, run with:  python -m ui.bench [section ...]
+# The step generators live with their windows, so this needs PyQt6
+# installed (but no QApplication); engine.bench has the Qt-free ones.
+import argparse
+import importlib
+import inspect
+
+import numpy as np
+
+from engine.bench import best_time
+from ui.steps import VERBOSITY
+
+
+# Operations whose generate_steps the verbosity section times
+VERBOSITY_OPERATIONS = (
+    "two.inverse:InverseWindow",
+    "three.multiplication:MultiplicationWindow",
+    "three.inverse:InverseWindow3x3",
+)
+
+
+def bench_verbosity(operations=VERBOSITY_OPERATIONS, calls=200):
+    rng = np.random.default_rng(0)
+    print(f"steps per verbosity level ({calls} calls, generate = Step records, render = LaTeX/HTML)")
+    for operation in operations:
+        module_name, class_name = operation.split(":")
+        module = importlib.import_module(module_name)
+        generate = getattr(module, class_name).generate_steps
+        arity = len(inspect.signature(generate.__wrapped__).parameters)
+        inputs = [[float(x) for x in rng.integers(-9, 10, arity)] for _ in range(calls)]
+        print(f"  {operation}")
+        for level in VERBOSITY:
+            records = [list(generate(*values, verbosity=level)) for values in inputs]
+            t_generate = best_time(lambda: [list(generate(*values, verbosity=level)) for values in inputs])
+            t_render = best_time(lambda: [module.step_list(steps).html() for steps in records])
+            size = sum(len(module.step_list(steps).html()) for steps in records) / calls
+            steps = sum(map(len, records)) / calls
+            print(f"    {level:<8}{steps:>6.1f} steps  generate {t_generate / calls * 1e6:>7.1f} us"
+                  f"  render {t_render / calls * 1e6:>7.1f} us  html {size:>7.0f} B")
+
+
+SECTIONS = {
+    "verbosity": bench_verbosity,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Step generation benchmarks")
+    parser.add_argument("sections", nargs="*", help=f"any of: {', '.join(SECTIONS)} (default: all)")
+    args = parser.parse_args(argv)
+    unknown = set(args.sections) - set(SECTIONS)
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(sorted(unknown))}")
+    for name in args.sections or SECTIONS:
+        SECTIONS[name]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# mathjax.py
+# Local MathJax for the step views.
+# Pages are loaded with a file:// base URL pointing at assets/mathjax, so the
+# renderer comes from disk (and Chromium's cache) instead of the CDN, and
+# air-gapped machines can typeset at all. When the vendored copy is missing
+# the CDN is used as before.
+#
+# Vendor it once (needs network):   python -m ui.mathjax --vendor
+# Every window imports this module at startup, so the download's modules
+# are only imported by vendor() and the command line.
+import os
+
+MATHJAX_VERSION = "3.2.2"
+MATHJAX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "mathjax")
+MATHJAX_ENTRY = "tex-mml-chtml.js"
+CDN_URL = f"https://cdn.jsdelivr.net/npm/mathjax@{MATHJAX_VERSION}/es5/{MATHJAX_ENTRY}"
+
+
+def is_vendored():
+    return os.path.isfile(os.path.join(MATHJAX_DIR, MATHJAX_ENTRY))
+
+
+def mathjax_src():
+    return MATHJAX_ENTRY if is_vendored() else CDN_URL
+
+
+def mathjax_script():
+    """The <script> tag every template puts in its <head>"""
+    return f'<script id="MathJax-script" async src="{mathjax_src()}"></script>'
+
+
+def base_url():
+    # Trailing slash so relative paths resolve inside the directory
+    from PyQt6.QtCore import QUrl
+    return QUrl.fromLocalFile(MATHJAX_DIR + os.sep)
+
+
+def set_html(web_view, html):
+    """setHtml with the local base URL so the vendored MathJax resolves"""
+    web_view.setHtml(html, base_url())
+
+
+def vendor(version=MATHJAX_VERSION, target=MATHJAX_DIR):
+    """Download the MathJax es5 bundle from npm into assets/mathjax
+
+    The speech rule engine locale maps are skipped, nothing in the
+    calculator enables speech output.
+    """
+    import io
+    import tarfile
+    import urllib.request
+
+    url = f"https://registry.npmjs.org/mathjax/-/mathjax-{version}.tgz"
+    with urllib.request.urlopen(url) as response:
+        data = response.read()
+    count = 0
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as archive:
+        for member in archive.getmembers():
+            if not member.isfile() or not member.name.startswith("package/es5/"):
+                continue
+            relative = member.name[len("package/es5/"):]
+            if relative.startswith("sre/mathmaps/"):
+                continue
+            path = os.path.join(target, *relative.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with archive.extractfile(member) as src, open(path, "wb") as dst:
+                dst.write(src.read())
+            count += 1
+        license_file = archive.extractfile("package/LICENSE")
+        with open(os.path.join(target, "LICENSE"), "wb") as dst:
+            dst.write(license_file.read())
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the bundled MathJax copy")
+    parser.add_argument("--vendor", action="store_true", help="download MathJax into assets/mathjax")
+    parser.add_argument("--version", default=MATHJAX_VERSION)
+    args = parser.parse_args()
+    if args.vendor:
+        print(f"Vendored {vendor(args.version)} files into {MATHJAX_DIR}")
+    else:
+        print(f"MathJax {'found' if is_vendored() else 'missing'} in {MATHJAX_DIR}")
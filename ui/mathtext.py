@@ -0,0 +1,697 @@
+# mathtext.py
+# Browser-free step renderer. Every math fragment in the step HTML is drawn
+# with matplotlib's mathtext into a PNG (or SVG) and the page is shown in a
+# QTextBrowser, so a window needs no Chromium renderer process at all.
+# mathtext knows no environments or colour commands, so a fragment is first
+# split into boxes: plain mathtext runs, \begin{..matrix} grids and
+# \left..\right groups, laid out here. \color and \large are parsed as state.
+# Rendered images are cached by (fragment, colour, size, dpi, format) in
+# memory and as files under the Qt cache location. Pages draw the fragments
+# they miss on the worker pool, the UI thread only lays out finished images.
+import hashlib
+import io
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from html import escape
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.patches import PathPatch
+from matplotlib.path import Path
+from matplotlib.transforms import IdentityTransform
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtGui import QGuiApplication, QImage
+from PyQt6.QtWidgets import QTextBrowser
+
+from engine.progress import checkpoint
+from ui.startup import render_times
+from ui.theme import palette, resolve
+from ui.typeset_cache import MATH_PATTERN, default_path
+from ui.worker import run_in_background
+
+BASE_SIZE = 12          # pt, 16px at 96 dpi like the MathJax pages
+LARGE = 1.2             # \large, same factor as MathJax
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+COMMAND = re.compile(r"\\([a-zA-Z]+|.)")
+STRUCTURAL = re.compile(r"\\(?:color|large|normalsize|begin|left)(?![a-zA-Z])")
+LEFT_RIGHT = re.compile(r"\\(left|right)(?![a-zA-Z])")
+WHITESPACE = re.compile(r"\s+")
+
+# Delimiters of the matrix environments
+ENVIRONMENTS = {
+    "matrix": (".", "."),
+    "pmatrix": ("(", ")"),
+    "bmatrix": ("[", "]"),
+    "vmatrix": ("|", "|"),
+}
+
+# Delimiter outlines in a unit box, u=0 is the outer edge
+_SHAPES = {
+    "(": ([(1, 1), (-1, 0.5), (1, 0)], [Path.MOVETO, Path.CURVE3, Path.CURVE3]),
+    "[": ([(1, 1), (0, 1), (0, 0), (1, 0)], [Path.MOVETO, Path.LINETO, Path.LINETO, Path.LINETO]),
+    "|": ([(0.5, 1), (0.5, 0)], [Path.MOVETO, Path.LINETO]),
+}
+_MIRRORS = {")": "(", "]": "[", "|": "|"}
+
+
+# -- parsing ----------------------------------------------------------------
+def _argument(tex, i):
+    """The {...} argument starting at (or after whitespace from) tex[i]"""
+    while i < len(tex) and tex[i].isspace():
+        i += 1
+    if i >= len(tex) or tex[i] != "{":
+        raise ValueError(f"missing argument in {tex!r}")
+    j = _matching(tex, i)
+    return tex[i + 1:j].strip(), j + 1
+
+
+def _matching(tex, i):
+    """Index of the brace closing the one at tex[i]"""
+    depth = 0
+    j = i
+    while j < len(tex):
+        c = tex[j]
+        if c == "\\":
+            j += 2
+            continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return j
+        j += 1
+    raise ValueError(f"unbalanced braces in {tex!r}")
+
+
+def _delimiter(tex, i):
+    while i < len(tex) and tex[i].isspace():
+        i += 1
+    m = COMMAND.match(tex, i)
+    if m:
+        return m.group(0), m.end()
+    if i >= len(tex):
+        raise ValueError(f"missing delimiter in {tex!r}")
+    return tex[i], i + 1
+
+
+def _environment_end(tex, i, env):
+    """(start, end) of the \\end{env} closing an environment opened before i"""
+    begin, end = f"\\begin{{{env}}}", f"\\end{{{env}}}"
+    depth = 1
+    for m in re.finditer(re.escape(begin) + "|" + re.escape(end), tex[i:]):
+        depth += 1 if m.group(0) == begin else -1
+        if depth == 0:
+            return i + m.start(), i + m.end()
+    raise ValueError(f"unterminated {env} in {tex!r}")
+
+
+def _right(tex, i):
+    """(inner end, closing delimiter, end) of the \\right matching a \\left before i"""
+    depth = 1
+    for m in LEFT_RIGHT.finditer(tex, i):
+        depth += 1 if m.group(1) == "left" else -1
+        if depth == 0:
+            delim, end = _delimiter(tex, m.end())
+            return m.start(), delim, end
+    raise ValueError(f"\\left without \\right in {tex!r}")
+
+
+def _split(tex, sep):
+    """Split on sep outside of groups and environments"""
+    parts, start, depth, i = [], 0, 0, 0
+    while i < len(tex):
+        if depth == 0 and tex.startswith(sep, i):
+            parts.append(tex[start:i])
+            i += len(sep)
+            start = i
+            continue
+        if tex.startswith("\\begin", i):
+            depth += 1
+            i += 6
+            continue
+        if tex.startswith("\\end", i):
+            depth -= 1
+            i += 4
+            continue
+        c = tex[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+        i += 1
+    parts.append(tex[start:])
+    return parts
+
+
+def parse(tex, color=None, size=BASE_SIZE, normal=BASE_SIZE):
+    """Parse a TeX fragment into a box tree"""
+    nodes, run = [], []
+
+    def flush():
+        text = "".join(run).strip()
+        if text.endswith("\\"):
+            text += " "  # the space of a trailing control space "\ "
+        if text:
+            nodes.append(_Run(text, color, size))
+        run.clear()
+
+    i = 0
+    while i < len(tex):
+        c = tex[i]
+        if c == "\\":
+            m = COMMAND.match(tex, i)
+            name = m.group(1)
+            if name == "color":
+                flush()
+                color, i = _argument(tex, m.end())
+            elif name in ("large", "normalsize"):
+                flush()
+                size = normal * LARGE if name == "large" else normal
+                i = m.end()
+            elif name == "begin":
+                flush()
+                env, start = _argument(tex, m.end())
+                if env not in ENVIRONMENTS:
+                    raise ValueError(f"unsupported environment {env!r}")
+                body_end, i = _environment_end(tex, start, env)
+                rows = [row for row in _split(tex[start:body_end], "\\\\") if row.strip()]
+                cells = [[parse(cell, color, size, normal) for cell in _split(row, "&")] for row in rows]
+                nodes.append(_Matrix(cells, *ENVIRONMENTS[env], color, size))
+            elif name == "left":
+                flush()
+                opening, start = _delimiter(tex, m.end())
+                inner_end, closing, i = _right(tex, start)
+                inner = parse(tex[start:inner_end], color, size, normal)
+                nodes.append(_Fenced(inner, opening, closing, color, size))
+            else:
+                run.append(m.group(0))
+                i = m.end()
+            continue
+        if c == "{":
+            j = _matching(tex, i)
+            if STRUCTURAL.search(tex, i, j):
+                flush()
+                nodes.append(parse(tex[i + 1:j], color, size, normal))
+            else:
+                run.append(tex[i:j + 1])
+            i = j + 1
+            continue
+        run.append(c)
+        i += 1
+    flush()
+    return _HBox(nodes)
+
+
+# -- layout -----------------------------------------------------------------
+class _Context:
+    """Figure, text renderer and default colour of one drawing"""
+
+    def __init__(self, figure, renderer, dpi, color):
+        self.figure = figure
+        self.renderer = renderer
+        self.dpi = dpi
+        self.color = color
+
+    def em(self, size):
+        return size * self.dpi / 72
+
+    def axis(self, size):
+        # height of the math axis (centre of + and -) above the baseline
+        return 0.25 * self.em(size)
+
+    def line_width(self, size):
+        # in points, which is what matplotlib expects
+        return 0.06 * self.em(size) * 72 / self.dpi
+
+
+class _Run:
+    __slots__ = ("tex", "color", "size", "width", "ascent", "descent")
+
+    def __init__(self, tex, color, size):
+        # mathtext rejects line breaks and has no \tfrac
+        self.tex = "$" + WHITESPACE.sub(" ", tex).replace("\\tfrac", "\\frac") + "$"
+        self.color = color
+        self.size = size
+
+    def measure(self, ctx):
+        width, height, descent = ctx.renderer.get_text_width_height_descent(
+            self.tex, FontProperties(size=self.size), ismath=True)
+        self.width, self.ascent, self.descent = width, height - descent, descent
+
+    def draw(self, ctx, x, y):
+        ctx.figure.text(x, y, self.tex, color=self.color or ctx.color, fontsize=self.size,
+                        ha="left", va="baseline", transform=IdentityTransform())
+
+
+class _HBox:
+    __slots__ = ("children", "width", "ascent", "descent", "gap")
+
+    def __init__(self, children):
+        self.children = children
+
+    def measure(self, ctx):
+        for child in self.children:
+            child.measure(ctx)
+        self.gap = 0.25 * ctx.em(BASE_SIZE)
+        self.width = sum(child.width for child in self.children) + self.gap * max(len(self.children) - 1, 0)
+        self.ascent = max((child.ascent for child in self.children), default=0)
+        self.descent = max((child.descent for child in self.children), default=0)
+
+    def draw(self, ctx, x, y):
+        for child in self.children:
+            child.draw(ctx, x, y)
+            x += child.width + self.gap
+
+
+def _draw_delimiter(ctx, delim, x, bottom, top, width, color, size):
+    mirrored = delim in _MIRRORS and delim not in _SHAPES
+    shape = _SHAPES.get(_MIRRORS.get(delim, delim))
+    if shape is None:
+        return
+    points, codes = shape
+    verts = [(x + ((1 - u) if mirrored else u) * width, bottom + v * (top - bottom)) for u, v in points]
+    ctx.figure.add_artist(PathPatch(Path(verts, codes), fill=False, edgecolor=color,
+                                    linewidth=ctx.line_width(size), capstyle="butt",
+                                    transform=IdentityTransform()))
+
+
+def _delimiter_width(ctx, delim, size):
+    if delim == ".":
+        return 0
+    return (0.15 if delim == "|" else 0.35) * ctx.em(size)
+
+
+class _Matrix:
+    __slots__ = ("cells", "opening", "closing", "color", "size",
+                 "width", "ascent", "descent", "columns", "rows", "pad")
+
+    def __init__(self, cells, opening, closing, color, size):
+        self.cells = cells
+        self.opening = opening
+        self.closing = closing
+        self.color = color
+        self.size = size
+
+    def measure(self, ctx):
+        em = ctx.em(self.size)
+        for row in self.cells:
+            for cell in row:
+                cell.measure(ctx)
+        count = max(len(row) for row in self.cells)
+        self.columns = [max((row[c].width for row in self.cells if c < len(row)), default=0)
+                        for c in range(count)]
+        self.rows = [(max(cell.ascent for cell in row), max(cell.descent for cell in row))
+                     for row in self.cells]
+        self.pad = 0.3 * em
+        height = sum(a + d for a, d in self.rows) + 0.4 * em * (len(self.rows) - 1)
+        self.width = (sum(self.columns) + em * (count - 1) + 2 * self.pad
+                      + _delimiter_width(ctx, self.opening, self.size)
+                      + _delimiter_width(ctx, self.closing, self.size))
+        self.ascent = height / 2 + ctx.axis(self.size)
+        self.descent = height / 2 - ctx.axis(self.size)
+
+    def draw(self, ctx, x, y):
+        em = ctx.em(self.size)
+        color = self.color or ctx.color
+        top, bottom = y + self.ascent, y - self.descent
+        left = _delimiter_width(ctx, self.opening, self.size)
+        _draw_delimiter(ctx, self.opening, x, bottom, top, left, color, self.size)
+        baseline = top
+        for row, (ascent, descent) in zip(self.cells, self.rows):
+            baseline -= ascent
+            cx = x + left + self.pad
+            for cell, width in zip(row, self.columns):
+                cell.draw(ctx, cx + (width - cell.width) / 2, baseline)
+                cx += width + em
+            baseline -= descent + 0.4 * em
+        right = _delimiter_width(ctx, self.closing, self.size)
+        _draw_delimiter(ctx, self.closing, x + self.width - right, bottom, top, right, color, self.size)
+
+
+class _Fenced:
+    __slots__ = ("inner", "opening", "closing", "color", "size", "width", "ascent", "descent", "pad")
+
+    def __init__(self, inner, opening, closing, color, size):
+        self.inner = inner
+        self.opening = opening
+        self.closing = closing
+        self.color = color
+        self.size = size
+
+    def measure(self, ctx):
+        self.inner.measure(ctx)
+        em, axis = ctx.em(self.size), ctx.axis(self.size)
+        half = max(self.inner.ascent - axis, self.inner.descent + axis) + 0.1 * em
+        self.pad = 0.15 * em
+        self.ascent, self.descent = axis + half, half - axis
+        self.width = (self.inner.width + 2 * self.pad
+                      + _delimiter_width(ctx, self.opening, self.size)
+                      + _delimiter_width(ctx, self.closing, self.size))
+
+    def draw(self, ctx, x, y):
+        color = self.color or ctx.color
+        top, bottom = y + self.ascent, y - self.descent
+        left = _delimiter_width(ctx, self.opening, self.size)
+        right = _delimiter_width(ctx, self.closing, self.size)
+        _draw_delimiter(ctx, self.opening, x, bottom, top, left, color, self.size)
+        self.inner.draw(ctx, x + left + self.pad, y)
+        _draw_delimiter(ctx, self.closing, x + self.width - right, bottom, top, right, color, self.size)
+
+
+# -- rendering --------------------------------------------------------------
+_DRAW_LOCK = threading.Lock()
+
+
+class MathTextRenderer:
+    """Renders TeX fragments to PNG or SVG bytes, cached in memory and on disk"""
+
+    def __init__(self, dpi=96, size=BASE_SIZE, fmt="png", cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.dpi = dpi
+        self.size = size
+        self.fmt = fmt
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.warm = False  # fonts and layout code loaded by a first draw
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._failed = set()  # keys of fragments mathtext cannot draw
+
+    def key(self, tex, color, fmt=None):
+        raw = f"{fmt or self.fmt}\0{self.dpi:g}\0{self.size:g}\0{color}\0{tex}".encode("utf-8")
+        return hashlib.sha1(raw).hexdigest()
+
+    def _path(self, key, fmt):
+        return os.path.join(self.cache_dir, f"{key}.{fmt}") if self.cache_dir else None
+
+    def render(self, tex, color="#000000", fmt=None):
+        """Image bytes of tex, drawn in color where it sets none itself"""
+        data = self.cached(tex, color, fmt)
+        if data is None:
+            if self.failed(tex, color, fmt):
+                raise ValueError(f"mathtext cannot draw {tex!r}")
+            try:
+                data = self.draw(tex, color, fmt)
+            except ValueError:
+                self._failed.add(self.key(tex, color, fmt))
+                raise
+            self.save(tex, color, data, fmt)
+            self.store(tex, color, data, fmt)
+        return data
+
+    def cached(self, tex, color="#000000", fmt=None):
+        """Image bytes of tex from memory or disk, None when it was never drawn"""
+        fmt = fmt or self.fmt
+        key = self.key(tex, color, fmt)
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+        path = self._path(key, fmt)
+        if path and os.path.isfile(path):
+            with open(path, "rb") as fh:
+                data = fh.read()
+            self.hits += 1
+            self._put(key, data)
+            return data
+        return None
+
+    def failed(self, tex, color="#000000", fmt=None):
+        return self.key(tex, color, fmt) in self._failed
+
+    def save(self, tex, color, data, fmt=None):
+        """Write drawn bytes to the disk cache, safe from a worker thread"""
+        fmt = fmt or self.fmt
+        path = self._path(self.key(tex, color, fmt), fmt)
+        if path:
+            self._write(path, data)
+
+    def store(self, tex, color, data, fmt=None):
+        """Keep drawn bytes in memory, None marks tex as one mathtext cannot draw"""
+        key = self.key(tex, color, fmt)
+        self.misses += 1
+        if data is None:
+            self._failed.add(key)
+        else:
+            self._put(key, data)
+
+    def draw(self, tex, color="#000000", fmt=None):
+        """Lay out and draw tex, bypassing the cache"""
+        # prewarm_renderer() draws on a worker, mathtext's parser is not thread safe
+        with _DRAW_LOCK:
+            figure = Figure(dpi=self.dpi)
+            canvas = FigureCanvasAgg(figure)
+            ctx = _Context(figure, canvas.get_renderer(), self.dpi, color)
+            box = parse(tex, None, self.size, self.size)
+            box.measure(ctx)
+            pad = 0.15 * ctx.em(self.size)
+            width = math.ceil(box.width + 2 * pad) + 1
+            height = math.ceil(box.ascent + box.descent + 2 * pad) + 1
+            figure.set_size_inches(width / self.dpi, height / self.dpi)
+            box.draw(ctx, pad, pad + box.descent)
+            buffer = io.BytesIO()
+            figure.savefig(buffer, format=fmt or self.fmt, dpi=self.dpi, transparent=True)
+            self.warm = True
+            return buffer.getvalue()
+
+    def _put(self, key, data):
+        self._entries[key] = data
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    @staticmethod
+    def _write(path, data):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # the disk cache is an optimisation only
+
+
+_renderers = {}
+
+
+def shared_renderer(dpi=96):
+    """Process-wide renderer per dpi, caching into the Qt cache location"""
+    if dpi not in _renderers:
+        cache_dir = os.path.join(os.path.dirname(default_path()), "mathtext")
+        _renderers[dpi] = MathTextRenderer(dpi=dpi, cache_dir=cache_dir)
+    return _renderers[dpi]
+
+
+_warming = None
+
+
+def prewarm_renderer(tex, dpi=None):
+    """Draw tex on the worker pool, uncached, so matplotlib's fonts and
+    parser are loaded before the first steps are shown"""
+    global _warming
+    if dpi is None:
+        dpi = round(96 * QGuiApplication.primaryScreen().devicePixelRatio())
+    renderer = shared_renderer(dpi)
+    if renderer.warm or _warming is not None:
+        return
+
+    def done(_):
+        global _warming
+        _warming = None
+
+    _warming = run_in_background(renderer.draw, resolve(tex, "dark"), on_finished=done, on_failed=done)
+
+
+# -- Qt view ----------------------------------------------------------------
+SCRIPT = re.compile(r"<script\b.*?</script>", re.S | re.I)
+
+
+class MathTextView(QTextBrowser):
+    """QTextBrowser serving the rendered fragments as image resources"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.images = {}
+
+    def loadResource(self, kind, url):
+        image = self.images.get(url.toString())
+        if image is not None:
+            return image
+        return super().loadResource(kind, url)
+
+
+def _draw_missing(renderer, fragments):
+    """Draw (tex, colour) pairs on a worker and write them to the disk cache
+
+    Returns (tex, colour, bytes or None) for the UI thread to store, None
+    for a fragment mathtext cannot draw.
+    """
+    drawn = []
+    for tex, color in fragments:
+        checkpoint("render", 100 * len(drawn) / len(fragments))
+        try:
+            data = renderer.draw(tex, color)
+        except ValueError:
+            data = None
+        else:
+            renderer.save(tex, color, data)
+        drawn.append((tex, color, data))
+    return drawn
+
+
+class MathTextPage(QObject):
+    """StepPage counterpart for a MathTextView: same show/set_theme/typeset
+
+    Images carry their colours, so here a theme switch renders the visible
+    steps again (from the image cache once both themes were seen).
+    Fragments that are not cached yet are drawn on the worker pool; the
+    page in view stays up until all of them are there and is then swapped
+    in one setHtml.
+    """
+
+    typeset = pyqtSignal()
+
+    def __init__(self, view, template, theme="dark", renderer=None):
+        super().__init__(view)
+        self.view = view
+        self.template = template
+        self.renderer = renderer or shared_renderer(round(96 * view.devicePixelRatioF()))
+        self.theme = theme
+        self.html = ""
+        self._drawing = None
+        self._prefetching = None
+        self._started = None
+        self._warm = False
+        self._apply_colors()
+
+    @property
+    def bg_color(self):
+        return palette(self.theme)["bg"]
+
+    @property
+    def text_color(self):
+        return palette(self.theme)["text"]
+
+    def _apply_colors(self):
+        self.view.setStyleSheet(
+            f"QTextBrowser {{ background: {self.bg_color}; color: {self.text_color}; border: none; }}")
+
+    def _fragments(self, html):
+        return [next(g for g in m.groups() if g is not None)
+                for m in MATH_PATTERN.finditer(resolve(html, self.theme))]
+
+    def _missing(self, html):
+        """(tex, colour) of html's fragments that are neither cached nor known to fail"""
+        color = self.text_color
+        missing = {}
+        for tex in self._fragments(html):
+            if not self.renderer.failed(tex, color) and self.renderer.cached(tex, color) is None:
+                missing[tex] = color
+        return list(missing.items())
+
+    def _image(self, match, images):
+        display = match.group(1) is not None or match.group(2) is not None
+        tex = next(g for g in match.groups() if g is not None)
+        try:
+            data = self.renderer.render(tex, self.text_color)
+        except ValueError:
+            # outside what mathtext can draw, show the source instead
+            return f"<code>{escape(match.group(0))}</code>"
+        name = "mathtext:" + self.renderer.key(tex, self.text_color)
+        image = images.get(name) or self.view.images.get(name) or QImage.fromData(data)
+        images[name] = image
+        scale = self.renderer.dpi / 96
+        tag = (f'<img src="{name}" width="{round(image.width() / scale)}" '
+               f'height="{round(image.height() / scale)}" style="vertical-align: middle">')
+        return f'<p align="center">{tag}</p>' if display else tag
+
+    def show(self, html):
+        """Replace the page with html once its fragments are drawn"""
+        if self._started is None:
+            self._started, self._warm = time.perf_counter(), self.renderer.warm
+        self.html = html
+        self._update()
+
+    def _update(self):
+        if self._drawing is not None:
+            return  # picked up again when the running draw finishes
+        missing = self._missing(self.html)
+        if missing:
+            self._drawing = self._draw(missing, self._drawn)
+        else:
+            self._swap()
+
+    def _draw(self, fragments, on_done):
+        def finished(drawn):
+            for tex, color, data in drawn:
+                self.renderer.store(tex, color, data)
+            on_done()
+
+        def failed(_):
+            # give up on the lot rather than drawing it again and again
+            for tex, color in fragments:
+                self.renderer.store(tex, color, None)
+            on_done()
+
+        return run_in_background(_draw_missing, self.renderer, fragments,
+                                 on_finished=finished, on_failed=failed)
+
+    def _drawn(self):
+        self._drawing = None
+        self._update()
+
+    def _swap(self):
+        html = self.html
+        images = {}
+        body = MATH_PATTERN.sub(lambda match: self._image(match, images), resolve(html, self.theme))
+        self._apply_colors()
+        bar = self.view.verticalScrollBar()
+        scroll = bar.value()
+        self.view.images = images
+        page = self.template(body, self.bg_color, self.text_color)
+        self.view.setHtml(resolve(SCRIPT.sub("", page), self.theme))
+        bar.setValue(scroll)
+        if html:
+            render_times.record((time.perf_counter() - self._started) * 1000, self._warm)
+        self._started = None
+        QTimer.singleShot(0, self.typeset.emit)
+
+    def prefetch(self, html):
+        """Draw html's fragments into the image cache on the worker pool"""
+        if self._prefetching is not None:
+            self._prefetching.cancel()
+        missing = self._missing(html)
+        self._prefetching = self._draw(missing, self._prefetched) if missing else None
+
+    def _prefetched(self):
+        self._prefetching = None
+
+    def release(self):
+        """Nothing pooled, the view goes away with its window; stop drawing for it"""
+        for job in (self._drawing, self._prefetching):
+            if job is not None:
+                job.cancel()
+        self._drawing = self._prefetching = None
+
+    def set_theme(self, theme):
+        if theme == self.theme:
+            return
+        self.theme = theme
+        if self.html:
+            self.show(self.html)
+        else:
+            self._apply_colors()
@@ -0,0 +1,127 @@
+# pager.py
+# Paged display of a StepList. Only the current page of steps is rendered
+# and pushed to the step page, so opening a result costs one page whatever
+# the total step count; the following page is prefetched (rendered, and
+# typeset or drawn into the caches) while the user reads this one.
+# A streamed StepList is shown from its first batch on and the page is
+# re-rendered only while it is not full yet.
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QHBoxLayout, QLabel, QPushButton, QSpinBox, QVBoxLayout, QWidget
+
+# Steps per page. Every operation of the calculator fits on one page, the
+# bar only shows up for longer derivations.
+PAGE_SIZE = 40
+
+# Idle time after a page is shown before the next one is prefetched
+PREFETCH_DELAY_MS = 200
+
+
+class StepView(QWidget):
+    """A step page's widget under a bar that pages through long StepLists"""
+
+    def __init__(self, view, page, page_size=PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.view = view
+        self.page = page
+        self.page_size = max(1, page_size)
+        self.steps = None
+        self.complete = True
+        self.start = 0
+        self._stop = 0  # end of the steps rendered on the current page
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(4)
+
+        self.bar = QWidget()
+        bar_layout = QHBoxLayout(self.bar)
+        bar_layout.setContentsMargins(0, 0, 0, 0)
+        self.prev_button = QPushButton("◀")
+        self.next_button = QPushButton("▶")
+        self.label = QLabel()
+        self.jump = QSpinBox()
+        self.jump.setPrefix("Step ")
+        self.jump.setKeyboardTracking(False)  # jump on Enter, not on every digit
+        bar_layout.addWidget(self.prev_button)
+        bar_layout.addWidget(self.label, 1)
+        bar_layout.addWidget(QLabel("Go to"))
+        bar_layout.addWidget(self.jump)
+        bar_layout.addWidget(self.next_button)
+        self.bar.hide()
+
+        layout.addWidget(self.bar)
+        layout.addWidget(view, 1)
+
+        self.prev_button.clicked.connect(lambda: self.go_to(self.start - self.page_size))
+        self.next_button.clicked.connect(lambda: self.go_to(self.start + self.page_size))
+        self.jump.valueChanged.connect(lambda value: self.go_to(value - 1))
+
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(PREFETCH_DELAY_MS)
+        self._prefetch_timer.timeout.connect(self._prefetch)
+
+    def show_steps(self, steps, index=0, complete=True):
+        """Show steps from step `index` on; complete=False while they stream in"""
+        if steps is self.steps:
+            self.complete = complete
+            self._refresh()
+            return
+        self.steps = steps
+        self.complete = complete
+        self._stop = 0
+        self._update_range()
+        self.go_to(index)
+
+    def add_steps(self, steps, batch):
+        """Append a streamed batch to steps, shown from the first batch on"""
+        steps.extend(batch)
+        self.show_steps(steps, complete=False)
+
+    def _update_range(self):
+        self.bar.setVisible(len(self.steps) > self.page_size)
+        self.jump.blockSignals(True)
+        self.jump.setRange(1, max(1, len(self.steps)))
+        self.jump.blockSignals(False)
+
+    def _refresh(self):
+        self._update_range()
+        if min(self.start + self.page_size, len(self.steps)) != self._stop:
+            self.go_to(self.start)  # the page was not full, show the new steps
+        else:
+            self._update_bar()
+
+    def show_html(self, html):
+        """Show a message instead of steps"""
+        self.steps = None
+        self.bar.hide()
+        self._prefetch_timer.stop()
+        self.page.show(html)
+
+    def go_to(self, index):
+        """Show the page starting at step `index` (the last page is kept full)"""
+        if self.steps is None:
+            return
+        self.start = max(0, min(index, len(self.steps) - self.page_size))
+        self._stop = min(self.start + self.page_size, len(self.steps))
+        self.page.show(self.steps.html(self.start, self._stop))
+        self._update_bar()
+
+    def _update_bar(self):
+        total = f"{len(self.steps)}" if self.complete else f"{len(self.steps)} so far"
+        self.label.setText(f"Steps {self.start + 1}–{self._stop} of {total}")
+        self.prev_button.setEnabled(self.start > 0)
+        self.next_button.setEnabled(self._stop < len(self.steps))
+        self.jump.blockSignals(True)
+        self.jump.setValue(self.start + 1)
+        self.jump.blockSignals(False)
+
+        if self._stop < len(self.steps):
+            self._prefetch_timer.start()
+        else:
+            self._prefetch_timer.stop()
+
+    def _prefetch(self):
+        start = self.start + self.page_size
+        if self.steps is not None and start < len(self.steps):
+            self.page.prefetch(self.steps.html(start, start + self.page_size))
@@ -0,0 +1,37 @@
+# progress.py
+# Small progress strip shown under the Calculate button while a job runs.
+from PyQt6.QtWidgets import QHBoxLayout, QLabel, QProgressBar, QWidget
+
+PHASES = {
+    "parse": "Reading inputs",
+    "compute": "Computing",
+    "steps": "Writing steps",
+    "render": "Rendering",
+}
+
+
+class JobProgress(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.phase_label = QLabel()
+        self.phase_label.setMinimumWidth(140)
+        self.bar = QProgressBar()
+        self.bar.setRange(0, 100)
+        self.bar.setTextVisible(True)
+        self.bar.setFixedHeight(14)
+        layout.addWidget(self.phase_label)
+        layout.addWidget(self.bar, 1)
+        self.hide()
+
+    def start(self):
+        self.report("parse", 0)
+        self.show()
+
+    def report(self, phase, percent):
+        self.phase_label.setText(PHASES.get(phase, phase))
+        self.bar.setValue(max(0, min(100, int(percent))))
+
+    def finish(self):
+        self.hide()
@@ -0,0 +1,74 @@
+# qss.py
+# Main window stylesheet, compiled once for both themes.
+# Rules are scoped by the window's "theme" property and the sidebar buttons
+# by their "nav"/"active" properties, so a theme toggle or a new active
+# button only flips a property and re-polishes; no QSS is concatenated or
+# parsed again at runtime. A toggle re-polishes what is on screen: of a
+# QStackedWidget only the current page, the hidden (cached) operation pages
+# are re-polished when they are shown again.
+from ui.theme import PALETTES
+
+
+def _rules(theme, colors):
+    scope = f'QMainWindow[theme="{theme}"]'
+    return f"""
+        {scope}, {scope} QWidget {{
+            background: {colors['bg']};
+            color: {colors['text']};
+        }}
+        {scope} QLabel#sidebarHeader {{
+            color: {colors['accent']};
+            font-family: 'Lucida Console';
+            font-size: 24px;
+            font-weight: bold;
+            padding: 15px;
+        }}
+        {scope} QPushButton[nav="true"] {{
+            background: transparent;
+            color: {colors['text']};
+            font-family: 'Lucida Console';
+            font-size: 16px;
+            padding: 12px 20px;
+            border: none;
+            border-left: 3px solid transparent;
+            text-align: left;
+        }}
+        {scope} QPushButton[nav="true"]:hover {{
+            background: {colors['hover']};
+            border-left: 3px solid {colors['accent']};
+        }}
+        {scope} QPushButton[nav="true"][active="true"] {{
+            background: {colors['hover']};
+            border-left: 3px solid #ff7b72;
+        }}
+    """
+
+
+APP_STYLESHEET = "".join(_rules(theme, colors) for theme, colors in PALETTES.items())
+
+
+def set_flag(widget, name, value):
+    """Set a property used in a selector and restyle just that widget"""
+    widget.setProperty(name, value)
+    widget.style().unpolish(widget)
+    widget.style().polish(widget)
+
+
+def repolish(widget):
+    """Restyle widget and its children, skipping stacked pages not shown"""
+    from PyQt6.QtWidgets import QStackedWidget, QWidget
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    hidden = set()
+    if isinstance(widget, QStackedWidget):
+        hidden = {widget.widget(i) for i in range(widget.count())} - {widget.currentWidget()}
+    for child in widget.children():
+        if isinstance(child, QWidget) and child not in hidden:
+            repolish(child)
+
+
+def apply_theme(window, theme):
+    """Flip the window's theme property and restyle what is on screen"""
+    window.setProperty("theme", theme)
+    repolish(window)
@@ -0,0 +1,32 @@
+# registry.py
+# Lazy operation registry for the sidebars. An entry names the module and
+# class of an operation window; the module (and everything it pulls in:
+# numpy, the engine, the step renderer) is imported the first time the
+# entry is opened, not when the main window is built.
+import importlib
+
+
+class LazyOperation:
+    """Stands in for an operation window class until it is first called"""
+
+    __slots__ = ("module", "name", "_cls")
+
+    def __init__(self, module, name):
+        self.module = module
+        self.name = name
+        self._cls = None
+
+    def resolve(self):
+        if self._cls is None:
+            self._cls = getattr(importlib.import_module(self.module), self.name)
+        return self._cls
+
+    @property
+    def loaded(self):
+        return self._cls is not None
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"LazyOperation({self.module!r}, {self.name!r})"
@@ -0,0 +1,103 @@
+# startup.py
+# Startup timing for the launcher. main.py marks its phases on `timer` and
+# the launcher's first paint closes the measurement. Step pages record how
+# long their steps took to appear on `render_times`, split by whether the
+# renderer had been warmed (see ui.stepview.schedule_prewarm).
+#
+#   MATRIQ_STARTUP_REPORT=1 python main.py      print the phases to stderr
+#   MATRIQ_STARTUP_REPORT=exit python main.py   print them and quit, exit
+#                                               status 1 when over budget
+#   MATRIQ_PREWARM=0                            no prewarming, for cold
+#                                               first-render times
+import os
+import sys
+import time
+
+STARTUP_BUDGET_MS = 400
+
+
+class StartupTimer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, (time.perf_counter() - self.start) * 1000))
+
+    def total(self):
+        return self.marks[-1][1] if self.marks else 0.0
+
+    def within_budget(self, budget_ms=STARTUP_BUDGET_MS):
+        return self.total() <= budget_ms
+
+    def report(self, budget_ms=STARTUP_BUDGET_MS):
+        lines = [f"{name:<20}{ms:9.1f} ms" for name, ms in self.marks]
+        status = "ok" if self.within_budget(budget_ms) else "OVER BUDGET"
+        lines.append(f"time to first paint {self.total():.1f} ms (budget {budget_ms} ms, {status})")
+        return "\n".join(lines)
+
+
+timer = StartupTimer()
+
+
+class RenderTimes:
+    """Push-to-screen times of step renders, cold and warm apart"""
+
+    def __init__(self):
+        self.cold = []
+        self.warm = []
+        self.first = None  # (ms, warm) of the first render in the process
+
+    def record(self, ms, warm):
+        (self.warm if warm else self.cold).append(ms)
+        if self.first is None:
+            self.first = (ms, warm)
+            if os.environ.get("MATRIQ_STARTUP_REPORT", "").strip():
+                print(self.report(), file=sys.stderr)
+
+    def report(self):
+        if self.first is None:
+            return "no steps rendered"
+        ms, warm = self.first
+        lines = [f"first render {ms:.1f} ms ({'warm' if warm else 'cold'})"]
+        for name, times in (("cold", self.cold), ("warm", self.warm)):
+            if times:
+                lines.append(f"{name} renders {len(times)}, median {sorted(times)[len(times) // 2]:.1f} ms")
+        return "\n".join(lines)
+
+
+render_times = RenderTimes()
+
+
+def prepare_application():
+    """Call before creating the QApplication
+
+    QtWebEngine refuses to be imported once the application exists unless
+    OpenGL contexts are shared, and it is now only imported when the first
+    step view needs it.
+    """
+    from PyQt6.QtCore import QCoreApplication, Qt
+    QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+
+
+def watch_first_paint(widget, budget_ms=STARTUP_BUDGET_MS):
+    """Mark the first paint of widget and report it as configured"""
+    from PyQt6.QtCore import QCoreApplication, QEvent, QObject, QTimer
+
+    mode = os.environ.get("MATRIQ_STARTUP_REPORT", "").strip().lower()
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint:
+                widget.removeEventFilter(self)
+                timer.mark("first paint")
+                if mode:
+                    print(timer.report(budget_ms), file=sys.stderr)
+                if mode == "exit":
+                    status = 0 if timer.within_budget(budget_ms) else 1
+                    QTimer.singleShot(0, lambda: QCoreApplication.exit(status))
+            return False
+
+    watcher = FirstPaint(widget)
+    widget.installEventFilter(watcher)
+    return watcher
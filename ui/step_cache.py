@@ -0,0 +1,51 @@
+# step_cache.py
+# Finished StepLists keyed by (operation, values, verbosity), shared by every
+# operation window of the 2x2 and 3x3 calculators. A StepList keeps the HTML
+# of the steps it has rendered, so a repeated Calculate gets the records and
+# their LaTeX back without running generate_steps or formatting a number.
+# Step HTML only carries CSS colour variables (ui.theme), so the theme is
+# not part of the key: re-clicking after a theme toggle is a hit.
+# Only used from the UI thread.
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = 128
+
+
+class StepCache:
+    """Bounded LRU of complete StepLists"""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(operation, values, verbosity):
+        return (operation, tuple(values), verbosity)
+
+    def get(self, key):
+        steps = self._entries.get(key)
+        if steps is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return steps
+
+    def put(self, key, steps):
+        self._entries[key] = steps
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared by every operation window in the process
+step_cache = StepCache()
@@ -0,0 +1,144 @@
+# steps.py
+# Steps as data. generate_steps returns a StepList of Step records (what was
+# done, on which operands, giving which result) instead of one HTML string.
+# A step's LaTeX/HTML is only built when a page asks for it and is kept from
+# then on, so steps that are never shown cost a few floats each. Streamed
+# calculations extend() their StepList as the records arrive.
+#
+# verbosity_levels() lets a generate_steps yield less: the key steps only,
+# or the result alone from a fast path that skips the intermediate steps.
+import functools
+import math
+import re
+
+# How much of a solution generate_steps yields
+FULL = "full"
+KEY = "key"
+RESULT = "result"
+VERBOSITY = (FULL, KEY, RESULT)
+
+# LaTeX -> plain text, applied in order
+_TEXT_RULES = [
+    (re.compile(r"\\begin\{[bpv]?matrix\}(.*?)\\end\{[bpv]?matrix\}", re.S),
+     lambda m: "[" + "; ".join(" ".join(c.strip() for c in row.split("&"))
+                               for row in m.group(1).split(r"\\")) + "]"),
+    (re.compile(r"\\t?frac\{([^{}]*)\}\{([^{}]*)\}"), r"\1/\2"),
+    (re.compile(r"\\(?:text|mathrm)\{([^{}]*)\}"), r"\1"),
+    (re.compile(r"\\color\{[^{}]*\}|\\large|\\left|\\right|\\[,;! ]"), ""),
+    (re.compile(r"\\times"), "×"),
+    (re.compile(r"\\cdot"), "·"),
+    (re.compile(r"\\neq"), "≠"),
+    (re.compile(r"\\to"), "→"),
+    (re.compile(r"\\therefore"), "∴"),
+    (re.compile(r"\\[a-zA-Z]+"), ""),
+    (re.compile(r"[{}]"), ""),
+]
+_BLOCK = re.compile(r"<br\s*/?>|<hr\s*/?>|</div>|</p>", re.I)
+_TAG = re.compile(r"<[^>]+>")
+_DELIMITERS = re.compile(r"\\\[|\\\]|\$\$|\\\(|\\\)|\$")
+
+
+def matrix(cells, env="vmatrix"):
+    """LaTeX of a square matrix from its cells in row-major order"""
+    size = math.isqrt(len(cells))
+    rows = (" & ".join(cells[i:i + size]) for i in range(0, len(cells), size))
+    return fr"\begin{{{env}}} " + r" \\ ".join(rows) + fr" \end{{{env}}}"
+
+
+def to_text(html):
+    """Plain text of rendered step HTML, one line per block"""
+    text = _DELIMITERS.sub("", _TAG.sub("", _BLOCK.sub("\n", html)))
+    for pattern, replacement in _TEXT_RULES:
+        text = pattern.sub(replacement, text)
+    text = text.replace("&nbsp;", " ")
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def verbosity_levels(key_kinds, result):
+    """Add a verbosity keyword to a generate_steps generator
+
+    FULL yields every step, KEY only the steps whose kind is in key_kinds
+    and RESULT only result(*values), the last step computed directly.
+    """
+    def decorate(generate):
+        @functools.wraps(generate)
+        def generate_steps(*values, verbosity=FULL):
+            if verbosity == RESULT:
+                yield result(*values)
+            elif verbosity == KEY:
+                yield from (step for step in generate(*values) if step.kind in key_kinds)
+            else:
+                yield from generate(*values)
+        return generate_steps
+    return decorate
+
+
+class Step:
+    """One step of a solution; its StepList's render function draws it"""
+
+    __slots__ = ("kind", "operands", "result")
+
+    def __init__(self, kind, operands=(), result=None):
+        self.kind = kind
+        self.operands = operands
+        self.result = result
+
+    def __eq__(self, other):
+        return (isinstance(other, Step) and self.kind == other.kind
+                and self.operands == other.operands and self.result == other.result)
+
+    def __hash__(self):
+        return hash((self.kind, self.operands, self.result))
+
+    def __repr__(self):
+        return f"Step({self.kind!r}, {self.operands!r}, {self.result!r})"
+
+
+class StepList:
+    """The steps of one calculation and how to turn them into HTML
+
+    render(step) returns one step's HTML; head, separator and tail wrap the
+    joined steps. Use module-level render functions: a StepList outlives
+    its window in the WidgetCache and must not keep the window alive.
+    """
+
+    __slots__ = ("steps", "render", "head", "separator", "tail", "_html")
+
+    def __init__(self, steps, render, head="", separator="", tail=""):
+        self.steps = list(steps)
+        self.render = render
+        self.head = head
+        self.separator = separator
+        self.tail = tail
+        self._html = [None] * len(self.steps)
+
+    def extend(self, steps):
+        steps = list(steps)
+        self.steps.extend(steps)
+        self._html.extend([None] * len(steps))
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __getitem__(self, index):
+        return self.steps[index]
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def step_html(self, index):
+        html = self._html[index]
+        if html is None:
+            html = self._html[index] = self.render(self.steps[index])
+        return html
+
+    def html(self, start=0, stop=None):
+        """HTML of steps[start:stop], rendering only those"""
+        indices = range(*slice(start, stop).indices(len(self.steps)))
+        return self.head + self.separator.join(self.step_html(i) for i in indices) + self.tail
+
+    def text(self, start=0, stop=None):
+        """Plain text of steps[start:stop]"""
+        indices = range(*slice(start, stop).indices(len(self.steps)))
+        return "\n".join(to_text(self.step_html(i)) for i in indices)
@@ -0,0 +1,377 @@
+# stepview.py
+# One persistent page per web view. The window's template (with its MathJax
+# config) is loaded a single time with an empty #steps container; after that
+# new steps and theme colours are pushed with runJavaScript and MathJax only
+# typesets the replaced nodes. No page reload, no script boot per calculation.
+# Fragments typeset before are served from the shared TypesetCache.
+#
+# The web views themselves come from a ViewPool shared by all windows: a
+# window's StepSlot borrows a view while it is on screen, and the page is
+# only reloaded when the previous borrower used a different template.
+#
+# schedule_prewarm() starts the renderer while the user is still typing, so
+# the first Calculate does not pay for Chromium and MathJax booting.
+#
+# create_step_view() picks the renderer: this page in a QWebEngineView, or
+# ui.mathtext's images in a QTextBrowser when MATRIQ_RENDERER=mathtext or
+# QtWebEngine is not installed; either way under a ui.pager.StepView.
+import importlib.util
+import json
+import os
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QVBoxLayout, QWidget
+
+from ui.mathjax import set_html
+from ui.pager import StepView
+from ui.startup import render_times
+from ui.theme import css_variables, palette
+from ui.typeset_cache import shared_cache
+
+# Web views alive at once, shared by every operation window
+POOL_SIZE = 1
+
+# Typeset markup only carries var(--mq-*) colours, so one cache entry
+# serves both themes
+CACHE_THEME = "css-variables"
+
+# Idle time after a main window is built before the renderer is warmed
+PREWARM_DELAY_MS = 300
+
+# Typeset off screen to pull in the TeX parser, the matrix environments,
+# \color and the CHTML fonts before the first real steps need them
+WARM_TEX = (r"\large\color{var(--mq-header)}{\text{Let A = }} \left(\begin{vmatrix} 1 & -2 \\ 3 & 4 \end{vmatrix}"
+            r" \times \frac{1}{2}\right)")
+
+# Installed once in the shell page. Typeset completion is reported through
+# document.title, which QWebEngineView forwards as titleChanged.
+BOOTSTRAP = """
+<style id="mjx-cached-styles">%(cached_styles)s</style>
+<style id="mq-theme">%(theme_css)s</style>
+<div id="steps"></div>
+<div id="prefetch" style="position: absolute; left: -10000px; visibility: hidden;" aria-hidden="true"></div>
+<script>
+    window.__steps = {
+        typesetCount: 0,
+        whenReady: function (callback) {
+            if (window.MathJax && MathJax.startup && MathJax.startup.promise) {
+                // chained, so typesets of #steps and #prefetch never overlap
+                MathJax.startup.promise = MathJax.startup.promise.then(callback).catch(function (err) {
+                    console.log(err);
+                });
+            } else {
+                setTimeout(function () { window.__steps.whenReady(callback); }, 20);
+            }
+        },
+        update: function (html) {
+            var el = document.getElementById('steps');
+            if (window.MathJax && MathJax.typesetClear) { MathJax.typesetClear([el]); }
+            el.innerHTML = html;
+            window.__steps.whenReady(function () {
+                return MathJax.typesetPromise([el]).then(function () {
+                    document.title = 'typeset:' + (++window.__steps.typesetCount);
+                });
+            });
+        },
+        clear: function () {
+            var el = document.getElementById('steps');
+            if (window.MathJax && MathJax.typesetClear) { MathJax.typesetClear([el]); }
+            el.innerHTML = '';
+        },
+        prefetch: function (html) {
+            var el = document.getElementById('prefetch');
+            window.__steps.whenReady(function () {
+                MathJax.typesetClear([el]);
+                el.innerHTML = html;
+                return MathJax.typesetPromise([el]).then(function () {
+                    document.title = 'prefetched:' + (++window.__steps.typesetCount);
+                });
+            });
+        },
+        harvest: function (id) {
+            var el = document.getElementById(id || 'steps');
+            var items = [];
+            MathJax.startup.document.getMathItemsWithin(el).forEach(function (item) {
+                if (item.typesetRoot) {
+                    items.push([item.math, item.display, item.typesetRoot.outerHTML]);
+                }
+            });
+            var sheet = document.getElementById('MJX-CHTML-styles');
+            return {items: items, stylesheet: sheet ? sheet.textContent : ''};
+        },
+        warm: function (tex) {
+            window.__steps.whenReady(function () {
+                var el = document.createElement('div');
+                el.style.cssText = 'position: absolute; left: -10000px; visibility: hidden;';
+                el.textContent = '\\[' + tex + '\\]';
+                document.body.appendChild(el);
+                return MathJax.typesetPromise([el]).then(function () {
+                    MathJax.typesetClear([el]);
+                    el.remove();
+                    document.title = 'warm';
+                });
+            });
+        },
+        theme: function (css, bg, fg) {
+            document.getElementById('mq-theme').textContent = css;
+            document.body.style.backgroundColor = bg;
+            document.body.style.color = fg;
+        }
+    };
+</script>
+"""
+
+
+class Surface:
+    """A pooled web view and the shell page currently loaded in it"""
+
+    def __init__(self):
+        # Deferred to the first view, startup never loads QtWebEngine
+        # (see ui.startup.prepare_application)
+        from PyQt6.QtWebEngineWidgets import QWebEngineView
+        self.view = QWebEngineView()
+        self.owner = None
+        self.shell_key = None
+        self.loaded = False
+        self.warm = False  # MathJax booted and has typeset once
+        self._pending = []
+        self.view.loadFinished.connect(self._on_load_finished)
+        self.view.titleChanged.connect(self._on_title_changed)
+
+    def load(self, shell, shell_key):
+        self.shell_key = shell_key
+        self.loaded = False
+        self.warm = False
+        self._pending = []
+        set_html(self.view, shell)
+
+    def _on_load_finished(self, ok):
+        self.loaded = True
+        pending, self._pending = self._pending, []
+        for script in pending:
+            self.view.page().runJavaScript(script)
+
+    def _on_title_changed(self, title):
+        if title == "warm" or title.startswith("typeset:"):
+            self.warm = True
+        if self.owner is not None:
+            self.owner._on_title_changed(title)
+
+    def run(self, script, callback=None):
+        if not self.loaded:
+            self._pending.append(script)
+        elif callback is None:
+            self.view.page().runJavaScript(script)
+        else:
+            self.view.page().runJavaScript(script, callback)
+
+
+class ViewPool:
+    """A fixed number of web views lent to the step slots that are on screen
+
+    Only the operation in front needs a renderer, so however many windows
+    were visited the process keeps `size` Chromium views. A slot that
+    loses its view keeps its steps and gets them pushed back on return.
+    """
+
+    def __init__(self, size=1):
+        self.size = size
+        self._surfaces = []  # least recently used first
+
+    def acquire(self, page):
+        for surface in self._surfaces:
+            if surface.owner is page:
+                break
+        else:
+            if len(self._surfaces) < self.size:
+                surface = Surface()
+            else:
+                surface = self._surfaces[0]
+                if surface.owner is not None:
+                    surface.owner.detach()
+            surface.owner = page
+        if surface in self._surfaces:
+            self._surfaces.remove(surface)
+        self._surfaces.append(surface)
+        return surface
+
+    def prewarm(self):
+        """Typeset a sample off screen in every view that has not typeset yet"""
+        for surface in self._surfaces:
+            if not surface.warm:
+                surface.run(f"window.__steps.warm({json.dumps(WARM_TEX)});")
+
+    def __len__(self):
+        return len(self._surfaces)
+
+
+_pool = None
+
+
+def shared_pool():
+    global _pool
+    if _pool is None:
+        _pool = ViewPool(POOL_SIZE)
+    return _pool
+
+
+class StepSlot(QWidget):
+    """Placeholder in a window's layout, holds a pooled view while shown"""
+
+    shown = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Let the window paint before a view is created or moved in
+        QTimer.singleShot(0, self._emit_shown)
+
+    def _emit_shown(self):
+        if self.isVisible():
+            self.shown.emit()
+
+
+class StepPage(QObject):
+    """The steps of one window, pushed into a pooled page while its slot is shown"""
+
+    typeset = pyqtSignal()
+
+    def __init__(self, slot, template, theme="dark", cache=None, pool=None):
+        super().__init__(slot)
+        self.slot = slot
+        self.template = template
+        self.cache = cache if cache is not None else shared_cache()
+        self.pool = pool if pool is not None else shared_pool()
+        self.theme = theme
+        self.html = None
+        self.surface = None
+        self._pushed = None  # (perf_counter, surface was warm) of the last steps pushed
+        slot.shown.connect(self.attach)
+
+    def attach(self):
+        surface = self.pool.acquire(self)
+        if surface is self.surface:
+            return
+        self.surface = surface
+        self.slot.layout().addWidget(surface.view)
+        # Windows with the same template reuse the loaded page, the theme
+        # only sets CSS variables
+        shell_key = self.template("")
+        colors = palette(self.theme)
+        if surface.shell_key != shell_key:
+            shell = BOOTSTRAP % {
+                # Fragments restored from disk need the CHTML rules of the session that typeset them
+                "cached_styles": self.cache.stylesheet.replace("</", "<\\/"),
+                "theme_css": css_variables(self.theme),
+            }
+            surface.load(self.template(shell, colors["bg"], colors["text"]), shell_key)
+        else:
+            surface.run(self._theme_script())
+        self._push(self.html or "")
+
+    def detach(self):
+        self.surface = None
+
+    def release(self):
+        """Hand the view back to the pool before the slot is deleted"""
+        if self.surface is not None:
+            self.surface.view.setParent(None)
+            self.surface.owner = None
+            self.surface = None
+
+    def _on_title_changed(self, title):
+        if title.startswith("typeset:"):
+            if self._pushed is not None:
+                started, warm = self._pushed
+                self._pushed = None
+                render_times.record((time.perf_counter() - started) * 1000, warm)
+            self.typeset.emit()
+            self.surface.run("window.__steps.harvest();", self._store)
+        elif title.startswith("prefetched:"):
+            self.surface.run("window.__steps.harvest('prefetch');", self._store)
+
+    def _store(self, result):
+        if result:
+            self.cache.store(result.get("items", []), CACHE_THEME, result.get("stylesheet"))
+
+    def _theme_script(self):
+        colors = palette(self.theme)
+        args = ", ".join(json.dumps(value) for value in (css_variables(self.theme), colors["bg"], colors["text"]))
+        return f"window.__steps.theme({args});"
+
+    def _push(self, html):
+        if not html:
+            # Emptied without a typeset, whose title would mark the surface
+            # warm with no math rendered
+            self._pushed = None
+            self.surface.run("window.__steps.clear();")
+            return
+        self._pushed = (time.perf_counter(), self.surface.warm)
+        html = self.cache.apply(html, CACHE_THEME)
+        self.surface.run(f"window.__steps.update({json.dumps(html)});")
+
+    def show(self, html):
+        """Replace the steps and typeset only the fragments not cached yet"""
+        self.html = html
+        if self.surface is not None:
+            self._push(html)
+
+    def prefetch(self, html):
+        """Typeset html off screen into the cache, for steps shown next"""
+        if self.surface is not None:
+            html = self.cache.apply(html, CACHE_THEME)
+            self.surface.run(f"window.__steps.prefetch({json.dumps(html)});")
+
+    def set_theme(self, theme):
+        """Swap the page's colour variables, the steps stay as they are"""
+        if theme == self.theme:
+            return
+        self.theme = theme
+        if self.surface is not None:
+            self.surface.run(self._theme_script())
+
+
+RENDERERS = ("mathjax", "mathtext")
+
+
+def renderer_name():
+    name = os.environ.get("MATRIQ_RENDERER", "").strip().lower()
+    if name in RENDERERS:
+        return name
+    return "mathjax" if importlib.util.find_spec("PyQt6.QtWebEngineWidgets") else "mathtext"
+
+
+def prewarm():
+    """Warm the configured renderer so the first steps render at cache speed"""
+    if renderer_name() == "mathtext":
+        from ui.mathtext import prewarm_renderer
+        prewarm_renderer(WARM_TEX)
+    else:
+        shared_pool().prewarm()
+
+
+def schedule_prewarm(delay_ms=PREWARM_DELAY_MS):
+    """Run prewarm() delay_ms from now, while the user fills in the inputs
+
+    MATRIQ_PREWARM=0 turns it off, to measure cold first renders.
+    """
+    if os.environ.get("MATRIQ_PREWARM", "1").strip() == "0":
+        return
+    QTimer.singleShot(delay_ms, prewarm)
+
+
+def create_step_view(template, theme="dark"):
+    """(StepView, page) for the configured renderer, both pages share one API"""
+    if renderer_name() == "mathtext":
+        from ui.mathtext import MathTextPage, MathTextView
+        view = MathTextView()
+        page = MathTextPage(view, template, theme)
+    else:
+        view = StepSlot()
+        page = StepPage(view, template, theme)
+    return StepView(view, page), page
@@ -0,0 +1,60 @@
+# theme.py
+# Colours of the dark and light themes.
+# Step HTML refers to them only as CSS variables (\color{var(--mq-header)}),
+# so a theme switch swaps the variable values on the loaded page and the
+# steps are never regenerated or typeset again. Renderers without CSS
+# resolve the variables to the theme's colours themselves.
+import re
+
+PALETTES = {
+    "dark": {
+        "bg": "#0d1117",
+        "text": "#c9d1d9",
+        "header": "#4192f0",
+        "matrix": "#db2c52",
+        "calculation": "#0d9e66",
+        "final": "#291be3",
+        "extra": "#7a4815",
+        "step-header": "#58a6ff",
+        "step-calculation": "#ff9b72",
+        "step-final": "#d2a8ff",
+        "border": "#30363d",
+        "accent": "#ff7b72",
+        "hover": "rgba(200, 200, 200, 0.1)",
+    },
+    "light": {
+        "bg": "#ffffff",
+        "text": "#1f1f1f",
+        "header": "#d60326",
+        "matrix": "#400612",
+        "calculation": "#bc4c00",
+        "final": "#8250df",
+        "extra": "#8250df",
+        "step-header": "#0366d6",
+        "step-calculation": "#bc4c00",
+        "step-final": "#8250df",
+        "border": "#d0d7de",
+        "accent": "#cf222e",
+        "hover": "rgba(0, 0, 0, 0.1)",
+    },
+}
+
+# What generate_steps puts in \color{...}
+STEP_COLORS = {name: f"var(--mq-{name})" for name in ("header", "matrix", "calculation", "final", "extra")}
+
+VARIABLE = re.compile(r"var\(--mq-([a-z-]+)\)")
+
+
+def palette(theme):
+    return PALETTES.get(theme, PALETTES["dark"])
+
+
+def css_variables(theme):
+    """The :root rule that sets every --mq-* variable for theme"""
+    return ":root { " + " ".join(f"--mq-{name}: {value};" for name, value in palette(theme).items()) + " }"
+
+
+def resolve(text, theme):
+    """Replace the variables in text with the theme's colours"""
+    colors = palette(theme)
+    return VARIABLE.sub(lambda m: colors.get(m.group(1), m.group(0)), text)
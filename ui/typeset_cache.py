@@ -0,0 +1,151 @@
+# typeset_cache.py
+# Cache of MathJax output keyed by (TeX fragment, display mode, theme).
+# Before steps are pushed to a page, every fragment that was typeset before
+# is swapped for its stored markup, so MathJax only sees the new ones. After
+# a typeset the page hands back the markup of what it just rendered.
+# Entries are kept in LRU order under a byte cap and saved to disk on exit
+# together with the CHTML rules the stored markup depends on. MathJax adds
+# glyph rules (mjx-c...::before) to its sheet only as glyphs are used, so
+# every harvested sheet is merged into one ordered set of rules.
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+
+# \[...\], $$...$$, \(...\) and $...$ in the order MathJax looks for them
+MATH_PATTERN = re.compile(r"\\\[(.+?)\\\]|\$\$(.+?)\$\$|\\\((.+?)\\\)|(?<![\\$])\$(?!\$)(.+?)\$", re.S)
+
+
+# Braces, skipping the ones in strings (glyph rules have content: "{") and comments
+CSS_TOKEN = re.compile(r""""(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|/\*.*?\*/|[{}]""", re.S)
+
+
+def css_rules(css):
+    """Top-level rules of a stylesheet (selector and block, @-rules whole)"""
+    rules, depth, start = [], 0, 0
+    for match in CSS_TOKEN.finditer(css):
+        token = match.group(0)
+        if token == "{":
+            depth += 1
+        elif token == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                rules.append(css[start:match.end()].strip())
+                start = match.end()
+    return [rule for rule in rules if rule]
+
+
+def default_path():
+    from PyQt6.QtCore import QStandardPaths
+    base = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+    return os.path.join(base or os.path.expanduser("~/.cache/matriq"), "typeset_cache.json")
+
+
+class TypesetCache:
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._rules = {}  # CHTML rules in the order first seen, used as an ordered set
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._dirty = False
+        if path:
+            self.load()
+
+    @staticmethod
+    def key(tex, display, theme):
+        raw = f"{theme}\0{int(bool(display))}\0{tex}".encode("utf-8")
+        return hashlib.sha1(raw).hexdigest()
+
+    def get(self, key):
+        markup = self._entries.get(key)
+        if markup is not None:
+            self._entries.move_to_end(key)
+        return markup
+
+    def put(self, key, markup):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._entries[key] = markup
+        self._bytes += len(markup)
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+        self._dirty = True
+
+    def apply(self, html, theme):
+        """Swap every cached fragment in html for its typeset markup"""
+        def replace(match):
+            display = match.group(1) is not None or match.group(2) is not None
+            tex = next(g for g in match.groups() if g is not None)
+            markup = self.get(self.key(tex, display, theme))
+            if markup is None:
+                self.misses += 1
+                return match.group(0)
+            self.hits += 1
+            return markup
+        return MATH_PATTERN.sub(replace, html)
+
+    def store(self, items, theme, stylesheet=None):
+        """items: [tex, display, markup] triples harvested from a page"""
+        for tex, display, markup in items:
+            self.put(self.key(tex, display, theme), markup)
+        if stylesheet:
+            self.merge_stylesheet(stylesheet)
+
+    def merge_stylesheet(self, css):
+        """Add the rules of css that are not kept yet"""
+        for rule in css_rules(css):
+            if rule not in self._rules:
+                self._rules[rule] = None
+                self._dirty = True
+
+    @property
+    def stylesheet(self):
+        return "\n".join(self._rules)
+
+    def __len__(self):
+        return len(self._entries)
+
+    # -- persistence ------------------------------------------------------
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        self.merge_stylesheet(data.get("stylesheet", ""))
+        for key, markup in data.get("entries", []):
+            self.put(key, markup)
+        self._dirty = False
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"stylesheet": self.stylesheet, "entries": list(self._entries.items())}, fh)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+_shared = None
+
+
+def shared_cache():
+    """Process-wide cache, loaded from disk on first use and saved on quit"""
+    global _shared
+    if _shared is None:
+        _shared = TypesetCache(default_path())
+        from PyQt6.QtCore import QCoreApplication
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_shared.save)
+    return _shared
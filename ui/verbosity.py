@@ -0,0 +1,36 @@
+# verbosity.py
+# Per-operation choice of how much of a solution is shown, next to the
+# Calculate button. The levels themselves live in ui.steps;
+# MATRIQ_VERBOSITY=full|key|result sets what new windows start with.
+import os
+
+from PyQt6.QtWidgets import QComboBox
+
+from ui.steps import FULL, KEY, RESULT, VERBOSITY
+
+LABELS = {
+    FULL: "Full steps",
+    KEY: "Key steps",
+    RESULT: "Result only",
+}
+
+
+def default_verbosity():
+    name = os.environ.get("MATRIQ_VERBOSITY", "").strip().lower()
+    return name if name in VERBOSITY else FULL
+
+
+class VerbosityBox(QComboBox):
+    def __init__(self, verbosity=None, parent=None):
+        super().__init__(parent)
+        for level in VERBOSITY:
+            self.addItem(LABELS[level], level)
+        self.set_verbosity(verbosity or default_verbosity())
+
+    def verbosity(self):
+        return self.currentData()
+
+    def set_verbosity(self, verbosity):
+        index = self.findData(verbosity)
+        if index >= 0:
+            self.setCurrentIndex(index)
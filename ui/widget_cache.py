@@ -0,0 +1,94 @@
+# widget_cache.py
+# Bounded replacement for the main windows' content_widgets dict.
+# Only the most recently shown operations keep a live widget; older ones are
+# reduced to an OperationState (input texts, last values, last StepList,
+# verbosity) and rebuilt from it when the user goes back to them.
+from collections import OrderedDict
+
+DEFAULT_CAPACITY = 3
+
+
+class OperationState:
+    """What an evicted operation window needs to come back as it was"""
+
+    __slots__ = ("inputs", "values", "steps", "verbosity")
+
+    def __init__(self, inputs, values=None, steps=None, verbosity=None):
+        self.inputs = inputs
+        self.values = values
+        self.steps = steps
+        self.verbosity = verbosity
+
+    @classmethod
+    def capture(cls, widget):
+        values = getattr(widget, 'last_values', None)
+        return cls(
+            tuple(inp.text() for inp in widget.all_inputs),
+            tuple(values) if values is not None else None,
+            getattr(widget, 'last_steps', None),
+            widget.verbosity_box.verbosity() if hasattr(widget, 'verbosity_box') else None
+        )
+
+    def restore(self, widget):
+        for inp, text in zip(widget.all_inputs, self.inputs):
+            inp.setText(text)
+        if self.verbosity is not None:
+            widget.verbosity_box.set_verbosity(self.verbosity)
+        if self.values is not None:
+            widget.last_values = list(self.values)
+        if self.steps is not None:
+            widget.last_steps = self.steps
+            widget.step_view.show_steps(self.steps)
+
+
+class WidgetCache:
+    """Operation widgets of a QStackedWidget, evicted least recently used first"""
+
+    def __init__(self, stack, capacity=DEFAULT_CAPACITY):
+        self.stack = stack
+        self.capacity = max(1, capacity)
+        self.evictions = 0
+        self._widgets = OrderedDict()
+        self._states = {}
+
+    def get(self, key, factory):
+        """The widget for key, created (or rebuilt from its state) when needed"""
+        widget = self._widgets.get(key)
+        if widget is None:
+            widget = factory()
+            self.stack.addWidget(widget)
+            state = self._states.pop(key, None)
+            if state is not None:
+                state.restore(widget)
+            self._widgets[key] = widget
+        self._widgets.move_to_end(key)
+        self._evict()
+        return widget
+
+    def _evict(self):
+        while len(self._widgets) > self.capacity:
+            key, widget = self._widgets.popitem(last=False)
+            self._states[key] = OperationState.capture(widget)
+            self._dispose(widget)
+            self.evictions += 1
+
+    def _dispose(self, widget):
+        job = getattr(widget, 'job', None)
+        if job is not None:
+            job.cancel()
+        # the pooled view must not be deleted with the slot it sits in
+        widget.step_page.release()
+        self.stack.removeWidget(widget)
+        widget.deleteLater()
+
+    def __contains__(self, key):
+        return key in self._widgets
+
+    def __getitem__(self, key):
+        return self._widgets[key]
+
+    def __len__(self):
+        return len(self._widgets)
+
+    def values(self):
+        return self._widgets.values()
@@ -0,0 +1,205 @@
+# worker.py
+# Runs step generation on Qt's thread pool so the UI thread only does the
+# final setHtml. Results and progress come back through queued signals, and
+# every job carries a CancelToken so a newer Calculate click can drop it.
+#
+# stream_in_background() runs a generator instead and hands its items to
+# the UI thread in batches while it is still running; run_steps() is the
+# operation windows' Calculate on top of it and the shared StepCache.
+import threading
+from functools import partial
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from engine.progress import Cancelled, CancelToken, use_token
+from ui.step_cache import step_cache
+
+
+# Batches a streaming job may have queued for the UI thread before it waits
+MAX_PENDING = 2
+
+# Items a streaming job collects while the UI thread is behind, before it waits
+MAX_BATCH = 64
+
+
+class WorkerSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    progress = pyqtSignal(str, int)
+    cancelled = pyqtSignal()
+    items = pyqtSignal(list)
+
+
+class Job(QRunnable):
+    """Calls fn(*args) on a pool thread and emits the result or the exception
+
+    fn runs with the job's CancelToken installed, so engine checkpoints in
+    it report progress and stop early once cancel() is called.
+    """
+
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = WorkerSignals()
+        self.token = CancelToken(on_progress=self.signals.progress.emit)
+
+    def cancel(self):
+        self.token.cancel()
+
+    def run(self):
+        try:
+            with use_token(self.token):
+                self.token.check()
+                self.token.report("compute", 0)
+                result = self.fn(*self.args)
+                self.token.check()
+        except Cancelled:
+            self.signals.cancelled.emit()
+            return
+        except Exception as err:
+            self.signals.failed.emit(err)
+            return
+        self.signals.finished.emit(result)
+
+
+class StreamJob(Job):
+    """Iterates fn(*args) on a pool thread and emits its items in batches
+
+    Back-pressure: at most max_pending batches wait for the UI thread. While
+    it is behind, items are collected into the next batch, and once that
+    holds max_batch items the generator is not resumed until a batch is
+    consumed(). The finished signal carries the number of items.
+    """
+
+    def __init__(self, fn, *args, max_pending=MAX_PENDING, max_batch=MAX_BATCH):
+        super().__init__(fn, *args)
+        self.max_batch = max(1, max_batch)
+        self._slots = threading.Semaphore(max(1, max_pending))
+
+    def consumed(self):
+        """Called on the UI thread once a batch has been handled"""
+        self._slots.release()
+
+    def _offer(self, batch, wait):
+        if wait:
+            while not self._slots.acquire(timeout=0.05):
+                self.token.check()
+        elif not self._slots.acquire(blocking=False):
+            return False
+        self.signals.items.emit(batch)
+        return True
+
+    def run(self):
+        count = 0
+        try:
+            with use_token(self.token):
+                self.token.check()
+                self.token.report("compute", 0)
+                batch = []
+                for item in self.fn(*self.args):
+                    batch.append(item)
+                    count += 1
+                    if self._offer(batch, wait=len(batch) >= self.max_batch):
+                        batch = []
+                if batch:
+                    self._offer(batch, wait=True)
+                self.token.check()
+        except Cancelled:
+            self.signals.cancelled.emit()
+            return
+        except Exception as err:
+            self.signals.failed.emit(err)
+            return
+        self.signals.finished.emit(count)
+
+
+def run_in_background(fn, *args, on_finished, on_failed=None, on_progress=None, pool=None):
+    """Start fn(*args) on the pool, the callbacks run on the UI thread
+
+    Results of a job cancelled after it finished computing are dropped too.
+    Keep the returned job referenced (e.g. on the window) until it is done.
+    """
+    job = Job(fn, *args)
+    job.signals.finished.connect(lambda result: None if job.token.cancelled else on_finished(result))
+    if on_failed is not None:
+        job.signals.failed.connect(lambda err: None if job.token.cancelled else on_failed(err))
+    if on_progress is not None:
+        job.signals.progress.connect(lambda phase, percent: None if job.token.cancelled
+                                     else on_progress(phase, percent))
+    (pool or QThreadPool.globalInstance()).start(job)
+    return job
+
+
+def stream_in_background(fn, *args, on_items, on_finished, on_failed=None, on_progress=None, pool=None):
+    """Start iterating fn(*args) on the pool, the callbacks run on the UI thread
+
+    on_items gets each batch (a list) as soon as the UI thread can take it,
+    on_finished the item count once the generator is exhausted. Keep the
+    returned job referenced until it is done.
+    """
+    job = StreamJob(fn, *args)
+
+    def handle(batch):
+        try:
+            if not job.token.cancelled:
+                on_items(batch)
+        finally:
+            job.consumed()
+
+    job.signals.items.connect(handle)
+    job.signals.finished.connect(lambda count: None if job.token.cancelled else on_finished(count))
+    if on_failed is not None:
+        job.signals.failed.connect(lambda err: None if job.token.cancelled else on_failed(err))
+    if on_progress is not None:
+        job.signals.progress.connect(lambda phase, percent: None if job.token.cancelled
+                                     else on_progress(phase, percent))
+    (pool or QThreadPool.globalInstance()).start(job)
+    return job
+
+
+def run_steps(window, parse, step_list):
+    """Calculate for an operation window, from its inputs to its steps
+
+    parse turns one input text into a value (ValueError when it can't),
+    step_list() makes the window module's empty StepList. The window
+    provides all_inputs, progress, verbosity_box, step_view,
+    generate_steps, show_steps(steps, values) and show_error(e).
+
+    A new click replaces whatever job is still running. The same
+    operation, values and verbosity as before are served from the shared
+    StepCache, steps and rendered HTML alike; anything else is built on
+    the worker pool and shown as it arrives, only the render runs on the
+    UI thread.
+    """
+    if getattr(window, 'job', None) is not None:
+        window.job.cancel()
+    window.progress.start()
+    try:
+        values = [parse(inp.text()) for inp in window.all_inputs]
+    except ValueError as e:
+        window.show_error(e)
+        return
+
+    verbosity = window.verbosity_box.verbosity()
+    key = step_cache.key(type(window).__module__, values, verbosity)
+    steps = step_cache.get(key)
+    if steps is not None:
+        window.job = None
+        window.show_steps(steps, values)
+        window.progress.finish()
+        return
+
+    steps = step_list()
+
+    def finished(count):
+        step_cache.put(key, steps)
+        window.show_steps(steps, values)
+
+    window.job = stream_in_background(
+        partial(window.generate_steps, verbosity=verbosity), *values,
+        on_items=lambda batch: window.step_view.add_steps(steps, batch),
+        on_finished=finished,
+        on_failed=window.show_error,
+        on_progress=window.progress.report
+    )